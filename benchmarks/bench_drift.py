@@ -0,0 +1,40 @@
+"""Throughput of baseline construction and per-feature drift scoring.
+
+Usage: python -m benchmarks.bench_drift --rows 1000000 --features 300
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from src.model.drift import DriftBaseline, compute_drift
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--features", type=int, default=300)
+    parser.add_argument("--shifted", type=int, default=10, help="Features shifted by +0.5 std in the new data")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(args.rows, args.features)).astype(np.float32)
+    start = time.perf_counter()
+    baseline = DriftBaseline.from_array(X, [f"feature_{i}" for i in range(args.features)])
+    baseline_s = time.perf_counter() - start
+
+    X[:, : args.shifted] += 0.5
+    start = time.perf_counter()
+    report = compute_drift(baseline, X)
+    drift_s = time.perf_counter() - start
+
+    values = args.rows * args.features
+    print(f"baseline  {baseline_s:6.2f} s  ({values / baseline_s / 1e6:,.0f} M values/s)")
+    print(f"drift     {drift_s:6.2f} s  ({values / drift_s / 1e6:,.0f} M values/s)")
+    print(f"drifted (psi > 0.2): {len(report.drifted('psi'))} of {args.features} features")
+
+
+if __name__ == "__main__":
+    main()
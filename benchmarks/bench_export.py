@@ -0,0 +1,138 @@
+"""Per-request latency and cold start of eager, TorchScript and ONNX exports of ``SimpleMLP``.
+
+Cold start is measured in a fresh interpreter: import the handler, ``model_fn`` and the first
+prediction. Latency is the median of single-request ``predict_fn`` calls in a warm process.
+
+``--quantize`` adds dynamically quantized int8 eager and TorchScript variants.
+
+Usage: python -m benchmarks.bench_export --features 10 --hidden-dim 256 --batch-sizes 1 64 --quantize
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import statistics
+import subprocess  # noqa: S404 - runs this interpreter to measure cold start
+import sys
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import torch
+
+from src.model.export import ARTIFACT_NAMES, export_model_artifacts
+from src.model.metadata import ModelMetadata
+
+COLD_START_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[1] + "/code")
+import numpy as np, torch
+import inference
+model = inference.model_fn(sys.argv[1])
+inference.predict_fn(torch.zeros(1, int(sys.argv[2])), model)
+print(time.perf_counter() - start)
+"""
+
+
+def _load_handler(code_dir: Path):
+    spec = importlib.util.spec_from_file_location(f"handler_{code_dir.parent.name}", code_dir / "inference.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _export(model_dir: Path, work_dir: Path, export_format: str, quantize: str | None = None) -> Path:
+    name = f"{export_format}-{quantize}" if quantize else export_format
+    tar_path = export_model_artifacts(
+        model_dir / "model.pt",
+        work_dir / name / "export",
+        export_format,
+        quantize=quantize,
+        validation_csv=model_dir / "validation.csv",
+        max_metric_delta=float("inf"),
+    )
+    serving_dir = work_dir / name / "serving"
+    with tarfile.open(tar_path) as tar:
+        tar.extractall(serving_dir)  # noqa: S202 - archive was just written by export_model_artifacts
+    return serving_dir
+
+
+def _latency_ms(handler, model, features: int, batch_size: int, requests: int) -> float:
+    rows = torch.from_numpy(np.random.default_rng(0).normal(size=(batch_size, features)).astype(np.float32))
+    for _ in range(20):
+        handler.predict_fn(rows, model)
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        handler.predict_fn(rows, model)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def _cold_start_s(serving_dir: Path, features: int, repeats: int) -> float:
+    runs = [
+        float(
+            subprocess.run(  # noqa: S603 - fixed script, local paths
+                [sys.executable, "-c", COLD_START_SCRIPT, str(serving_dir), str(features)],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+        )
+        for _ in range(repeats)
+    ]
+    return min(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--features", type=int, default=10)
+    parser.add_argument("--hidden-dim", type=int, default=64)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 64])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--cold-starts", type=int, default=3)
+    parser.add_argument("--formats", nargs="+", choices=sorted(ARTIFACT_NAMES), default=["eager", "torchscript", "onnx"])
+    parser.add_argument("--quantize", action="store_true", help="Also benchmark int8 eager/torchscript exports")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        model_dir = work_dir / "trained"
+        model_dir.mkdir()
+        metadata = ModelMetadata(
+            input_dim=args.features, output_dim=1, problem_type="classification", hidden_dim=args.hidden_dim
+        )
+        torch.manual_seed(0)
+        torch.save(metadata.build_model().state_dict(), model_dir / "model.pt")
+        metadata.save(model_dir)
+        X = np.random.default_rng(1).normal(size=(1000, args.features)).astype(np.float32)
+        pd.DataFrame(X, columns=[f"feature_{i}" for i in range(args.features)]).assign(label=(X[:, 0] > 0).astype(int)).to_csv(
+            model_dir / "validation.csv", index=False
+        )
+        variants = [(f, None) for f in args.formats]
+        if args.quantize:
+            variants += [(f, "int8") for f in args.formats if f != "onnx"]
+
+        print(f"{'format':18s} " + " ".join(f"{f'p50 bs={b} (ms)':>16s}" for b in args.batch_sizes) + f" {'cold start (s)':>16s} {'size (KiB)':>12s}")
+        for export_format, quantize in variants:
+            name = f"{export_format}+{quantize}" if quantize else export_format
+            if export_format == "onnx" and importlib.util.find_spec("onnxruntime") is None:
+                print(f"{name:18s} skipped (pip install '.[onnx]')")
+                continue
+            serving_dir = _export(model_dir, work_dir, export_format, quantize)
+            size = (serving_dir / ARTIFACT_NAMES[export_format]).stat().st_size
+            handler = _load_handler(serving_dir / "code")
+            model = handler.model_fn(str(serving_dir))
+            latencies = [_latency_ms(handler, model, args.features, b, args.requests) for b in args.batch_sizes]
+            cold = _cold_start_s(serving_dir, args.features, args.cold_starts)
+            print(
+                f"{name:18s} " + " ".join(f"{ms:>16.4f}" for ms in latencies) + f" {cold:>16.3f} {size / 1024:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Rows/sec of the SageMaker inference handler versus the previous pandas/tolist handler.
+
+Usage: python -m benchmarks.bench_inference --rows 200000 --features 10
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+
+from src.model import inference
+from src.model.nn import SimpleMLP
+
+
+def legacy_input_fn(input_data, content_type):
+    if content_type == "text/csv":
+        df = pd.read_csv(io.StringIO(input_data), header=None)
+        return torch.tensor(df.values, dtype=torch.float32)
+    payload = json.loads(input_data)
+    arr = np.array(payload["data"], dtype=np.float32)
+    return torch.tensor(arr)
+
+
+def legacy_predict_fn(data, model):
+    with torch.no_grad():
+        preds = model(data)
+    return preds.numpy().tolist()
+
+
+def legacy_output_fn(prediction, accept):
+    return json.dumps({"predictions": prediction})
+
+
+def _best_of(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--features", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    X = np.random.default_rng(0).normal(size=(args.rows, args.features)).astype(np.float32)
+    csv_buf = io.StringIO()
+    np.savetxt(csv_buf, X, delimiter=",", fmt="%.6f")
+    payloads = {
+        "text/csv": csv_buf.getvalue(),
+        "application/json": json.dumps({"data": X.tolist()}),
+    }
+    npy_buf = io.BytesIO()
+    np.save(npy_buf, X)
+    model = SimpleMLP(input_dim=args.features).eval()
+
+    cases = [
+        (f"legacy {ct} -> json", lambda ct=ct: legacy_output_fn(legacy_predict_fn(legacy_input_fn(payloads[ct], ct), model), "application/json"))
+        for ct in payloads
+    ]
+    cases += [
+        (f"handler {ct} -> json", lambda ct=ct: inference.output_fn(inference.predict_fn(inference.input_fn(payloads[ct], ct), model), "application/json"))
+        for ct in payloads
+    ]
+    cases.append(
+        (
+            "handler npy -> npy",
+            lambda: inference.output_fn(
+                inference.predict_fn(inference.input_fn(npy_buf.getvalue(), "application/x-npy"), model), "application/x-npy"
+            ),
+        )
+    )
+    for name, fn in cases:
+        seconds = _best_of(fn, args.repeats)
+        print(f"{name:40s} {args.rows / seconds:>14,.0f} rows/s  ({seconds * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Closed-loop load test of the model server with and without dynamic batching.
+
+Usage: python -m benchmarks.load_test_batching --clients 32 --requests 200
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import threading
+import time
+
+import numpy as np
+import torch
+
+from src.model.nn import SimpleMLP
+from src.model.serve import create_server
+
+
+def _client(port: int, n_requests: int, body: bytes, latencies: list) -> None:
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    for _ in range(n_requests):
+        start = time.perf_counter()
+        conn.request("POST", "/invocations", body=body, headers={"Content-Type": "text/csv", "Accept": "application/json"})
+        response = conn.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"Unexpected status {response.status}")
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def run(model, clients: int, requests: int, dynamic_batching: bool, max_batch_size: int, max_delay_ms: float, features: int):
+    server, batcher = create_server(
+        model, host="127.0.0.1", port=0, dynamic_batching=dynamic_batching, max_batch_size=max_batch_size, max_delay_ms=max_delay_ms
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    body = ",".join(["0.5"] * features).encode("utf-8")
+    latencies: list = []
+    workers = [
+        threading.Thread(target=_client, args=(server.server_address[1], requests, body, latencies)) for _ in range(clients)
+    ]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+    server.server_close()
+    if batcher:
+        batcher.close()
+    lat_ms = np.array(latencies) * 1000
+    return len(latencies) / elapsed, np.percentile(lat_ms, 50), np.percentile(lat_ms, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per client")
+    parser.add_argument("--features", type=int, default=10)
+    parser.add_argument("--hidden-dim", type=int, default=64)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-delay-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    model = SimpleMLP(input_dim=args.features, hidden_dim=args.hidden_dim).eval()
+    for enabled in (False, True):
+        qps, p50, p99 = run(model, args.clients, args.requests, enabled, args.max_batch_size, args.max_delay_ms, args.features)
+        label = "dynamic batching" if enabled else "per-request"
+        print(f"{label:18s} {qps:>9,.0f} req/s  p50 {p50:6.2f} ms  p99 {p99:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,13 @@
-from aws_cdk import Duration, Stack, aws_events as events, aws_events_targets as targets, aws_lambda as _lambda
+from aws_cdk import (
+    Duration,
+    RemovalPolicy,
+    Stack,
+    aws_dynamodb as dynamodb,
+    aws_events as events,
+    aws_events_targets as targets,
+    aws_iam as iam,
+    aws_lambda as _lambda,
+)
 from constructs import Construct
 
 
@@ -16,6 +25,29 @@ class EventBridgeStack(Stack):
     ) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
+        # Buffers object-created events per dataset prefix so a bulk upload starts one execution.
+        coalesce_table = dynamodb.Table(
+            self,
+            "DatasetEventBuffer",
+            partition_key=dynamodb.Attribute(name="prefix", type=dynamodb.AttributeType.STRING),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            # Started rows carry an expiry (DynamoDBEventBuffer stamps it on claim) so the
+            # periodic flush scan stays small.
+            time_to_live_attribute="expires_at",
+            removal_policy=RemovalPolicy.DESTROY,
+        )
+        # Attached from this stack so the IAM stack does not depend on the table.
+        iam.Policy(
+            self,
+            "TriggerLambdaBufferPolicy",
+            statements=[
+                iam.PolicyStatement(
+                    actions=["dynamodb:GetItem", "dynamodb:UpdateItem", "dynamodb:Scan"],
+                    resources=[coalesce_table.table_arn],
+                )
+            ],
+        ).attach_to_role(lambda_role)
+
         lambda_fn = _lambda.Function(
             self,
             "TriggerLambda",
@@ -28,9 +60,16 @@ class EventBridgeStack(Stack):
                 "BUCKET_NAME": bucket.bucket_name,
                 "PIPELINE_NAME": f"{project_name}-pipeline",
                 "SAGEMAKER_ROLE_ARN": sagemaker_role.role_arn,
+                "COALESCE_TABLE": coalesce_table.table_name,
+                "COALESCE_QUIET_SECONDS": "300",
             },
         )
 
+        flush_rule = events.Rule(self, "CoalesceFlushRule", schedule=events.Schedule.rate(Duration.minutes(1)))
+        flush_rule.add_target(
+            targets.LambdaFunction(lambda_fn, event=events.RuleTargetInput.from_object({"action": "flush"}))
+        )
+
         schedule_rule = events.Rule(
             self,
             "MonthlyRetrainRule",
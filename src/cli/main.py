@@ -1,21 +1,16 @@
 from __future__ import annotations
 
+import json
 import subprocess
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import typer
 
 from src.common.config import ProjectConfig, load_yaml
-from src.data.generate_dummy import generate_dummy_dataset
-from src.data.upload_to_s3 import upload_dataset
-from src.model.export import export_model_artifacts
-from src.model.train import train_model, save_artifacts
-from src.sagemaker.autopilot.create_job import create_autopilot_job
-from src.sagemaker.autopilot.monitor_job import monitor_job
-from src.sagemaker.autopilot.select_best_model import select_best_candidate
-from src.sagemaker.pipelines.run_pipeline import start_pipeline_execution, upsert_pipeline
 
+# Commands import torch, pandas, boto3 and sagemaker inside their bodies so `mlops --help` and
+# the lightweight AWS commands start without paying for dependencies they never use.
 app = typer.Typer(name="mlops", help="MLOps CLI for auto-retrain template")
 
 
@@ -25,6 +20,8 @@ def gen_data(
     n_rows: int = typer.Option(1000, help="Number of rows"),
     out: Path = typer.Option(Path("data/generated"), help="Output directory"),
 ):
+    from src.data.generate_dummy import generate_dummy_dataset
+
     generate_dummy_dataset(out, n_rows, problem_type)
     typer.echo(f"Generated data at {out}")
 
@@ -34,6 +31,8 @@ def upload_data(
     dataset_dir: Path = typer.Option(..., help="Local dataset directory"),
     problem_type: str = typer.Option("classification"),
 ):
+    from src.data.upload_to_s3 import upload_dataset
+
     project = ProjectConfig.load("configs/project.yaml", tags_path="configs/tags.yaml")
     s3_paths = load_yaml("configs/s3_paths.yaml")
     dataset_id = upload_dataset(dataset_dir, project.s3_bucket_name, s3_paths["datasets_prefix"], problem_type)
@@ -46,25 +45,74 @@ def train_local(
     problem_type: str = typer.Option("classification"),
     epochs: int = typer.Option(3),
     run_id: Optional[str] = typer.Option(None),
+    data_mode: str = typer.Option("memory", help="memory, resident or streaming"),
+    chunksize: int = typer.Option(65536, help="Rows per CSV chunk in streaming mode"),
+    cache_dir: Optional[Path] = typer.Option(None, help="Memory-mapped dataset cache directory"),
+    num_workers: Optional[int] = typer.Option(None, help="DataLoader workers (auto if unset)"),
+    pin_memory: bool = typer.Option(False),
+    persistent_workers: Optional[bool] = typer.Option(None),
+    prefetch_factor: Optional[int] = typer.Option(None),
+    num_threads: Optional[int] = typer.Option(None, help="Intra-op threads (auto if unset)"),
+    num_interop_threads: Optional[int] = typer.Option(None, help="Inter-op threads (auto if unset)"),
+    precision: str = typer.Option("fp32", help="fp32 or bf16 (bfloat16 autocast, fp32 fallback)"),
 ):
+    from src.model.parallel import ParallelConfig
+    from src.model.train import resolve_parallel, save_artifacts, train_model
+
     train_csv = dataset_dir / "data.csv"
     val_csv = dataset_dir / "data.csv"
-    model, metrics = train_model(train_csv, val_csv, problem_type=problem_type, epochs=epochs)
-    save_artifacts(model, metrics, Path("artifacts"))
+    parallel = ParallelConfig(
+        num_workers=num_workers,
+        pin_memory=pin_memory,
+        persistent_workers=persistent_workers,
+        prefetch_factor=prefetch_factor,
+        num_threads=num_threads,
+        num_interop_threads=num_interop_threads,
+    )
+    parallel = resolve_parallel(parallel, data_mode)
+    parallel.apply_threads()
+    model, metrics, artifacts = train_model(
+        train_csv,
+        val_csv,
+        problem_type=problem_type,
+        epochs=epochs,
+        data_mode=data_mode,
+        chunksize=chunksize,
+        cache_dir=cache_dir,
+        parallel=parallel,
+        precision=precision,
+    )
+    save_artifacts(model, metrics, Path("artifacts"), artifacts)
     typer.echo(f"Training complete metrics={metrics}")
 
 
 @app.command("export-model")
-def export_model(run_id: str = typer.Option("run-default")):
+def export_model(
+    run_id: str = typer.Option("run-default"),
+    export_format: str = typer.Option("eager", "--format", help="eager, torchscript or onnx"),
+    quantize: Optional[str] = typer.Option(None, help="int8: dynamic quantization, gated on --validation-csv"),
+    validation_csv: Optional[Path] = typer.Option(None),
+    max_metric_delta: float = typer.Option(0.01, help="Largest tolerated accuracy drop (relative RMSE rise)"),
+):
+    from src.model.export import export_model_artifacts
+
     model_path = Path("artifacts") / run_id / "model.pt"
-    export_model_artifacts(model_path, Path("artifacts") / run_id / "export")
+    export_model_artifacts(
+        model_path,
+        Path("artifacts") / run_id / "export",
+        export_format=export_format,
+        quantize=quantize,
+        validation_csv=validation_csv,
+        max_metric_delta=max_metric_delta,
+    )
     typer.echo("Exported model artifacts")
 
 
 @app.command("pipeline-upsert")
 def pipeline_upsert():
-    definition = upsert_pipeline()
-    typer.echo(definition)
+    from src.sagemaker.pipelines.run_pipeline import upsert_pipeline
+
+    typer.echo(json.dumps(upsert_pipeline(), indent=2))
 
 
 @app.command("pipeline-run")
@@ -72,13 +120,18 @@ def pipeline_run(
     dataset_s3: str = typer.Option(...),
     problem_type: str = typer.Option("classification"),
     metric_threshold: float = typer.Option(0.7),
+    force: bool = typer.Option(False, help="Start even if a matching model is already registered"),
 ):
-    arn = start_pipeline_execution(dataset_s3, problem_type, metric_threshold)
-    typer.echo(arn)
+    from src.sagemaker.pipelines.run_pipeline import start_pipeline_execution
+
+    arn = start_pipeline_execution(dataset_s3, problem_type, metric_threshold, force=force)
+    typer.echo(arn or "Skipped: this dataset and code version already produced a registered model")
 
 
 @app.command("autopilot-run")
 def autopilot_run(dataset_s3: str = typer.Option(...), problem_type: str = typer.Option("classification")):
+    from src.sagemaker.autopilot.create_job import create_autopilot_job
+
     config = load_yaml("configs/autopilot.yaml")
     project = ProjectConfig.load("configs/project.yaml", tags_path="configs/tags.yaml")
     job_name = f"{config['autopilot_job_prefix']}-{problem_type}"
@@ -98,16 +151,52 @@ def autopilot_run(dataset_s3: str = typer.Option(...), problem_type: str = typer
     typer.echo(f"Started AutoPilot job {job_name}")
 
 
+def _monitor(targets, events_queue_url: Optional[str]):
+    import asyncio
+
+    from src.sagemaker.autopilot.monitor_job import sqs_events, watch
+
+    async def run():
+        events = sqs_events(events_queue_url) if events_queue_url else None
+        async for change in watch(targets, events=events):
+            typer.echo(f"{change.target.kind} {change.target.name}: {change.status} {change.secondary_status}".rstrip())
+
+    asyncio.run(run())
+
+
 @app.command("autopilot-monitor")
-def autopilot_monitor(job_name: str = typer.Option(...)):
-    resp = monitor_job(job_name)
-    typer.echo(resp)
+def autopilot_monitor(
+    job_name: List[str] = typer.Option(..., help="Repeat to watch several jobs at once"),
+    events_queue_url: Optional[str] = typer.Option(None, help="SQS queue receiving SageMaker EventBridge events"),
+):
+    from src.sagemaker.autopilot.monitor_job import Target
+
+    _monitor([Target.autopilot(name) for name in job_name], events_queue_url)
+
+
+@app.command("pipeline-monitor")
+def pipeline_monitor(
+    execution_arn: List[str] = typer.Option(..., help="Repeat to watch several executions at once"),
+    events_queue_url: Optional[str] = typer.Option(None, help="SQS queue receiving SageMaker EventBridge events"),
+):
+    from src.sagemaker.autopilot.monitor_job import Target
+
+    _monitor([Target.pipeline(arn) for arn in execution_arn], events_queue_url)
 
 
 @app.command("autopilot-select")
-def autopilot_select(job_name: str = typer.Option(...)):
-    result = select_best_candidate(job_name)
-    typer.echo(result)
+def autopilot_select(
+    job_name: List[str] = typer.Option(..., help="Repeat to select across several jobs"),
+    top_k: int = typer.Option(1),
+    minimize: bool = typer.Option(False, help="Objective is minimized (e.g. MSE)"),
+):
+    from src.sagemaker.autopilot.select_best_model import select_best_candidate, select_top_k
+
+    if len(job_name) == 1 and top_k == 1:
+        typer.echo(select_best_candidate(job_name[0], minimize=minimize))
+    else:
+        for result in select_top_k(job_name, k=top_k, minimize=minimize):
+            typer.echo(result)
 
 
 @app.command("infra-deploy")
@@ -1,16 +1,36 @@
 from __future__ import annotations
 
+import functools
+import hashlib
 import logging
 import os
 import pathlib
-import shutil
-from typing import Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
 
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import NoCredentialsError
 
 logger = logging.getLogger(__name__)
 
+MB = 1024 * 1024
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=64 * MB,
+    multipart_chunksize=64 * MB,
+    max_concurrency=4,
+    use_threads=True,
+)
+
+
+@dataclass
+class SyncResult:
+    transferred: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+
 
 def get_boto3_session() -> boto3.session.Session:
     profile = os.getenv("AWS_PROFILE")
@@ -23,6 +43,18 @@ def get_boto3_session() -> boto3.session.Session:
         raise RuntimeError("AWS credentials not configured") from exc
 
 
+@functools.lru_cache(maxsize=None)
+def _cached_s3_client(profile: Optional[str], region: Optional[str]):
+    # Sized for DEFAULT_MAX_WORKERS files, each with up to max_concurrency part transfers.
+    pool_size = DEFAULT_MAX_WORKERS * DEFAULT_TRANSFER_CONFIG.max_concurrency
+    return get_boto3_session().client("s3", config=Config(max_pool_connections=pool_size))
+
+
+def get_s3_client():
+    """Return a process-wide S3 client; boto3 clients are thread-safe and reuse connections."""
+    return _cached_s3_client(os.getenv("AWS_PROFILE"), os.getenv("AWS_REGION"))
+
+
 def parse_s3_uri(s3_uri: str) -> Tuple[str, str]:
     if not s3_uri.startswith("s3://"):
         raise ValueError("S3 URI must start with s3://")
@@ -32,32 +64,132 @@ def parse_s3_uri(s3_uri: str) -> Tuple[str, str]:
     return bucket, prefix
 
 
-def s3_upload_dir(local_dir: str | pathlib.Path, s3_uri: str) -> None:
-    session = get_boto3_session()
-    s3 = session.resource("s3")
+def local_etag(path: str | pathlib.Path, config: TransferConfig = DEFAULT_TRANSFER_CONFIG) -> str:
+    """Compute the ETag S3 assigns to ``path`` when uploaded with ``config`` (no SSE-KMS)."""
+    digests = []
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(config.multipart_chunksize), b""):
+            digests.append(hashlib.md5(chunk, usedforsecurity=False).digest())
+    size = pathlib.Path(path).stat().st_size
+    if size < config.multipart_threshold:
+        return digests[0].hex() if digests else hashlib.md5(b"", usedforsecurity=False).hexdigest()
+    combined = hashlib.md5(b"".join(digests), usedforsecurity=False).hexdigest()
+    return f"{combined}-{len(digests)}"
+
+
+def _same_size(path: pathlib.Path, size: int) -> bool:
+    """Cheap pre-check on the listing thread; only same-size files need their ETag computed."""
+    try:
+        return path.stat().st_size == size
+    except FileNotFoundError:
+        return False
+
+
+def _sync_job(
+    path: pathlib.Path, etag: Optional[str], config: TransferConfig, transfer: Callable[[], None]
+) -> bool:
+    """Run ``transfer`` unless ``path`` already has ``etag``; returns whether it transferred.
+
+    The MD5 pass runs here, on a pool thread, so hashing overlaps with other transfers.
+    """
+    if etag is not None and local_etag(path, config) == etag.strip('"'):
+        return False
+    transfer()
+    return True
+
+
+def _list_objects(client, bucket: str, prefix: str) -> Dict[str, Tuple[int, str]]:
+    objects: Dict[str, Tuple[int, str]] = {}
+    paginator = client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            objects[obj["Key"]] = (obj["Size"], obj["ETag"])
+    return objects
+
+
+def _run_transfers(jobs: List[Tuple[str, Callable[[], bool]]], max_workers: int) -> SyncResult:
+    """Run ``(key, job)`` pairs concurrently; each job returns whether it transferred."""
+    result = SyncResult()
+    if not jobs:
+        return result
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="s3-transfer") as pool:
+        futures = [pool.submit(fn) for _, fn in jobs]
+        for future in as_completed(futures):
+            future.result()
+    for (key, _), future in zip(jobs, futures):
+        (result.transferred if future.result() else result.skipped).append(key)
+    return result
+
+
+def s3_upload_dir(
+    local_dir: str | pathlib.Path,
+    s3_uri: str,
+    sync: bool = True,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    config: TransferConfig = DEFAULT_TRANSFER_CONFIG,
+) -> SyncResult:
+    """Upload ``local_dir`` under ``s3_uri`` concurrently.
+
+    With ``sync`` the destination prefix is listed once and files whose size and ETag already
+    match are skipped; ETags are only computed for same-size files, on the transfer threads.
+    """
+    client = get_s3_client()
     bucket_name, prefix = parse_s3_uri(s3_uri)
     local_path = pathlib.Path(local_dir)
     if not local_path.exists():
         raise FileNotFoundError(f"Local directory {local_dir} not found")
-    for file_path in local_path.rglob("*"):
-        if file_path.is_file():
-            rel = file_path.relative_to(local_path)
-            key = f"{prefix.rstrip('/')}/{rel.as_posix()}"
-            logger.info("Uploading %s to s3://%s/%s", file_path, bucket_name, key)
-            s3.Object(bucket_name, key).upload_file(str(file_path))
+    prefix = prefix.rstrip("/")
+    remote = _list_objects(client, bucket_name, f"{prefix}/" if prefix else "") if sync else {}
+    jobs = []
+    for file_path in sorted(local_path.rglob("*")):
+        if not file_path.is_file():
+            continue
+        rel = file_path.relative_to(local_path).as_posix()
+        key = f"{prefix}/{rel}" if prefix else rel
+        size, etag = remote.get(key, (None, None))
+        upload = functools.partial(client.upload_file, str(file_path), bucket_name, key, Config=config)
+        known_etag = etag if _same_size(file_path, size) else None
+        jobs.append((key, functools.partial(_sync_job, file_path, known_etag, config, upload)))
+    result = _run_transfers(jobs, max_workers)
+    for key in result.transferred:
+        logger.info("Uploaded s3://%s/%s", bucket_name, key)
+    return result
+
 
+def s3_download_dir(
+    s3_uri: str,
+    local_dir: str | pathlib.Path,
+    sync: bool = True,
+    delete: bool = True,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    config: TransferConfig = DEFAULT_TRANSFER_CONFIG,
+) -> SyncResult:
+    """Download every object under ``s3_uri`` into ``local_dir`` concurrently.
 
-def s3_download_dir(s3_uri: str, local_dir: str | pathlib.Path) -> None:
-    session = get_boto3_session()
-    s3 = session.resource("s3")
+    With ``sync`` local files whose size and ETag match the object are kept; otherwise every
+    object is fetched again. ``delete`` (the default) removes local files that do not exist
+    remotely, so ``local_dir`` ends up holding exactly the objects under ``s3_uri``.
+    """
+    client = get_s3_client()
     bucket_name, prefix = parse_s3_uri(s3_uri)
-    bucket = s3.Bucket(bucket_name)
+    prefix = prefix.rstrip("/")
     local_path = pathlib.Path(local_dir)
-    if local_path.exists():
-        shutil.rmtree(local_path)
     local_path.mkdir(parents=True, exist_ok=True)
-    for obj in bucket.objects.filter(Prefix=prefix.rstrip("/") + "/"):
-        target = local_path / pathlib.Path(obj.key).relative_to(prefix)
+    jobs, expected = [], set()
+    for key, (size, etag) in _list_objects(client, bucket_name, f"{prefix}/" if prefix else "").items():
+        if key.endswith("/"):
+            continue
+        target = local_path / pathlib.Path(key).relative_to(prefix)
+        expected.add(target)
         target.parent.mkdir(parents=True, exist_ok=True)
-        logger.info("Downloading s3://%s/%s to %s", bucket_name, obj.key, target)
-        bucket.download_file(obj.key, str(target))
+        download = functools.partial(client.download_file, bucket_name, key, str(target), Config=config)
+        known_etag = etag if sync and _same_size(target, size) else None
+        jobs.append((key, functools.partial(_sync_job, target, known_etag, config, download)))
+    result = _run_transfers(jobs, max_workers)
+    for key in result.transferred:
+        logger.info("Downloaded s3://%s/%s", bucket_name, key)
+    if delete:
+        for stale in (p for p in local_path.rglob("*") if p.is_file() and p not in expected):
+            logger.info("Removing %s (not in s3://%s/%s)", stale, bucket_name, prefix)
+            stale.unlink()
+    return result
@@ -1,47 +1,161 @@
+"""Project configuration loading.
+
+YAML files are parsed once per process: :class:`ConfigRegistry` caches each file by its
+resolved path and ``(mtime, size)`` and returns the parsed content frozen (mappings become
+read-only ``MappingProxyType`` views, lists become tuples), so cached objects can be shared
+safely. A file is re-``stat``-ed at most every ``revalidate_s`` seconds, so a warm Lambda or
+a long-running service reads config from memory; edits are picked up after that interval.
+"""
 import os
+import re
+import threading
+import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
 
 import yaml
 
+# ${VAR} placeholders; a string may contain several.
+_PLACEHOLDER = re.compile(r"\$\{([^}]+)\}")
+DEFAULT_REVALIDATE_S = 1.0
+
 
-def load_yaml(path: str | Path) -> Dict[str, Any]:
-    with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+def freeze(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
 
 
-def resolve_env(value: Any) -> Any:
-    if isinstance(value, str) and value.startswith("${") and value.endswith("}"):
-        env_key = value.strip("${}")
-        return os.getenv(env_key, "")
-    if isinstance(value, str) and "${" in value:
-        parts = value.split("${")
-        base = parts[0]
-        env_part = parts[1].split("}")[0]
-        rest = parts[1].split("}")[1]
-        return base + os.getenv(env_part, "") + rest
-    if isinstance(value, dict):
-        return {k: resolve_env(v) for k, v in value.items()}
+def thaw(value: Any) -> Any:
+    """Plain ``dict``/``list`` copy of a frozen config value."""
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
     return value
 
 
 @dataclass
+class _Entry:
+    stamp: Tuple[int, int]
+    checked_at: float
+    value: Any
+
+
+class ConfigRegistry:
+    def __init__(self, revalidate_s: float = DEFAULT_REVALIDATE_S, clock=time.monotonic):
+        self.revalidate_s = revalidate_s
+        self.clock = clock
+        self._entries: Dict[Path, _Entry] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _stamp(path: Path) -> Tuple[int, int]:
+        stat = path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def stamp(self, path: str | Path) -> Tuple[int, int]:
+        """Current ``(mtime_ns, size)`` of ``path`` as seen by the cache (loading it if needed)."""
+        key = Path(path).resolve()
+        self.load(key)
+        return self._entries[key].stamp
+
+    def load(self, path: str | Path) -> Any:
+        key = Path(path).resolve()
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.checked_at < self.revalidate_s:
+                return entry.value
+        stamp = self._stamp(key)
+        if entry is not None and entry.stamp == stamp:
+            entry.checked_at = now
+            return entry.value
+        with open(key, "r", encoding="utf-8") as f:
+            value = freeze(yaml.safe_load(f))
+        with self._lock:
+            self._entries[key] = _Entry(stamp, now, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+REGISTRY = ConfigRegistry()
+
+
+def load_yaml(path: str | Path) -> Any:
+    """Parsed (frozen, cached) content of a YAML file; use :func:`thaw` for a mutable copy."""
+    return REGISTRY.load(path)
+
+
+def resolve_env(value: Any, environ: Optional[Mapping[str, str]] = None) -> Any:
+    """Replace every ``${VAR}`` in strings (recursively) with the environment value, or ``""``."""
+    environ = os.environ if environ is None else environ
+    if isinstance(value, str):
+        if "${" not in value:
+            return value
+        return _PLACEHOLDER.sub(lambda m: environ.get(m.group(1), ""), value)
+    if isinstance(value, Mapping):
+        return {k: resolve_env(v, environ) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [resolve_env(v, environ) for v in value]
+    return value
+
+
+def placeholders(value: Any) -> Tuple[str, ...]:
+    """Sorted names of all ``${VAR}`` placeholders in ``value``."""
+    if isinstance(value, str):
+        return tuple(sorted(set(_PLACEHOLDER.findall(value))))
+    if isinstance(value, Mapping):
+        value = tuple(value.values())
+    if isinstance(value, (list, tuple)):
+        return tuple(sorted({name for v in value for name in placeholders(v)}))
+    return ()
+
+
+@dataclass(frozen=True)
 class ProjectConfig:
     project_name: str
     aws_region: str
     s3_bucket_name: str
     sagemaker_execution_role_arn: str
     model_package_group_name: str
-    default_tags: dict
+    default_tags: Mapping[str, Any]
     environment_name: str
 
     @classmethod
     def load(cls, path: str | Path, tags_path: str | Path | None = None) -> "ProjectConfig":
-        raw = load_yaml(path)
-        tags = load_yaml(tags_path) if tags_path else {}
+        """Cached per file versions and the values of the environment variables referenced."""
+        raw = REGISTRY.load(path)
+        tags = REGISTRY.load(tags_path) if tags_path else MappingProxyType({})
+        names = placeholders(raw)
+        key = (
+            Path(path).resolve(),
+            REGISTRY.stamp(path),
+            Path(tags_path).resolve() if tags_path else None,
+            REGISTRY.stamp(tags_path) if tags_path else None,
+            tuple(os.environ.get(name) for name in names),
+        )
+        with _PROJECT_LOCK:
+            cached = _PROJECT_CACHE.get(key)
+        if cached is not None:
+            return cached
+        raw = dict(raw)
         raw["default_tags"] = raw.get("default_tags", {})
         if raw["default_tags"] == "${tags}":
             raw["default_tags"] = tags
         resolved = {k: resolve_env(v) for k, v in raw.items()}
-        return cls(**resolved)
+        config = cls(**freeze(resolved))
+        with _PROJECT_LOCK:
+            _PROJECT_CACHE[key] = config
+        return config
+
+
+_PROJECT_CACHE: Dict[tuple, ProjectConfig] = {}
+_PROJECT_LOCK = threading.Lock()
@@ -0,0 +1,107 @@
+"""Best-epoch checkpoint tracking for training loops."""
+from __future__ import annotations
+
+import bisect
+import pathlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import torch
+from torch import nn
+
+from src.common.logging import configure_logging
+
+logger = configure_logging(__name__)
+
+
+@dataclass
+class Snapshot:
+    epoch: int
+    score: float
+    state: Dict[str, torch.Tensor]
+    path: Optional[pathlib.Path] = None
+    spill: Optional[Future] = field(default=None, repr=False)
+
+    def wait(self) -> None:
+        if self.spill is not None:
+            self.spill.result()
+            self.spill = None
+
+
+class CheckpointManager:
+    """Keep detached snapshots of the ``top_k`` lowest-scoring epochs.
+
+    Snapshots are real copies, so later optimizer steps cannot mutate them. Buffers are
+    allocated at most ``top_k`` times and recycled when a better epoch evicts the worst one,
+    and epochs that do not enter the top-k cost nothing. ``half_precision`` stores floating
+    point tensors as float16. With ``spill_dir`` every kept snapshot is also written to disk
+    on a background thread; files of evicted epochs are removed.
+    """
+
+    def __init__(self, top_k: int = 1, half_precision: bool = False, spill_dir: str | pathlib.Path | None = None):
+        if top_k < 1:
+            raise ValueError("top_k must be at least 1")
+        self.top_k = top_k
+        self.half_precision = half_precision
+        self.spill_dir = pathlib.Path(spill_dir) if spill_dir else None
+        self._snapshots: List[Snapshot] = []
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ckpt-spill") if self.spill_dir else None
+
+    @property
+    def snapshots(self) -> List[Snapshot]:
+        return list(self._snapshots)
+
+    @property
+    def best(self) -> Optional[Snapshot]:
+        return self._snapshots[0] if self._snapshots else None
+
+    def _storage_dtype(self, tensor: torch.Tensor) -> torch.dtype:
+        if self.half_precision and tensor.is_floating_point():
+            return torch.float16
+        return tensor.dtype
+
+    def _copy_state(self, model: nn.Module, into: Optional[Dict[str, torch.Tensor]] = None) -> Dict[str, torch.Tensor]:
+        state = model.state_dict()
+        with torch.no_grad():
+            if into is None:
+                return {k: v.detach().to(self._storage_dtype(v), copy=True) for k, v in state.items()}
+            for k, v in state.items():
+                into[k].copy_(v)
+        return into
+
+    def update(self, model: nn.Module, epoch: int, score: float) -> bool:
+        """Snapshot ``model`` if ``score`` ranks in the top-k; return whether it was kept."""
+        scores = [s.score for s in self._snapshots]
+        if len(self._snapshots) >= self.top_k and score >= scores[-1]:
+            return False
+        if len(self._snapshots) >= self.top_k:
+            evicted = self._snapshots.pop()
+            evicted.wait()
+            if evicted.path is not None:
+                evicted.path.unlink(missing_ok=True)
+            snapshot = Snapshot(epoch, score, self._copy_state(model, into=evicted.state))
+        else:
+            snapshot = Snapshot(epoch, score, self._copy_state(model))
+        self._snapshots.insert(bisect.bisect_right(scores[: len(self._snapshots)], score), snapshot)
+        if self._executor is not None:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            snapshot.path = self.spill_dir / f"epoch-{epoch:04d}.pt"
+            payload = {"epoch": epoch, "score": score, "state_dict": snapshot.state}
+            snapshot.spill = self._executor.submit(torch.save, payload, snapshot.path)
+        return True
+
+    def restore(self, model: nn.Module) -> Optional[Snapshot]:
+        """Load the best snapshot into ``model``, casting back to the model's dtypes."""
+        best = self.best
+        if best is None:
+            return None
+        model.load_state_dict(best.state)
+        logger.info("Restored best epoch %s (score %.4f)", best.epoch, best.score)
+        return best
+
+    def close(self) -> None:
+        for snapshot in self._snapshots:
+            snapshot.wait()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
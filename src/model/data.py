@@ -0,0 +1,122 @@
+"""Streaming and tensor-resident datasets for training, built on :mod:`src.model.tables`."""
+from __future__ import annotations
+
+import pathlib
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+import torch
+from torch.utils.data import IterableDataset, get_worker_info
+
+from src.model.tables import DEFAULT_CHUNKSIZE, LABEL_COLUMN, iter_chunks
+
+
+class StreamingTabularDataset(IterableDataset):
+    """Stream minibatches from a CSV without materialising the full matrix.
+
+    Rows are read ``chunksize`` at a time and shuffled through a buffer of at most
+    ``shuffle_buffer`` rows, so peak memory is bounded by ``chunksize + shuffle_buffer``
+    regardless of file size. Each item is an already collated ``(X, y)`` batch, so wrap it
+    with ``DataLoader(dataset, batch_size=None)``. With multiple loader workers, chunks are
+    dealt round-robin across workers. The shuffle seed advances on every pass, so shuffling
+    also varies per epoch inside persistent workers that never see :meth:`set_epoch`.
+
+    For distributed training, ``num_replicas`` and ``rank`` deal chunks round-robin across
+    ranks as well, so each rank streams a disjoint share of the file.
+    """
+
+    def __init__(
+        self,
+        csv_path: str | pathlib.Path,
+        batch_size: int = 64,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+        shuffle_buffer: int = 0,
+        seed: int = 42,
+        label_dtype: Optional[type] = None,
+        label_column: str = LABEL_COLUMN,
+        num_replicas: int = 1,
+        rank: int = 0,
+    ):
+        super().__init__()
+        self.csv_path = csv_path
+        self.batch_size = batch_size
+        self.chunksize = chunksize
+        self.shuffle_buffer = shuffle_buffer
+        self.seed = seed
+        self.label_dtype = label_dtype
+        self.label_column = label_column
+        self.num_replicas = num_replicas
+        self.rank = rank
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int) -> None:
+        self.epoch = epoch
+
+    def _shard_chunks(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        info = get_worker_info()
+        worker_id, num_workers = (info.id, info.num_workers) if info else (0, 1)
+        shard, num_shards = self.rank * num_workers + worker_id, self.num_replicas * num_workers
+        chunks = iter_chunks(self.csv_path, self.chunksize, self.label_column, self.label_dtype)
+        for i, chunk in enumerate(chunks):
+            if i % num_shards == shard:
+                yield chunk
+
+    def _batches(self, X: np.ndarray, y: np.ndarray, rng, keep_remainder: bool):
+        if rng is not None:
+            order = rng.permutation(len(X))
+            X, y = X[order], y[order]
+        n_full = (len(X) // self.batch_size) * self.batch_size
+        for start in range(0, n_full, self.batch_size):
+            stop = start + self.batch_size
+            yield torch.from_numpy(X[start:stop]), torch.from_numpy(y[start:stop])
+        if keep_remainder:
+            return X[n_full:], y[n_full:]
+        if n_full < len(X):
+            yield torch.from_numpy(X[n_full:]), torch.from_numpy(y[n_full:])
+        return X[:0], y[:0]
+
+    def __iter__(self):
+        info = get_worker_info()
+        worker_id, num_workers = (info.id, info.num_workers) if info else (0, 1)
+        shard = self.rank * num_workers + worker_id
+        rng = np.random.default_rng((self.seed, self.epoch, shard)) if self.shuffle_buffer else None
+        self.epoch += 1
+        buffer_x: List[np.ndarray] = []
+        buffer_y: List[np.ndarray] = []
+        buffered = 0
+        for X, y in self._shard_chunks():
+            buffer_x.append(X)
+            buffer_y.append(y)
+            buffered += len(X)
+            if buffered < max(self.shuffle_buffer, self.batch_size):
+                continue
+            rest_x, rest_y = yield from self._batches(
+                np.concatenate(buffer_x), np.concatenate(buffer_y), rng, keep_remainder=True
+            )
+            buffer_x, buffer_y, buffered = [rest_x], [rest_y], len(rest_x)
+        if buffered:
+            yield from self._batches(np.concatenate(buffer_x), np.concatenate(buffer_y), rng, keep_remainder=False)
+
+
+class ResidentBatches:
+    """Shuffled minibatches sliced from tensors already held in memory.
+
+    Each epoch draws one permutation and every minibatch gathers its ``batch_size`` rows with a
+    single ``index_select`` instead of a per-sample collation through ``DataLoader``. Only one
+    batch is materialised at a time, so no second copy of the training matrix is held.
+    """
+
+    def __init__(self, X: torch.Tensor, y: torch.Tensor, batch_size: int = 64, seed: int = 42):
+        self.X = X
+        self.y = y
+        self.batch_size = batch_size
+        self.generator = torch.Generator().manual_seed(seed)
+
+    def __len__(self) -> int:
+        return -(-len(self.X) // self.batch_size)
+
+    def __iter__(self) -> Iterator[Tuple[torch.Tensor, torch.Tensor]]:
+        perm = torch.randperm(len(self.X), generator=self.generator)
+        for start in range(0, len(perm), self.batch_size):
+            rows = perm[start : start + self.batch_size]
+            yield torch.index_select(self.X, 0, rows), torch.index_select(self.y, 0, rows)
@@ -0,0 +1,94 @@
+"""Memory-mapped binary cache for tabular CSV datasets, keyed by dataset fingerprint."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+from typing import Tuple
+
+import numpy as np
+
+from src.common.hashing import compute_dataset_fingerprint
+from src.common.logging import configure_logging
+from src.model.tables import DEFAULT_CHUNKSIZE, LABEL_COLUMN, feature_columns, iter_chunks, iter_frames
+
+logger = configure_logging(__name__)
+
+DEFAULT_CACHE_DIR = ".cache/datasets"
+FEATURES_FILE = "features.npy"
+LABELS_FILE = "labels.npy"
+COLUMNS_FILE = "columns.json"
+
+
+def cache_key(csv_path: str | pathlib.Path, index_dir: str | pathlib.Path | None = None) -> str:
+    """Key a CSV by its directory fingerprint, reusing a per-directory hash index under ``index_dir``."""
+    csv_path = pathlib.Path(csv_path)
+    index_path = None
+    if index_dir is not None:
+        dir_id = hashlib.sha256(str(csv_path.parent.resolve()).encode("utf-8")).hexdigest()
+        index_path = pathlib.Path(index_dir) / f"{dir_id}.json"
+    fingerprint = compute_dataset_fingerprint(csv_path.parent, index_path=index_path)
+    return hashlib.sha256(f"{fingerprint}:{csv_path.name}".encode("utf-8")).hexdigest()
+
+
+def build_cache(
+    csv_path: str | pathlib.Path,
+    target_dir: str | pathlib.Path,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    label_column: str = LABEL_COLUMN,
+) -> pathlib.Path:
+    """Convert ``csv_path`` into ``features.npy`` (float32) and ``labels.npy`` under ``target_dir``.
+
+    The CSV is parsed chunk by chunk straight into a memory-mapped output, and the entry is
+    published with an atomic rename so concurrent readers never see a partial cache.
+    """
+    target = pathlib.Path(target_dir)
+    tmp = target.with_name(f"{target.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    labels = [c[label_column].to_numpy() for c in iter_frames(csv_path, chunksize, columns=[label_column])]
+    y = np.concatenate(labels) if labels else np.array([])
+    features = feature_columns(csv_path, label_column)
+    X = np.lib.format.open_memmap(tmp / FEATURES_FILE, mode="w+", dtype=np.float32, shape=(len(y), len(features)))
+    row = 0
+    for X_chunk, _ in iter_chunks(csv_path, chunksize, label_column):
+        X[row : row + len(X_chunk)] = X_chunk
+        row += len(X_chunk)
+    X.flush()
+    del X
+    np.save(tmp / LABELS_FILE, y)
+    (tmp / COLUMNS_FILE).write_text(json.dumps({"features": features, "label": label_column, "rows": len(y)}))
+
+    try:
+        os.replace(tmp, target)
+    except OSError:
+        # Another process published the same entry first.
+        shutil.rmtree(tmp, ignore_errors=True)
+    logger.info("Cached %s rows of %s at %s", len(y), csv_path, target)
+    return target
+
+
+def open_cached(
+    csv_path: str | pathlib.Path,
+    cache_dir: str | pathlib.Path = DEFAULT_CACHE_DIR,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return memory-mapped ``(X, y)`` for ``csv_path``, building the cache entry on first use.
+
+    Arrays are opened copy-on-write (``mmap_mode="c"``): pages are shared with the page cache
+    and ``torch.from_numpy`` can wrap them without a copy or a read-only warning.
+    """
+    csv_path = pathlib.Path(csv_path)
+    cache_root = pathlib.Path(cache_dir).resolve()
+    if cache_root.is_relative_to(csv_path.parent.resolve()):
+        raise ValueError("Dataset cache must live outside the dataset directory it fingerprints")
+    entry = cache_root / cache_key(csv_path, index_dir=cache_root / "fingerprints")
+    if not (entry / COLUMNS_FILE).exists():
+        cache_root.mkdir(parents=True, exist_ok=True)
+        build_cache(csv_path, entry, chunksize)
+    X = np.load(entry / FEATURES_FILE, mmap_mode="c")
+    y = np.load(entry / LABELS_FILE, mmap_mode="c")
+    return X, y
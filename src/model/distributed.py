@@ -0,0 +1,87 @@
+"""Process-group setup for DistributedDataParallel training on CPU instances.
+
+Ranks come from the ``torchrun`` environment (``RANK``/``WORLD_SIZE``/``LOCAL_RANK``) when
+present, otherwise from SageMaker's ``SM_HOSTS``/``SM_CURRENT_HOST`` with one process per
+instance: the SageMaker SDK only launches ``torch_distributed`` on GPU and Trainium instances,
+so CPU jobs run ``train.py`` once per host and join the gloo group from here.
+"""
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from typing import List, Mapping, Optional
+
+import torch
+import torch.distributed as dist
+
+from src.common.logging import configure_logging
+
+logger = configure_logging(__name__)
+
+DEFAULT_BACKEND = "gloo"
+DEFAULT_MASTER_PORT = "29500"
+
+
+@dataclass(frozen=True)
+class DistributedContext:
+    """This process's place in the training job; a world size of 1 disables DDP."""
+
+    rank: int = 0
+    world_size: int = 1
+    local_rank: int = 0
+    local_world_size: int = 1
+    backend: str = DEFAULT_BACKEND
+    master_addr: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.world_size > 1
+
+    @property
+    def is_main(self) -> bool:
+        return self.rank == 0
+
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None, backend: str = DEFAULT_BACKEND) -> "DistributedContext":
+        env = os.environ if environ is None else environ
+        if "WORLD_SIZE" in env:
+            return cls(
+                rank=int(env.get("RANK", 0)),
+                world_size=int(env["WORLD_SIZE"]),
+                local_rank=int(env.get("LOCAL_RANK", 0)),
+                local_world_size=int(env.get("LOCAL_WORLD_SIZE", 1)),
+                backend=backend,
+            )
+        hosts = sorted(json.loads(env.get("SM_HOSTS", "[]")))
+        if len(hosts) > 1:
+            return cls(
+                rank=hosts.index(env["SM_CURRENT_HOST"]),
+                world_size=len(hosts),
+                backend=backend,
+                master_addr=hosts[0],
+            )
+        return cls(backend=backend)
+
+    def init(self) -> "DistributedContext":
+        """Join the process group; a no-op for single-process runs or when already joined."""
+        if not self.enabled or dist.is_initialized():
+            return self
+        if self.master_addr:
+            os.environ.setdefault("MASTER_ADDR", self.master_addr)
+            os.environ.setdefault("MASTER_PORT", DEFAULT_MASTER_PORT)
+        dist.init_process_group(self.backend, rank=self.rank, world_size=self.world_size)
+        logger.info("Joined %s process group as rank %s of %s", self.backend, self.rank, self.world_size)
+        return self
+
+    def shutdown(self) -> None:
+        if self.enabled and dist.is_initialized():
+            dist.destroy_process_group()
+
+    def all_reduce_sum(self, *values: float) -> List[float]:
+        """Element-wise sum of ``values`` over all ranks."""
+        if not self.enabled:
+            return list(values)
+        tensor = torch.tensor(values, dtype=torch.float64)
+        dist.all_reduce(tensor)
+        return tensor.tolist()
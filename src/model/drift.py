@@ -0,0 +1,225 @@
+"""Per-feature drift scores (PSI, KS, Jensen-Shannon) over binned histograms.
+
+A :class:`DriftBaseline` stores, for every feature, quantile bin edges and the bin counts of
+the training data; it is written next to the model artifact as ``drift_baseline.json``. New
+data is binned against the same edges in streaming chunks by :class:`HistogramAccumulator`,
+and :func:`drift_scores` compares the two histograms for all features at once. Missing values
+get their own bin, so a rise in nulls registers as drift.
+"""
+from __future__ import annotations
+
+import json
+import pathlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from src.model.tables import DEFAULT_CHUNKSIZE, LABEL_COLUMN, feature_columns, float32_schema, iter_frames
+
+BASELINE_FILE = "drift_baseline.json"
+DEFAULT_BINS = 10
+EDGE_SAMPLE_ROWS = 100_000
+METRICS = ("psi", "ks", "js")
+DEFAULT_THRESHOLDS = {"psi": 0.2, "ks": 0.1, "js": 0.1}
+# Floor for empty bins so PSI and JS stay finite.
+SMOOTHING = 1e-4
+
+
+def quantile_edges(X: np.ndarray, n_bins: int = DEFAULT_BINS, sample_rows: int = EDGE_SAMPLE_ROWS, seed: int = 0) -> np.ndarray:
+    """Inner bin edges, shape ``(n_features, n_bins - 1)``, at evenly spaced quantiles.
+
+    Edges come from a fixed-seed row sample of at most ``sample_rows`` rows, which is plenty
+    for decile-style bins and keeps the sort cost independent of the dataset size.
+    """
+    if len(X) > sample_rows:
+        X = X[np.sort(np.random.default_rng(seed).choice(len(X), sample_rows, replace=False))]
+    qs = np.linspace(0, 1, n_bins + 1)[1:-1]
+    if len(X) == 0:
+        return np.zeros((X.shape[1], n_bins - 1), dtype=np.float32)
+    edges = np.nanquantile(X.astype(np.float64), qs, axis=0).T
+    return np.nan_to_num(edges).astype(np.float32)
+
+
+class HistogramAccumulator:
+    """Streaming per-feature histograms against fixed edges; bin ``n_bins`` counts NaNs."""
+
+    def __init__(self, edges: np.ndarray):
+        self.edges = np.ascontiguousarray(edges, dtype=np.float32)
+        n_features, n_inner = self.edges.shape
+        self.n_bins = n_inner + 1
+        self.counts = np.zeros((n_features, self.n_bins + 1), dtype=np.int64)
+        self.n_rows = 0
+        self._edges_by_rank = np.ascontiguousarray(self.edges.T)
+
+    def update(self, X: np.ndarray) -> None:
+        X = np.asarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        # cumulative[k] = rows >= edge k-1 (cumulative[0] = all non-NaN rows); bin counts are
+        # successive differences. One broadcast compare and column reduction per edge covers
+        # every feature at once; NaN compares False and is counted separately.
+        mask = np.empty(X.shape, dtype=bool)
+        cumulative = np.zeros((self.n_bins + 1, n_features), dtype=np.int64)
+        np.isnan(X, out=mask)
+        missing = np.add.reduce(mask.view(np.uint8), axis=0, dtype=np.int64)
+        cumulative[0] = n_rows - missing
+        for k, edge in enumerate(self._edges_by_rank, start=1):
+            np.greater_equal(X, edge, out=mask)
+            cumulative[k] = np.add.reduce(mask.view(np.uint8), axis=0, dtype=np.int64)
+        self.counts[:, : self.n_bins] += (cumulative[:-1] - cumulative[1:]).T
+        self.counts[:, self.n_bins] += missing
+        self.n_rows += n_rows
+
+    def update_array(self, X: np.ndarray, chunksize: int = DEFAULT_CHUNKSIZE) -> None:
+        for start in range(0, len(X), chunksize):
+            self.update(X[start : start + chunksize])
+
+
+def iter_feature_chunks(
+    csv_path: str | pathlib.Path, features: List[str], chunksize: int = DEFAULT_CHUNKSIZE
+) -> Iterable[np.ndarray]:
+    """Float32 feature chunks of ``csv_path``; the label column is not required."""
+    for chunk in iter_frames(csv_path, chunksize, columns=features, dtype=float32_schema(features)):
+        yield chunk[features].to_numpy(dtype=np.float32)
+
+
+@dataclass
+class DriftBaseline:
+    feature_names: List[str]
+    edges: np.ndarray
+    counts: np.ndarray
+    n_rows: int
+
+    @classmethod
+    def from_array(cls, X: np.ndarray, feature_names: List[str], n_bins: int = DEFAULT_BINS) -> "DriftBaseline":
+        acc = HistogramAccumulator(quantile_edges(X, n_bins))
+        acc.update_array(X)
+        return cls(list(feature_names), acc.edges, acc.counts, acc.n_rows)
+
+    @classmethod
+    def from_csv(
+        cls,
+        csv_path: str | pathlib.Path,
+        n_bins: int = DEFAULT_BINS,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+        label_column: str = LABEL_COLUMN,
+    ) -> "DriftBaseline":
+        """One streaming pass through a :class:`BaselineBuilder`."""
+        features = feature_columns(csv_path, label_column)
+        builder = BaselineBuilder(features, n_bins)
+        for X in iter_feature_chunks(csv_path, features, chunksize):
+            builder.update(X)
+        return builder.build()
+
+    def save(self, model_dir: str | pathlib.Path) -> pathlib.Path:
+        path = pathlib.Path(model_dir) / BASELINE_FILE
+        payload = {
+            "feature_names": self.feature_names,
+            "edges": self.edges.tolist(),
+            "counts": self.counts.tolist(),
+            "n_rows": self.n_rows,
+        }
+        path.write_text(json.dumps(payload))
+        return path
+
+    @classmethod
+    def load(cls, model_dir: str | pathlib.Path) -> "DriftBaseline":
+        raw = json.loads((pathlib.Path(model_dir) / BASELINE_FILE).read_text())
+        n_features = len(raw["feature_names"])
+        return cls(
+            raw["feature_names"],
+            np.asarray(raw["edges"], dtype=np.float32).reshape(n_features, -1),
+            np.asarray(raw["counts"], dtype=np.int64).reshape(n_features, -1),
+            raw["n_rows"],
+        )
+
+    def accumulator(self) -> HistogramAccumulator:
+        return HistogramAccumulator(self.edges)
+
+
+class BaselineBuilder:
+    """Build a :class:`DriftBaseline` from streamed chunks in a single pass.
+
+    The leading ``EDGE_SAMPLE_ROWS`` rows are buffered to place the bin edges; they are then
+    counted along with every later chunk.
+    """
+
+    def __init__(self, feature_names: List[str], n_bins: int = DEFAULT_BINS):
+        self.feature_names = list(feature_names)
+        self.n_bins = n_bins
+        self._head: List[np.ndarray] = []
+        self._head_rows = 0
+        self._acc: Optional[HistogramAccumulator] = None
+
+    def update(self, X: np.ndarray) -> None:
+        X = np.asarray(X, dtype=np.float32)
+        if self._acc is not None:
+            self._acc.update(X)
+            return
+        self._head.append(X)
+        self._head_rows += len(X)
+        if self._head_rows >= EDGE_SAMPLE_ROWS:
+            self._place_edges()
+
+    def _place_edges(self) -> None:
+        head = np.concatenate(self._head) if self._head else np.zeros((0, len(self.feature_names)), np.float32)
+        self._acc = HistogramAccumulator(quantile_edges(head[:EDGE_SAMPLE_ROWS], self.n_bins))
+        self._acc.update_array(head)
+        self._head = []
+
+    def build(self) -> DriftBaseline:
+        if self._acc is None:
+            self._place_edges()
+        return DriftBaseline(self.feature_names, self._acc.edges, self._acc.counts, self._acc.n_rows)
+
+
+def _proportions(counts: np.ndarray) -> np.ndarray:
+    totals = np.maximum(counts.sum(axis=1, keepdims=True), 1)
+    p = counts / totals + SMOOTHING
+    return p / p.sum(axis=1, keepdims=True)
+
+
+def drift_scores(reference: np.ndarray, current: np.ndarray) -> Dict[str, np.ndarray]:
+    """PSI, binned KS statistic and JS distance (base 2, in [0, 1]) per row of two count arrays."""
+    p, q = _proportions(reference), _proportions(current)
+    psi = ((q - p) * np.log(q / p)).sum(axis=1)
+    ks = np.abs(np.cumsum(p, axis=1) - np.cumsum(q, axis=1)).max(axis=1)
+    m = (p + q) / 2
+    js = np.sqrt(np.maximum(0.5 * (p * np.log2(p / m)).sum(axis=1) + 0.5 * (q * np.log2(q / m)).sum(axis=1), 0.0))
+    return {"psi": psi, "ks": ks, "js": js}
+
+
+@dataclass
+class DriftReport:
+    feature_names: List[str]
+    scores: Dict[str, np.ndarray]
+    n_rows: int
+
+    def drifted(self, metric: str = "psi", threshold: Optional[float] = None) -> List[str]:
+        threshold = DEFAULT_THRESHOLDS[metric] if threshold is None else threshold
+        return [name for name, score in zip(self.feature_names, self.scores[metric]) if score > threshold]
+
+    def max_score(self, metric: str = "psi") -> float:
+        return float(self.scores[metric].max()) if len(self.feature_names) else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "n_rows": self.n_rows,
+            "features": {
+                name: {metric: float(self.scores[metric][i]) for metric in METRICS}
+                for i, name in enumerate(self.feature_names)
+            },
+        }
+
+
+def compute_drift(
+    baseline: DriftBaseline, data: np.ndarray | str | pathlib.Path, chunksize: int = DEFAULT_CHUNKSIZE
+) -> DriftReport:
+    """Score ``data`` (an array or a CSV with the baseline's feature columns) against ``baseline``."""
+    acc = baseline.accumulator()
+    if isinstance(data, np.ndarray):
+        acc.update_array(data, chunksize)
+    else:
+        for X in iter_feature_chunks(data, baseline.feature_names, chunksize):
+            acc.update(X)
+    return DriftReport(baseline.feature_names, drift_scores(baseline.counts, acc.counts), acc.n_rows)
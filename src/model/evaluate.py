@@ -1,43 +1,186 @@
 from __future__ import annotations
 
 import json
+import os
 import pathlib
-from typing import Dict, Literal
+from typing import Any, Dict, Literal, Tuple
 
 import numpy as np
-import pandas as pd
 import torch
 
 from src.common.logging import configure_logging
 from src.common.metrics import classification_metrics, regression_metrics
+from src.model.metadata import MANIFEST_FILE, ModelMetadata
 from src.model.nn import SimpleMLP
+from src.model.precision import PRECISIONS, autocast, resolve_precision
+from src.model.quantization import (
+    DEFAULT_MAX_METRIC_DELTA,
+    QUANTIZATION_MODES,
+    latency_ms,
+    metric_delta,
+    quantize_model,
+    serialized_size,
+)
+from src.model.train import load_data
 
 logger = configure_logging(__name__)
 
 
-def load_model(model_path: str | pathlib.Path, input_dim: int, output_dim: int, problem_type: str) -> SimpleMLP:
-    model = SimpleMLP(input_dim=input_dim, output_dim=output_dim, problem_type=problem_type)
+def load_model_and_metadata(
+    model_path: str | pathlib.Path,
+    input_dim: int | None = None,
+    output_dim: int | None = None,
+    problem_type: str | None = None,
+) -> Tuple[SimpleMLP, ModelMetadata]:
+    """Rebuild the model from the ``model_meta.json`` next to ``model_path``.
+
+    Artifacts saved without a manifest fall back to the layer shapes in the state dict. Explicit
+    dims are optional; when given they must agree with the manifest or the weights.
+    """
     state = torch.load(model_path, map_location="cpu")
+    metadata = ModelMetadata.find(model_path)
+    if metadata is None:
+        logger.warning("No %s next to %s; taking dims from the state dict", MANIFEST_FILE, model_path)
+        metadata = ModelMetadata.from_state_dict(state, problem_type or "classification")
+    for name, given in (("input_dim", input_dim), ("output_dim", output_dim), ("problem_type", problem_type)):
+        if given is not None and given != getattr(metadata, name):
+            raise ValueError(f"{name}={given} does not match manifest value {getattr(metadata, name)}")
+    model = quantize_model(metadata.build_model(), metadata.quantization)
     model.load_state_dict(state)
     model.eval()
-    return model
+    return model, metadata
+
 
+def load_model(
+    model_path: str | pathlib.Path,
+    input_dim: int | None = None,
+    output_dim: int | None = None,
+    problem_type: str | None = None,
+) -> SimpleMLP:
+    """:func:`load_model_and_metadata` without the manifest."""
+    return load_model_and_metadata(model_path, input_dim, output_dim, problem_type)[0]
 
-def evaluate(model: SimpleMLP, csv_path: str | pathlib.Path, problem_type: Literal["classification", "regression"]) -> Dict[str, float]:
-    df = pd.read_csv(csv_path)
-    X = df.drop(columns=["label"]).values.astype(np.float32)
-    y = df["label"].values
-    with torch.no_grad():
-        preds = model(torch.tensor(X, dtype=torch.float32))
+
+def _score(
+    model: torch.nn.Module, X: np.ndarray, y: np.ndarray, problem_type: str, precision: str = "fp32"
+) -> Dict[str, float]:
+    with torch.no_grad(), autocast(precision):
+        preds = model(torch.from_numpy(X)).float()
     if problem_type == "regression":
-        metrics = regression_metrics(y, preds.squeeze().numpy())
+        return regression_metrics(y, preds.squeeze().numpy())
+    if preds.shape[1] == 1:
+        pred_labels = (preds.squeeze().numpy() > 0.5).astype(int)
     else:
-        if preds.shape[1] == 1:
-            pred_labels = (preds.squeeze().numpy() > 0.5).astype(int)
-        else:
-            pred_labels = np.argmax(preds.numpy(), axis=1)
-        metrics = classification_metrics(y, pred_labels)
-    return metrics
+        pred_labels = np.argmax(preds.numpy(), axis=1)
+    return classification_metrics(y, pred_labels)
+
+
+def evaluate(
+    model: SimpleMLP,
+    csv_path: str | pathlib.Path,
+    problem_type: Literal["classification", "regression"],
+    cache_dir: str | pathlib.Path | None = None,
+    precision: str = "fp32",
+) -> Dict[str, float]:
+    X, y = load_data(csv_path, cache_dir)
+    return _score(model, X, y, problem_type, resolve_precision(precision))
+
+
+def precision_report(
+    model: SimpleMLP,
+    csv_path: str | pathlib.Path,
+    problem_type: Literal["classification", "regression"],
+    precision: str = "bf16",
+    max_metric_delta: float = DEFAULT_MAX_METRIC_DELTA,
+    cache_dir: str | pathlib.Path | None = None,
+) -> Dict[str, Any]:
+    """Compare float32 inference with ``precision`` autocast on ``csv_path``.
+
+    ``precision`` is the one actually used after the CPU fallback, so an unsupported ``bf16``
+    reports ``fp32`` with a zero ``metric_delta`` without scoring or timing anything.
+    ``accepted`` mirrors :func:`quantization_report`.
+    """
+    precision = resolve_precision(precision)
+    if precision == "fp32":
+        return {"precision": precision, "metric_delta": 0.0, "max_metric_delta": max_metric_delta, "accepted": True}
+    X, y = load_data(csv_path, cache_dir)
+    baseline = _score(model, X, y, problem_type)
+    candidate = _score(model, X, y, problem_type, precision)
+    delta = metric_delta(problem_type, baseline, candidate)
+    latency_fp32 = latency_ms(model, X, batch_size=min(len(X), 256), repeats=50)
+    with autocast(precision):
+        latency_candidate = latency_ms(model, X, batch_size=min(len(X), 256), repeats=50)
+    logger.info(
+        "%s inference: metric delta %.4f (max %.4f), latency %.3f -> %.3f ms",
+        precision,
+        delta,
+        max_metric_delta,
+        latency_fp32,
+        latency_candidate,
+    )
+    return {
+        "precision": precision,
+        "baseline_metrics": baseline,
+        "candidate_metrics": candidate,
+        "metric_delta": delta,
+        "max_metric_delta": max_metric_delta,
+        "accepted": delta <= max_metric_delta,
+        "latency_ms": {"fp32": latency_fp32, precision: latency_candidate},
+    }
+
+
+def quantization_report(
+    model: SimpleMLP,
+    csv_path: str | pathlib.Path,
+    problem_type: Literal["classification", "regression"],
+    mode: str = "int8",
+    max_metric_delta: float = DEFAULT_MAX_METRIC_DELTA,
+    cache_dir: str | pathlib.Path | None = None,
+) -> Dict[str, Any]:
+    """Compare ``model`` with its quantized counterpart on ``csv_path``.
+
+    Reports both metric sets, the degradation (see :func:`metric_delta`), serialized weight
+    sizes and single-row CPU latency; ``accepted`` is False when the degradation exceeds
+    ``max_metric_delta``.
+    """
+    X, y = load_data(csv_path, cache_dir)
+    quantized = quantize_model(model, mode)
+    baseline = _score(model, X, y, problem_type)
+    candidate = _score(quantized, X, y, problem_type)
+    delta = metric_delta(problem_type, baseline, candidate)
+    size_fp32, size_quantized = serialized_size(model), serialized_size(quantized)
+    latency_fp32, latency_quantized = latency_ms(model, X), latency_ms(quantized, X)
+    report = {
+        "mode": mode,
+        "baseline_metrics": baseline,
+        "quantized_metrics": candidate,
+        "metric_delta": delta,
+        "max_metric_delta": max_metric_delta,
+        "accepted": delta <= max_metric_delta,
+        "size_bytes": {"float32": size_fp32, mode: size_quantized},
+        "size_reduction": 1 - size_quantized / size_fp32,
+        "latency_ms": {"float32": latency_fp32, mode: latency_quantized},
+        "latency_speedup": latency_fp32 / latency_quantized,
+    }
+    logger.info(
+        "%s quantization: metric delta %.4f (max %.4f), size %d -> %d bytes, latency %.3f -> %.3f ms",
+        mode,
+        delta,
+        max_metric_delta,
+        size_fp32,
+        size_quantized,
+        latency_fp32,
+        latency_quantized,
+    )
+    return report
+
+
+def check_quantization(report: Dict[str, Any]) -> None:
+    if not report["accepted"]:
+        raise ValueError(
+            f"{report['mode']} quantization degrades the model by {report['metric_delta']:.4f} "
+            f"(max {report['max_metric_delta']:.4f}); refusing to export"
+        )
 
 
 def main():
@@ -46,13 +189,27 @@ def main():
     parser = argparse.ArgumentParser(description="Evaluate model")
     parser.add_argument("--model-path", required=True)
     parser.add_argument("--test-csv", required=True)
-    parser.add_argument("--problem-type", choices=["classification", "regression"], default="classification")
-    parser.add_argument("--input-dim", type=int, required=True)
-    parser.add_argument("--output-dim", type=int, required=True)
+    parser.add_argument("--problem-type", choices=["classification", "regression"], default=None)
+    parser.add_argument("--input-dim", type=int, default=None, help="Only for artifacts without model_meta.json")
+    parser.add_argument("--output-dim", type=int, default=None, help="Only for artifacts without model_meta.json")
     parser.add_argument("--output-metrics", default="metrics.json")
+    parser.add_argument("--cache-dir", default=os.getenv("DATASET_CACHE_DIR"))
+    parser.add_argument("--quantize", choices=QUANTIZATION_MODES, default=None, help="Also report the quantized model")
+    parser.add_argument("--max-metric-delta", type=float, default=DEFAULT_MAX_METRIC_DELTA)
+    parser.add_argument("--precision", choices=PRECISIONS, default="fp32", help="bf16: also report the fp32 delta")
     args = parser.parse_args()
     model = load_model(args.model_path, args.input_dim, args.output_dim, args.problem_type)
-    metrics = evaluate(model, args.test_csv, args.problem_type)
+    metrics: Dict[str, Any] = evaluate(
+        model, args.test_csv, model.problem_type, cache_dir=args.cache_dir, precision=args.precision
+    )
+    if args.precision != "fp32":
+        metrics["precision"] = precision_report(
+            model, args.test_csv, model.problem_type, args.precision, args.max_metric_delta, cache_dir=args.cache_dir
+        )
+    if args.quantize:
+        metrics["quantization"] = quantization_report(
+            model, args.test_csv, model.problem_type, args.quantize, args.max_metric_delta, cache_dir=args.cache_dir
+        )
     pathlib.Path(args.output_metrics).write_text(json.dumps(metrics, indent=2))
     logger.info("Evaluation metrics saved to %s", args.output_metrics)
 
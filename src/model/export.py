@@ -1,62 +1,106 @@
 from __future__ import annotations
 
+import inspect
+import json
 import pathlib
+import shutil
 import tarfile
-from typing import Dict
+from dataclasses import replace
+from typing import Literal, Optional
 
 import torch
 
-from src.model.nn import SimpleMLP
+from src.model.metadata import MANIFEST_FILE
+from src.model.quantization import DEFAULT_MAX_METRIC_DELTA, QUANTIZATION_MODES, quantize_model
+
+INFERENCE_HANDLER = pathlib.Path(__file__).with_name("inference.py")
+
+
+ExportFormat = Literal["eager", "torchscript", "onnx"]
+ARTIFACT_NAMES = {"eager": "model.pt", "torchscript": "model.ts", "onnx": "model.onnx"}
+QUANTIZATION_REPORT_FILE = "quantization_report.json"
+RUNTIME_REQUIREMENTS = {"eager": ["torch"], "torchscript": ["torch"], "onnx": ["onnxruntime"]}
 
 
-def build_inference_files(model_dir: pathlib.Path) -> None:
+def build_inference_files(model_dir: pathlib.Path, export_format: ExportFormat = "eager") -> None:
     code_dir = model_dir / "code"
     code_dir.mkdir(parents=True, exist_ok=True)
-    (code_dir / "requirements.txt").write_text("torch\npandas\nnumpy\n")
-    inference_code = """
-import json
-import os
-import io
-import numpy as np
-import pandas as pd
-import torch
-from src.model.nn import SimpleMLP
-
-def model_fn(model_dir):
-    state_dict = torch.load(os.path.join(model_dir, "model.pt"), map_location="cpu")
-    # Default to 10 features; for production use model metadata.
-    model = SimpleMLP(input_dim=10, output_dim=1, problem_type=os.environ.get("PROBLEM_TYPE", "classification"))
-    model.load_state_dict(state_dict)
-    model.eval()
-    return model
-
-def input_fn(input_data, content_type):
-    if content_type == "text/csv":
-        df = pd.read_csv(io.StringIO(input_data), header=None)
-        return torch.tensor(df.values, dtype=torch.float32)
-    payload = json.loads(input_data)
-    arr = np.array(payload["data"], dtype=np.float32)
-    return torch.tensor(arr)
-
-def predict_fn(data, model):
-    with torch.no_grad():
-        preds = model(data)
-    return preds.numpy().tolist()
-
-def output_fn(prediction, accept):
-    return json.dumps({"predictions": prediction})
-"""
-    (code_dir / "inference.py").write_text(inference_code)
-
-
-def export_model_artifacts(model_path: str | pathlib.Path, output_path: str | pathlib.Path) -> pathlib.Path:
+    requirements = RUNTIME_REQUIREMENTS[export_format] + ["numpy", "pyarrow"]
+    (code_dir / "requirements.txt").write_text("\n".join(requirements) + "\n")
+    shutil.copyfile(INFERENCE_HANDLER, code_dir / "inference.py")
+
+
+def compile_torchscript(model: torch.nn.Module, input_dim: int, path: pathlib.Path) -> None:
+    """Trace, freeze (weights folded into the graph) and optimize the model for CPU inference."""
+    traced = torch.jit.trace(model.eval(), torch.zeros(1, input_dim))
+    frozen = torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+    torch.jit.save(frozen, str(path))
+
+
+def compile_onnx(model: torch.nn.Module, input_dim: int, path: pathlib.Path) -> None:
+    kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        # The TorchScript-based exporter handles this static MLP without onnxscript.
+        kwargs["dynamo"] = False
+    torch.onnx.export(
+        model.eval(),
+        (torch.zeros(1, input_dim),),
+        str(path),
+        input_names=["input"],
+        output_names=["output"],
+        dynamic_axes={"input": {0: "batch"}, "output": {0: "batch"}},
+        do_constant_folding=True,
+        **kwargs,
+    )
+
+
+def export_model_artifacts(
+    model_path: str | pathlib.Path,
+    output_path: str | pathlib.Path,
+    export_format: ExportFormat = "eager",
+    quantize: Optional[str] = None,
+    validation_csv: str | pathlib.Path | None = None,
+    max_metric_delta: float = DEFAULT_MAX_METRIC_DELTA,
+) -> pathlib.Path:
+    """Package a trained model as ``model.tar.gz`` for SageMaker hosting.
+
+    ``eager`` ships the ``state_dict``; ``torchscript`` and ``onnx`` ship a frozen graph that the
+    handler runs through ``torch.jit`` or ONNX Runtime without importing ``src``. The manifest's
+    ``artifact`` field tells the handler which file to load.
+
+    ``quantize="int8"`` applies dynamic quantization (eager or torchscript only). It is first
+    scored against ``validation_csv`` and the export is refused with ``ValueError`` when the
+    metric degrades by more than ``max_metric_delta``; the comparison is written to
+    ``quantization_report.json`` in ``output_path``.
+    """
+    from src.model.evaluate import check_quantization, load_model_and_metadata, quantization_report
+
     model_dir = pathlib.Path(output_path)
     model_dir.mkdir(parents=True, exist_ok=True)
-    torch.save(torch.load(model_path, map_location="cpu"), model_dir / "model.pt")
-    build_inference_files(model_dir)
+    # Models saved before manifests existed take their dims from the state dict (see load_model).
+    model, metadata = load_model_and_metadata(model_path)
+    if quantize:
+        if export_format == "onnx":
+            raise ValueError("ONNX export does not support dynamically quantized models; use eager or torchscript")
+        if validation_csv is None:
+            raise ValueError("Quantized export needs validation_csv to check the metric delta")
+        report = quantization_report(model, validation_csv, metadata.problem_type, quantize, max_metric_delta)
+        (model_dir / QUANTIZATION_REPORT_FILE).write_text(json.dumps(report, indent=2))
+        check_quantization(report)
+        model = quantize_model(model, quantize)
+    artifact = model_dir / ARTIFACT_NAMES[export_format]
+    if export_format == "torchscript":
+        compile_torchscript(model, metadata.input_dim, artifact)
+    elif export_format == "onnx":
+        compile_onnx(model, metadata.input_dim, artifact)
+    else:
+        torch.save(model.state_dict(), artifact)
+    replace(metadata, artifact=artifact.name, quantization=quantize).save(model_dir)
+    build_inference_files(model_dir, export_format)
     tar_path = model_dir / "model.tar.gz"
     with tarfile.open(tar_path, "w:gz") as tar:
-        tar.add(model_dir / "model.pt", arcname="model.pt")
+        tar.add(artifact, arcname=artifact.name)
+        tar.add(model_dir / MANIFEST_FILE, arcname=MANIFEST_FILE)
         tar.add(model_dir / "code/inference.py", arcname="code/inference.py")
         tar.add(model_dir / "code/requirements.txt", arcname="code/requirements.txt")
     return tar_path
@@ -68,5 +112,16 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Export model to SageMaker format")
     parser.add_argument("--model-path", required=True)
     parser.add_argument("--output-dir", default="artifacts/export")
+    parser.add_argument("--format", choices=sorted(ARTIFACT_NAMES), default="eager")
+    parser.add_argument("--quantize", choices=QUANTIZATION_MODES, default=None)
+    parser.add_argument("--validation-csv", default=None, help="Required with --quantize")
+    parser.add_argument("--max-metric-delta", type=float, default=DEFAULT_MAX_METRIC_DELTA)
     args = parser.parse_args()
-    export_model_artifacts(args.model_path, args.output_dir)
+    export_model_artifacts(
+        args.model_path,
+        args.output_dir,
+        export_format=args.format,
+        quantize=args.quantize,
+        validation_csv=args.validation_csv,
+        max_metric_delta=args.max_metric_delta,
+    )
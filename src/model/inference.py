@@ -0,0 +1,295 @@
+"""SageMaker inference handler for ``SimpleMLP``.
+
+This module is copied verbatim into ``code/inference.py`` of the exported ``model.tar.gz``.
+Payloads are decoded straight into one float32 NumPy buffer and predictions stay NumPy arrays
+until serialization; ``application/x-npy`` round-trips without any text formatting.
+
+The manifest's ``artifact`` selects the runtime: ``model.pt`` rebuilds ``SimpleMLP`` in eager
+mode, ``model.ts`` loads a frozen TorchScript graph and ``model.onnx`` runs on ONNX Runtime.
+Only the eager path imports ``src``. ``INFERENCE_THREADS`` caps intra-op threads (default: all
+cores). ``INFERENCE_PRECISION=bf16`` runs the eager model under bfloat16 autocast when the CPU
+has native bf16 kernels (AVX-512 BF16/AMX), and float32 otherwise.
+"""
+import io
+import json
+import os
+from contextlib import nullcontext
+
+import numpy as np
+import torch
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:  # pragma: no cover - optional, falls back to np.loadtxt
+    pa = None
+
+CSV_CONTENT_TYPE = "text/csv"
+JSON_CONTENT_TYPE = "application/json"
+NPY_CONTENT_TYPE = "application/x-npy"
+MANIFEST_FILE = "model_meta.json"
+# Nine significant digits round-trip float32 exactly and keep JSON numbers short.
+FLOAT32_SIGNIFICANT_DIGITS = 9
+
+
+def _as_bytes(data) -> bytes:
+    return data.encode("utf-8") if isinstance(data, str) else bytes(data)
+
+
+def _media_type(content_type) -> str:
+    return (content_type or CSV_CONTENT_TYPE).split(";")[0].strip().lower()
+
+
+def parse_csv(data) -> np.ndarray:
+    raw = _as_bytes(data).strip()
+    if not raw:
+        return np.empty((0, 0), dtype=np.float32)
+    if pa is None:
+        return np.loadtxt(io.BytesIO(raw), delimiter=",", dtype=np.float32, ndmin=2)
+    n_cols = raw.split(b"\n", 1)[0].count(b",") + 1
+    table = pa_csv.read_csv(
+        pa.BufferReader(raw + b"\n"),
+        read_options=pa_csv.ReadOptions(autogenerate_column_names=True),
+        convert_options=pa_csv.ConvertOptions(column_types={f"f{i}": pa.float32() for i in range(n_cols)}),
+    )
+    out = np.empty((table.num_rows, n_cols), dtype=np.float32)
+    for i, column in enumerate(table.columns):
+        out[:, i] = column.to_numpy()
+    return out
+
+
+def decode(input_data, content_type) -> np.ndarray:
+    media_type = _media_type(content_type)
+    if media_type == CSV_CONTENT_TYPE:
+        arr = parse_csv(input_data)
+    elif media_type == NPY_CONTENT_TYPE:
+        arr = np.load(io.BytesIO(_as_bytes(input_data)), allow_pickle=False)
+    elif media_type == JSON_CONTENT_TYPE:
+        payload = json.loads(input_data)
+        arr = np.asarray(payload["data"] if isinstance(payload, dict) else payload, dtype=np.float32)
+    else:
+        raise ValueError(f"Unsupported content type {content_type}")
+    return np.ascontiguousarray(np.atleast_2d(arr), dtype=np.float32)
+
+
+# Widest formatted number: sign, 9 digits, ".", "e", exponent sign and two exponent digits.
+NUMBER_WIDTH = FLOAT32_SIGNIFICANT_DIGITS + 6
+# Spelling of non-finite values; the JSON ones are what json.dumps emits and json.loads accepts.
+NON_FINITE = {
+    "json": {"nan": b"NaN", "inf": b"Infinity", "-inf": b"-Infinity"},
+    "csv": {"nan": b"nan", "inf": b"inf", "-inf": b"-inf"},
+}
+_PAD = 0
+
+
+def format_numbers(values: np.ndarray, style: str = "json") -> np.ndarray:
+    """Compact decimal text of each value as a ``(n, NUMBER_WIDTH)`` uint8 matrix.
+
+    Each value gets nine significant digits (enough to round-trip float32) in scientific
+    notation, with trailing zeros, a zero exponent and leading exponent zeros dropped. Unused
+    cells hold ``_PAD`` bytes, which callers strip with one boolean mask, so no per-value
+    Python objects are created.
+    """
+    a = np.asarray(values, dtype=np.float64).ravel()
+    out = np.full((len(a), NUMBER_WIDTH), _PAD, dtype=np.uint8)
+    finite = np.isfinite(a)
+    mag = np.abs(np.where(finite, a, 0.0))
+    nonzero = mag > 0
+    exp = np.floor(np.log10(np.where(nonzero, mag, 1.0))).astype(np.int64)
+    digits = FLOAT32_SIGNIFICANT_DIGITS
+    lo, hi = 10 ** (digits - 1), 10**digits
+    mant = np.rint(mag / 10.0**exp * lo).astype(np.int64)
+    # log10 can land one decade off next to powers of ten; renormalise those values.
+    for fix in (mant >= hi, (mant < lo) & nonzero):
+        exp[fix] += np.where(mant[fix] >= hi, 1, -1)
+        mant[fix] = np.rint(mag[fix] / 10.0 ** exp[fix] * lo).astype(np.int64)
+    mant[~nonzero], exp[~nonzero] = 0, 0
+
+    place = 10 ** np.arange(digits - 1, -1, -1, dtype=np.int64)
+    mant_digits = (mant[:, None] // place) % 10
+    # Significant digits to keep: up to the last non-zero one (at least one).
+    nonzero_digit = mant_digits != 0
+    kept = np.where(nonzero_digit.any(1), digits - np.argmax(nonzero_digit[:, ::-1], axis=1), 1)
+
+    out[:, 0] = np.where(np.signbit(a) & nonzero, ord("-"), _PAD)
+    out[:, 1] = mant_digits[:, 0] + ord("0")
+    out[:, 2] = np.where(kept > 1, ord("."), _PAD)
+    frac = np.arange(1, digits)
+    out[:, 3 : 2 + digits] = np.where(frac < kept[:, None], mant_digits[:, 1:] + ord("0"), _PAD)
+    col = 2 + digits
+    has_exp = exp != 0
+    abs_exp = np.abs(exp)
+    out[:, col] = np.where(has_exp, ord("e"), _PAD)
+    out[:, col + 1] = np.where(exp < 0, ord("-"), _PAD)
+    out[:, col + 2] = np.where(abs_exp >= 10, abs_exp // 10 + ord("0"), _PAD)
+    out[:, col + 3] = np.where(has_exp, abs_exp % 10 + ord("0"), _PAD)
+
+    for name, mask in (("nan", np.isnan(a)), ("inf", np.isposinf(a)), ("-inf", np.isneginf(a))):
+        if mask.any():
+            text = np.frombuffer(NON_FINITE[style][name], dtype=np.uint8)
+            out[mask] = _PAD
+            out[np.ix_(mask, np.arange(len(text)))] = text
+    return out
+
+
+def _join_rows(numbers: np.ndarray, n_cols: int, style: str, nested: bool) -> bytes:
+    """Lay out formatted numbers row by row with separators, then drop the padding."""
+    n_rows = len(numbers) // max(n_cols, 1)
+    open_close = 2 if nested else 0
+    width = open_close + n_cols * (NUMBER_WIDTH + 1)
+    rows = np.full((n_rows, width), _PAD, dtype=np.uint8)
+    start = 1 if nested else 0
+    cells = rows[:, start : start + n_cols * (NUMBER_WIDTH + 1)].reshape(n_rows, n_cols, NUMBER_WIDTH + 1)
+    cells[:, :, :NUMBER_WIDTH] = numbers.reshape(n_rows, n_cols, NUMBER_WIDTH)
+    cells[:, :-1, NUMBER_WIDTH] = ord(",")
+    row_end = ord("\n") if style == "csv" else ord(",")
+    if nested:
+        rows[:, 0] = ord("[")
+        cells[:, -1, NUMBER_WIDTH] = ord("]")
+        rows[:-1, -1] = row_end
+    else:
+        cells[:-1, -1, NUMBER_WIDTH] = row_end
+    return rows[rows != _PAD].tobytes()
+
+
+def encode(prediction: np.ndarray, accept) -> bytes | str:
+    media_type = _media_type(accept or JSON_CONTENT_TYPE)
+    if media_type == NPY_CONTENT_TYPE:
+        buf = io.BytesIO()
+        np.save(buf, prediction, allow_pickle=False)
+        return buf.getvalue()
+    prediction = np.atleast_1d(np.asarray(prediction))
+    matrix = prediction.reshape(len(prediction), int(np.prod(prediction.shape[1:])))
+    if media_type == CSV_CONTENT_TYPE:
+        return _join_rows(format_numbers(matrix, "csv"), matrix.shape[1], "csv", nested=False).decode("ascii")
+    # JSON keeps the array's shape: a flat list for 1-D predictions, a list of rows otherwise.
+    nested = prediction.ndim > 1
+    body = _join_rows(format_numbers(matrix, "json"), matrix.shape[1], "json", nested=nested)
+    return '{"predictions": [' + body.decode("ascii") + "]}"
+
+
+def load_manifest(model_dir) -> dict:
+    path = os.path.join(model_dir, MANIFEST_FILE)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    # Artifacts exported before manifests existed: fall back to the legacy defaults.
+    return {
+        "input_dim": int(os.environ.get("MODEL_INPUT_DIM", "10")),
+        "output_dim": 1,
+        "hidden_dim": 64,
+        "problem_type": os.environ.get("PROBLEM_TYPE", "classification"),
+    }
+
+
+def _inference_threads():
+    value = os.environ.get("INFERENCE_THREADS")
+    return int(value) if value else None
+
+
+def _inference_precision():
+    """``"bf16"`` only when requested and natively supported; mirrors src.model.precision."""
+    if os.environ.get("INFERENCE_PRECISION", "fp32") != "bf16":
+        return "fp32"
+    try:
+        supported = torch.backends.mkldnn.is_available() and torch.ops.mkldnn._is_mkldnn_bf16_supported()
+    except (AttributeError, RuntimeError):
+        supported = False
+    return "bf16" if supported else "fp32"
+
+
+def _autocast(model):
+    if getattr(model, "precision", "fp32") == "bf16":
+        return torch.autocast("cpu", dtype=torch.bfloat16)
+    return nullcontext()
+
+
+class TorchScriptModel:
+    """Frozen TorchScript graph; the weights are constants so no ``src`` import is needed."""
+
+    def __init__(self, path, input_dim):
+        self.module = torch.jit.load(path, map_location="cpu")
+        self.input_dim = input_dim
+
+    def __call__(self, data):
+        return self.module(data)
+
+
+class OnnxModel:
+    """ONNX Runtime session tuned for low-latency, single-request CPU inference."""
+
+    def __init__(self, path, input_dim):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.intra_op_num_threads = _inference_threads() or 0
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self.input_dim = input_dim
+
+    def __call__(self, data):
+        rows = data.numpy() if isinstance(data, torch.Tensor) else data
+        return torch.from_numpy(self.session.run(None, {self.input_name: rows})[0])
+
+
+def _load_eager(path, meta):
+    from src.model.nn import SimpleMLP
+
+    model = SimpleMLP(
+        input_dim=meta["input_dim"],
+        hidden_dim=meta.get("hidden_dim", 64),
+        output_dim=meta["output_dim"],
+        problem_type=meta["problem_type"],
+    )
+    if meta.get("quantization") == "int8":
+        # Rebuild the quantized module structure so the packed int8 weights load into it.
+        model = torch.ao.quantization.quantize_dynamic(model.eval(), {torch.nn.Linear}, dtype=torch.qint8)
+    model.load_state_dict(torch.load(path, map_location="cpu"))
+    return model.eval()
+
+
+def model_fn(model_dir):
+    meta = load_manifest(model_dir)
+    artifact = meta.get("artifact", "model.pt")
+    path = os.path.join(model_dir, artifact)
+    threads = _inference_threads()
+    if threads:
+        torch.set_num_threads(threads)
+    if artifact.endswith(".onnx"):
+        model = OnnxModel(path, meta["input_dim"])
+    elif artifact.endswith(".ts"):
+        model = TorchScriptModel(path, meta["input_dim"])
+    else:
+        model = _load_eager(path, meta)
+        # Dynamically quantized int8 layers have no bf16 kernels.
+        model.precision = "fp32" if meta.get("quantization") else _inference_precision()
+    model.metadata = meta
+    # Warm up once so allocator pools, kernels and graph optimizations are ready before the
+    # first request.
+    with torch.inference_mode(), _autocast(model):
+        model(torch.zeros(1, meta["input_dim"]))
+    return model
+
+
+def input_fn(input_data, content_type):
+    return torch.from_numpy(decode(input_data, content_type))
+
+
+def expected_features(model) -> int:
+    """Number of input columns ``model`` accepts."""
+    return getattr(model, "input_dim", None) or model.model[0].in_features
+
+
+def predict_fn(data, model):
+    expected = expected_features(model)
+    if data.ndim != 2 or data.shape[1] != expected:
+        raise ValueError(f"Expected {expected} features per row, got shape {tuple(data.shape)}")
+    with torch.inference_mode(), _autocast(model):
+        return model(data).float().numpy()
+
+
+def output_fn(prediction, accept):
+    return encode(prediction, accept)
@@ -0,0 +1,99 @@
+"""Model metadata manifest written next to ``model.pt``."""
+from __future__ import annotations
+
+import json
+import pathlib
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.model.nn import SimpleMLP
+
+MANIFEST_FILE = "model_meta.json"
+FORMAT_VERSION = 1
+
+
+@dataclass
+class ModelMetadata:
+    """Everything needed to rebuild and feed a ``SimpleMLP`` without guessing shapes.
+
+    ``feature_stats`` holds per-feature training mean/std for clients and drift checks; the
+    model itself consumes raw features. ``label_mapping`` lists the label value for each output
+    index (for a single-output binary model: the labels below and above the 0.5 threshold).
+    ``artifact`` names the weights file: ``model.pt`` (state dict), ``model.ts`` (TorchScript)
+    or ``model.onnx``; ``quantization`` is ``"int8"`` when its ``nn.Linear`` layers were
+    dynamically quantized.
+    """
+
+    input_dim: int
+    output_dim: int
+    problem_type: str
+    hidden_dim: int = 64
+    feature_names: List[str] = field(default_factory=list)
+    dtype: str = "float32"
+    feature_stats: Optional[Dict[str, List[float]]] = None
+    label_mapping: Optional[List[Any]] = None
+    artifact: str = "model.pt"
+    quantization: Optional[str] = None
+    format_version: int = FORMAT_VERSION
+
+    def build_model(self) -> SimpleMLP:
+        return SimpleMLP(
+            input_dim=self.input_dim,
+            hidden_dim=self.hidden_dim,
+            output_dim=self.output_dim,
+            problem_type=self.problem_type,
+        )
+
+    def save(self, model_dir: str | pathlib.Path) -> pathlib.Path:
+        path = pathlib.Path(model_dir) / MANIFEST_FILE
+        path.write_text(json.dumps(asdict(self), indent=2))
+        return path
+
+    @classmethod
+    def load(cls, model_dir: str | pathlib.Path) -> "ModelMetadata":
+        raw = json.loads((pathlib.Path(model_dir) / MANIFEST_FILE).read_text())
+        if raw.get("format_version", FORMAT_VERSION) > FORMAT_VERSION:
+            raise ValueError(f"Unsupported model manifest version {raw['format_version']}")
+        return cls(**raw)
+
+    @classmethod
+    def from_state_dict(cls, state: Dict[str, Any], problem_type: str = "classification") -> "ModelMetadata":
+        """Legacy fallback for weights saved without a manifest: read the shapes off the layers."""
+        first, last = state["model.0.weight"], state["model.4.weight"]
+        return cls(
+            input_dim=first.shape[1],
+            output_dim=last.shape[0],
+            problem_type=problem_type,
+            hidden_dim=first.shape[0],
+        )
+
+    @classmethod
+    def find(cls, model_path: str | pathlib.Path) -> Optional["ModelMetadata"]:
+        """Load the manifest stored alongside ``model_path``, if there is one."""
+        model_dir = pathlib.Path(model_path).parent
+        return cls.load(model_dir) if (model_dir / MANIFEST_FILE).exists() else None
+
+
+def feature_stats(sums: np.ndarray, sq_sums: np.ndarray, count: int) -> Dict[str, List[float]]:
+    mean = sums / max(count, 1)
+    var = np.maximum(sq_sums / max(count, 1) - mean**2, 0.0)
+    return {"mean": mean.tolist(), "std": np.sqrt(var).tolist()}
+
+
+def array_feature_stats(X: np.ndarray, chunk_rows: int = 65536) -> Dict[str, List[float]]:
+    """Per-column mean/std accumulated in float64 over row slices, without a full float64 copy."""
+    sums = np.zeros(X.shape[1])
+    sq_sums = np.zeros(X.shape[1])
+    for start in range(0, len(X), chunk_rows):
+        block = X[start : start + chunk_rows].astype(np.float64)
+        sums += block.sum(0)
+        sq_sums += (block**2).sum(0)
+    return feature_stats(sums, sq_sums, len(X))
+
+
+def label_mapping(classes: np.ndarray, problem_type: str) -> Optional[List[Any]]:
+    if problem_type == "regression":
+        return None
+    return np.asarray(classes).tolist()
@@ -0,0 +1,96 @@
+"""CPU parallelism settings for data loading and intra/inter-op execution."""
+from __future__ import annotations
+
+import argparse
+import os
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Optional
+
+import torch
+
+from src.common.logging import configure_logging
+
+logger = configure_logging(__name__)
+
+MAX_AUTO_WORKERS = 4
+
+
+def available_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+@dataclass(frozen=True)
+class ParallelConfig:
+    """DataLoader and thread-pool settings; ``None`` fields are auto-tuned from the core count."""
+
+    num_workers: Optional[int] = None
+    pin_memory: bool = False
+    persistent_workers: Optional[bool] = None
+    prefetch_factor: Optional[int] = None
+    num_threads: Optional[int] = None
+    num_interop_threads: Optional[int] = None
+
+    def resolved(self, cpu_count: Optional[int] = None, streaming: bool = False) -> "ParallelConfig":
+        """Fill unset fields: when ``streaming``, a quarter of the cores (up to 4) parse data and
+        the rest run ops; in-memory tensors are batched in-process, since workers only add IPC."""
+        cores = cpu_count or available_cpus()
+        auto_workers = min(MAX_AUTO_WORKERS, cores // 4) if streaming else 0
+        workers = self.num_workers if self.num_workers is not None else auto_workers
+        return replace(
+            self,
+            num_workers=workers,
+            persistent_workers=self.persistent_workers if self.persistent_workers is not None else workers > 0,
+            prefetch_factor=self.prefetch_factor if self.prefetch_factor is not None else (2 if workers else None),
+            num_threads=self.num_threads or max(1, cores - workers),
+            num_interop_threads=self.num_interop_threads or max(1, min(4, cores // 8)),
+        )
+
+    def dataloader_kwargs(self) -> Dict[str, Any]:
+        cfg = self.resolved()
+        kwargs: Dict[str, Any] = {"num_workers": cfg.num_workers, "pin_memory": cfg.pin_memory}
+        if cfg.num_workers > 0:
+            kwargs["persistent_workers"] = cfg.persistent_workers
+            kwargs["prefetch_factor"] = cfg.prefetch_factor
+        return kwargs
+
+    def apply_threads(self) -> None:
+        """Set torch's process-wide thread pools; call from entry points, not library code."""
+        cfg = self.resolved()
+        torch.set_num_threads(cfg.num_threads)
+        if torch.get_num_interop_threads() != cfg.num_interop_threads:
+            try:
+                torch.set_num_interop_threads(cfg.num_interop_threads)
+            except RuntimeError:
+                # Inter-op threads can only be set once, before any parallel work has started.
+                logger.warning("Inter-op thread count already fixed at %s", torch.get_num_interop_threads())
+        logger.info("Using %s intra-op threads and %s DataLoader workers", cfg.num_threads, cfg.num_workers)
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> "ParallelConfig":
+        return cls(
+            num_workers=args.num_workers,
+            pin_memory=args.pin_memory,
+            persistent_workers=args.persistent_workers,
+            prefetch_factor=args.prefetch_factor,
+            num_threads=args.num_threads,
+            num_interop_threads=args.num_interop_threads,
+        )
+
+
+def _parse_bool(value: str) -> bool:
+    return str(value).lower() in {"1", "true", "yes"}
+
+
+def add_parallel_arguments(parser: argparse.ArgumentParser) -> None:
+    """Register parallelism flags in both dash and SageMaker hyperparameter (underscore) spellings."""
+    for name, kwargs in [
+        ("num_workers", {"type": int, "default": None}),
+        ("pin_memory", {"type": _parse_bool, "default": False}),
+        ("persistent_workers", {"type": _parse_bool, "default": None}),
+        ("prefetch_factor", {"type": int, "default": None}),
+        ("num_threads", {"type": int, "default": None}),
+        ("num_interop_threads", {"type": int, "default": None}),
+    ]:
+        parser.add_argument(f"--{name.replace('_', '-')}", f"--{name}", dest=name, **kwargs)
@@ -0,0 +1,47 @@
+"""Opt-in bfloat16 autocast for CPU training and inference.
+
+Weights and optimizer state stay float32; under ``torch.autocast("cpu", dtype=torch.bfloat16)``
+matmul-heavy ops such as ``nn.Linear`` run in bfloat16, which Xeon CPUs with AVX-512 BF16 or
+AMX execute natively. On CPUs without native bf16 support autocast still works but is emulated
+and slower than float32, so :func:`resolve_precision` falls back to ``"fp32"`` there.
+"""
+from __future__ import annotations
+
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import ContextManager, Optional
+
+import torch
+
+from src.common.logging import configure_logging
+
+logger = configure_logging(__name__)
+
+PRECISIONS = ("fp32", "bf16")
+
+
+@lru_cache(maxsize=1)
+def bf16_supported() -> bool:
+    """Whether oneDNN reports native bfloat16 kernels for this CPU."""
+    try:
+        return bool(torch.backends.mkldnn.is_available() and torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except (AttributeError, RuntimeError):
+        return False
+
+
+def resolve_precision(precision: Optional[str]) -> str:
+    """Validate ``precision`` and downgrade ``"bf16"`` to ``"fp32"`` when the CPU lacks support."""
+    precision = precision or "fp32"
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unsupported precision {precision!r}; expected one of {PRECISIONS}")
+    if precision == "bf16" and not bf16_supported():
+        logger.warning("CPU has no native bfloat16 support; falling back to fp32")
+        return "fp32"
+    return precision
+
+
+def autocast(precision: str) -> ContextManager:
+    """bfloat16 autocast for ``"bf16"``, a no-op context otherwise."""
+    if precision == "bf16":
+        return torch.autocast("cpu", dtype=torch.bfloat16)
+    return nullcontext()
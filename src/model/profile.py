@@ -0,0 +1,344 @@
+"""One-pass, mergeable per-column profiles of tabular datasets.
+
+Each column keeps a null count, Welford mean/variance with min/max, a KLL quantile sketch
+(numeric columns) and a HyperLogLog distinct-count sketch. Every sketch merges exactly the way
+it updates, so shards can be profiled chunk by chunk in separate processes and combined with
+:meth:`DatasetProfile.merge`. Profiles serialize to a few KB per column as
+``feature_profile.json`` next to ``metrics.json``, and :meth:`DatasetProfile.flat_stats`
+produces the flat dict :func:`src.sagemaker.triggers.drift_checks.compute_simple_drift` expects.
+"""
+from __future__ import annotations
+
+import base64
+import json
+import math
+import pathlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.model.tables import DEFAULT_CHUNKSIZE, iter_frames
+
+PROFILE_FILE = "feature_profile.json"
+KLL_K = 200
+HLL_PRECISION = 12
+DEFAULT_QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+
+def _encode(arr: np.ndarray) -> str:
+    return base64.b64encode(np.ascontiguousarray(arr).tobytes()).decode("ascii")
+
+
+def _decode(data: str, dtype) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(data), dtype=dtype).copy()
+
+
+class KLLSketch:
+    """KLL quantile sketch: ~1.65/k normalized rank error with O(k) retained items.
+
+    Level ``h`` holds items of weight ``2**h``; a level over capacity is sorted and every other
+    item (random offset) is promoted to the level above.
+    """
+
+    def __init__(self, k: int = KLL_K, seed: int = 0):
+        self.k = k
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                items = np.sort(items)
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                paired = items[: len(items) - len(keep)]
+                promoted = paired[self._rng.integers(2) :: 2]
+                self.levels[level] = keep
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values: np.ndarray) -> None:
+        if len(values):
+            self.levels[0] = np.concatenate([self.levels[0], np.asarray(values, dtype=np.float64)])
+            self._compress()
+
+    def merge(self, other: "KLLSketch") -> None:
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self._compress()
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        items = np.concatenate(self.levels)
+        if not len(items):
+            return [None for _ in qs]
+        weights = np.concatenate([np.full(len(lvl), 2.0**h) for h, lvl in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, np.asarray(qs) * cumulative[-1], side="left")
+        return items[order][np.minimum(positions, len(items) - 1)].tolist()
+
+    def to_dict(self) -> Dict:
+        return {"k": self.k, "levels": [_encode(lvl) for lvl in self.levels]}
+
+    @classmethod
+    def from_dict(cls, raw: Dict) -> "KLLSketch":
+        sketch = cls(raw["k"])
+        sketch.levels = [_decode(lvl, np.float64) for lvl in raw["levels"]]
+        return sketch
+
+
+class HyperLogLog:
+    """Distinct-count sketch over 64-bit hashes; ~1.04/sqrt(2**precision) relative error."""
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values: np.ndarray) -> None:
+        if not len(values):
+            return
+        values = np.asarray(values)
+        # Canonical dtypes, so a column hashes the same whether it was read as float32 (like the
+        # model's features) or float64, int32 or int64.
+        if np.issubdtype(values.dtype, np.floating):
+            values = values.astype(np.float32)
+        elif np.issubdtype(values.dtype, np.integer):
+            values = values.astype(np.int64)
+        hashes = pd.util.hash_array(values)
+        p = np.uint64(self.precision)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.intp)
+        rest = hashes << p
+        # Bit length via the float exponent; rank = leading zeros of the remaining bits + 1.
+        bit_length = np.frexp(rest.astype(np.float64))[1]
+        rank = np.clip(64 - bit_length + 1, 1, 64 - self.precision + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> float:
+        m = float(len(self.registers))
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)
+        return float(raw)
+
+    def to_dict(self) -> Dict:
+        return {"precision": self.precision, "registers": _encode(self.registers)}
+
+    @classmethod
+    def from_dict(cls, raw: Dict) -> "HyperLogLog":
+        sketch = cls(raw["precision"])
+        sketch.registers = _decode(raw["registers"], np.uint8)
+        return sketch
+
+
+@dataclass
+class ColumnProfile:
+    numeric: bool
+    count: int = 0
+    nulls: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    min: Optional[float] = None
+    max: Optional[float] = None
+    quantiles: Optional[KLLSketch] = None
+    distinct: HyperLogLog = field(default_factory=HyperLogLog)
+
+    def __post_init__(self):
+        if self.numeric and self.quantiles is None:
+            self.quantiles = KLLSketch()
+
+    def _merge_moments(self, count: int, mean: float, m2: float, lo, hi) -> None:
+        # Chan et al. pairwise update: exact for any split of the data.
+        if not count:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = lo if self.min is None else min(self.min, lo)
+        self.max = hi if self.max is None else max(self.max, hi)
+
+    def update(self, values: np.ndarray) -> None:
+        if self.numeric:
+            values = np.asarray(values, dtype=np.float64)
+            present = values[~np.isnan(values)]
+        else:
+            present = values[~pd.isna(values)]
+        self.nulls += len(values) - len(present)
+        if self.numeric and len(present):
+            mean = float(present.mean())
+            m2 = float(((present - mean) ** 2).sum())
+            self._merge_moments(len(present), mean, m2, float(present.min()), float(present.max()))
+            self.quantiles.update(present)
+        elif not self.numeric:
+            self.count += len(present)
+        self.distinct.update(present)
+
+    def merge(self, other: "ColumnProfile") -> None:
+        self.nulls += other.nulls
+        if self.numeric:
+            self._merge_moments(other.count, other.mean, other.m2, other.min, other.max)
+            self.quantiles.merge(other.quantiles)
+        else:
+            self.count += other.count
+        self.distinct.merge(other.distinct)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / self.count) if self.count else 0.0
+
+    def summary(self, qs: Sequence[float] = DEFAULT_QUANTILES) -> Dict:
+        total = self.count + self.nulls
+        out = {
+            "count": self.count,
+            "nulls": self.nulls,
+            "null_fraction": self.nulls / total if total else 0.0,
+            "distinct": round(self.distinct.estimate()),
+        }
+        if self.numeric:
+            out.update({"mean": self.mean, "std": self.std, "min": self.min, "max": self.max})
+            out["quantiles"] = dict(zip((f"p{round(q * 100):02d}" for q in qs), self.quantiles.quantiles(qs)))
+        return out
+
+    def to_dict(self) -> Dict:
+        raw = {k: getattr(self, k) for k in ("numeric", "count", "nulls", "mean", "m2", "min", "max")}
+        raw["distinct"] = self.distinct.to_dict()
+        if self.quantiles is not None:
+            raw["quantiles"] = self.quantiles.to_dict()
+        return raw
+
+    @classmethod
+    def from_dict(cls, raw: Dict) -> "ColumnProfile":
+        raw = dict(raw)
+        raw["distinct"] = HyperLogLog.from_dict(raw["distinct"])
+        if "quantiles" in raw:
+            raw["quantiles"] = KLLSketch.from_dict(raw["quantiles"])
+        return cls(**raw)
+
+
+class DatasetProfile:
+    def __init__(self):
+        self.columns: Dict[str, ColumnProfile] = {}
+        self.rows = 0
+
+    def update_columns(self, columns: Dict[str, np.ndarray]) -> "DatasetProfile":
+        n_rows = None
+        for name, values in columns.items():
+            values = np.asarray(values)
+            if name not in self.columns:
+                self.columns[name] = ColumnProfile(numeric=np.issubdtype(values.dtype, np.number))
+            self.columns[name].update(values)
+            n_rows = len(values)
+        self.rows += n_rows or 0
+        return self
+
+    def update_frame(self, frame: pd.DataFrame) -> "DatasetProfile":
+        return self.update_columns({str(c): frame[c].to_numpy() for c in frame.columns})
+
+    def merge(self, other: "DatasetProfile") -> "DatasetProfile":
+        for name, column in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(column)
+            else:
+                self.columns[name] = column
+        self.rows += other.rows
+        return self
+
+    @classmethod
+    def from_array(cls, X: np.ndarray, names: Sequence[str], **extra: np.ndarray) -> "DatasetProfile":
+        columns = {name: X[:, i] for i, name in enumerate(names)}
+        columns.update(extra)
+        return cls().update_columns(columns)
+
+    @classmethod
+    def from_csv(cls, csv_path: str | pathlib.Path, chunksize: int = DEFAULT_CHUNKSIZE) -> "DatasetProfile":
+        profile = cls()
+        for chunk in iter_frames(csv_path, chunksize):
+            profile.update_frame(chunk)
+        return profile
+
+    def summary(self, qs: Sequence[float] = DEFAULT_QUANTILES) -> Dict[str, Dict]:
+        return {name: column.summary(qs) for name, column in self.columns.items()}
+
+    def flat_stats(self) -> Dict[str, float]:
+        """``{"<column>.<stat>": value}`` for numeric stats, as consumed by ``compute_simple_drift``."""
+        flat = {}
+        for name, column in self.columns.items():
+            summary = column.summary((0.5,))
+            flat[f"{name}.null_fraction"] = summary["null_fraction"]
+            flat[f"{name}.distinct"] = float(summary["distinct"])
+            if column.numeric and column.count:
+                flat[f"{name}.mean"] = summary["mean"]
+                flat[f"{name}.std"] = summary["std"]
+                flat[f"{name}.p50"] = summary["quantiles"]["p50"]
+        return flat
+
+    def to_dict(self) -> Dict:
+        return {"rows": self.rows, "columns": {name: column.to_dict() for name, column in self.columns.items()}}
+
+    @classmethod
+    def from_dict(cls, raw: Dict) -> "DatasetProfile":
+        profile = cls()
+        profile.rows = raw["rows"]
+        profile.columns = {name: ColumnProfile.from_dict(col) for name, col in raw["columns"].items()}
+        return profile
+
+    def save(self, output_dir: str | pathlib.Path) -> pathlib.Path:
+        path = pathlib.Path(output_dir) / PROFILE_FILE
+        path.write_text(json.dumps(self.to_dict(), separators=(",", ":")))
+        return path
+
+    @classmethod
+    def load(cls, output_dir: str | pathlib.Path) -> "DatasetProfile":
+        return cls.from_dict(json.loads((pathlib.Path(output_dir) / PROFILE_FILE).read_text()))
+
+
+def profile_files(
+    paths: Iterable[str | pathlib.Path], chunksize: int = DEFAULT_CHUNKSIZE, max_workers: Optional[int] = None
+) -> DatasetProfile:
+    """Profile CSV shards in parallel processes and merge the results."""
+    paths = list(paths)
+    if max_workers == 1 or len(paths) <= 1:
+        parts = [DatasetProfile.from_csv(p, chunksize) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            parts = list(pool.map(DatasetProfile.from_csv, paths, [chunksize] * len(paths)))
+    merged = DatasetProfile()
+    for part in parts:
+        merged.merge(part)
+    return merged
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Profile CSV shards with mergeable sketches")
+    parser.add_argument("csv", nargs="+")
+    parser.add_argument("--output-dir", default=".")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--max-workers", type=int, default=None)
+    args = parser.parse_args()
+    profile = profile_files(args.csv, args.chunksize, args.max_workers)
+    profile.save(args.output_dir)
+    print(json.dumps(profile.summary(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
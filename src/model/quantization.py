@@ -0,0 +1,56 @@
+"""Post-training dynamic int8 quantization of ``SimpleMLP``'s ``nn.Linear`` layers."""
+from __future__ import annotations
+
+import io
+import statistics
+import time
+from typing import Dict, Optional
+
+import numpy as np
+import torch
+from torch import nn
+
+QUANTIZATION_MODES = ("int8",)
+# Largest tolerated metric degradation: absolute accuracy drop for classification, relative
+# RMSE increase for regression.
+DEFAULT_MAX_METRIC_DELTA = 0.01
+
+
+def quantize_model(model: nn.Module, mode: Optional[str]) -> nn.Module:
+    """Return ``model`` with weights stored as int8 and activations quantized per batch at runtime.
+
+    ``mode=None`` returns the model unchanged. The float model is left untouched.
+    """
+    if mode is None:
+        return model
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(f"Unsupported quantization mode {mode!r}; expected one of {QUANTIZATION_MODES}")
+    quantized = torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+    return quantized.eval()
+
+
+def serialized_size(model: nn.Module) -> int:
+    buf = io.BytesIO()
+    torch.save(model.state_dict(), buf)
+    return buf.getbuffer().nbytes
+
+
+def latency_ms(model: nn.Module, X: np.ndarray, batch_size: int = 1, repeats: int = 200) -> float:
+    """Median wall time of one forward pass over ``batch_size`` rows of ``X``."""
+    batch = torch.from_numpy(np.ascontiguousarray(X[:batch_size]))
+    samples = []
+    with torch.inference_mode():
+        for _ in range(10):
+            model(batch)
+        for _ in range(repeats):
+            start = time.perf_counter()
+            model(batch)
+            samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def metric_delta(problem_type: str, baseline: Dict[str, float], candidate: Dict[str, float]) -> float:
+    """Degradation of ``candidate`` relative to ``baseline``; positive means worse."""
+    if problem_type == "regression":
+        return (candidate["rmse"] - baseline["rmse"]) / max(baseline["rmse"], 1e-12)
+    return baseline["accuracy"] - candidate["accuracy"]
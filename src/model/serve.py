@@ -0,0 +1,223 @@
+"""Minimal SageMaker-compatible model server with opt-in dynamic micro-batching.
+
+Implements the ``GET /ping`` and ``POST /invocations`` contract on ``SAGEMAKER_BIND_TO_PORT``
+(default 8080) using the handler functions in :mod:`src.model.inference`. Set
+``ENABLE_DYNAMIC_BATCHING=true`` to coalesce concurrent requests into one forward pass of up to
+``MAX_BATCH_SIZE`` rows, waiting at most ``MAX_BATCH_DELAY_MS`` for a batch to fill.
+"""
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import torch
+
+from src.common.logging import configure_logging
+from src.model import inference
+
+logger = configure_logging(__name__)
+
+DEFAULT_MODEL_DIR = "/opt/ml/model"
+SUPPORTED_MEDIA_TYPES = (inference.JSON_CONTENT_TYPE, inference.CSV_CONTENT_TYPE, inference.NPY_CONTENT_TYPE)
+
+
+class DynamicBatcher:
+    """Coalesce concurrent ``submit`` calls into batched ``predict`` calls on one worker thread.
+
+    The worker blocks for the first request, then keeps draining the queue until the batch
+    holds ``max_batch_size`` rows or ``max_delay_ms`` has elapsed since that first request, runs
+    ``predict`` once on the concatenated rows and scatters the output rows back to each caller.
+    A single request larger than ``max_batch_size`` is run on its own. If the batched call fails,
+    each request is retried alone so that one bad request only fails its own caller.
+    """
+
+    def __init__(self, predict: Callable[[np.ndarray], np.ndarray], max_batch_size: int = 64, max_delay_ms: float = 2.0):
+        self.predict = predict
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000.0
+        self._queue: "queue.Queue[Optional[Tuple[np.ndarray, Future]]]" = queue.Queue()
+        self._carry: Optional[Tuple[np.ndarray, Future]] = None
+        self._worker = threading.Thread(target=self._run, name="dynamic-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, rows: np.ndarray) -> np.ndarray:
+        future: Future = Future()
+        self._queue.put((rows, future))
+        return future.result()
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._worker.join()
+
+    def _collect(self, first: Tuple[np.ndarray, Future]) -> Tuple[List[Tuple[np.ndarray, Future]], bool]:
+        batch = [first]
+        n_rows = len(first[0])
+        deadline = time.monotonic() + self.max_delay
+        while n_rows < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            if n_rows + len(item[0]) > self.max_batch_size:
+                # Keep batches bounded: this request starts the next batch instead.
+                self._carry = item
+                break
+            batch.append(item)
+            n_rows += len(item[0])
+        return batch, False
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            first, self._carry = self._carry or self._queue.get(), None
+            if first is None:
+                return
+            batch, stop = self._collect(first)
+            try:
+                outputs = self.predict(np.concatenate([rows for rows, _ in batch]))
+            except Exception as exc:
+                if len(batch) == 1:
+                    first[1].set_exception(exc)
+                    continue
+                logger.warning("Batched predict failed (%s); retrying %s requests one by one", exc, len(batch))
+                for rows, future in batch:
+                    self._resolve(future, rows)
+                continue
+            offset = 0
+            for rows, future in batch:
+                future.set_result(outputs[offset : offset + len(rows)])
+                offset += len(rows)
+
+    def _resolve(self, future: Future, rows: np.ndarray) -> None:
+        try:
+            future.set_result(self.predict(rows))
+        except Exception as exc:
+            future.set_exception(exc)
+
+
+class ModelServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The stdlib default backlog of 5 resets connections under bursts of concurrent clients.
+    request_queue_size = 1024
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "false").lower() in {"1", "true", "yes"}
+
+
+def build_predictor(model) -> Callable[[np.ndarray], np.ndarray]:
+    return lambda rows: inference.predict_fn(torch.from_numpy(rows), model)
+
+
+def negotiate(accept: Optional[str]) -> Optional[str]:
+    """First media type in ``accept`` that :func:`inference.encode` produces; ``None`` if none is."""
+    for media_type in (accept or inference.JSON_CONTENT_TYPE).split(","):
+        media_type = media_type.split(";")[0].strip().lower()
+        if media_type in {"*/*", "application/*", ""}:
+            return inference.JSON_CONTENT_TYPE
+        if media_type in SUPPORTED_MEDIA_TYPES:
+            return media_type
+    return None
+
+
+def make_handler(predict: Callable[[np.ndarray], np.ndarray], input_dim: Optional[int] = None):
+    class InvocationHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _respond(self, status: int, body: bytes, content_type: str) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/ping":
+                self._respond(200, b"", "text/plain")
+            else:
+                self._respond(404, b"", "text/plain")
+
+        def do_POST(self):
+            if self.path != "/invocations":
+                self._respond(404, b"", "text/plain")
+                return
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            content_type = self.headers.get("Content-Type", inference.CSV_CONTENT_TYPE)
+            accept = negotiate(self.headers.get("Accept"))
+            if accept is None:
+                message = f"Unsupported Accept {self.headers.get('Accept')!r}; expected one of {SUPPORTED_MEDIA_TYPES}"
+                self._respond(406, message.encode("utf-8"), "text/plain")
+                return
+            if inference._media_type(content_type) not in SUPPORTED_MEDIA_TYPES:
+                self._respond(415, f"Unsupported content type {content_type}".encode("utf-8"), "text/plain")
+                return
+            try:
+                rows = inference.decode(body, content_type)
+            except (ValueError, KeyError, TypeError) as exc:
+                self._respond(400, f"Malformed {content_type} payload: {exc}".encode("utf-8"), "text/plain")
+                return
+            # Reject malformed rows here so they never reach (and fail) a shared batch.
+            if rows.ndim != 2 or (input_dim is not None and rows.shape[1] != input_dim):
+                message = f"Expected {input_dim} features per row, got shape {rows.shape}"
+                self._respond(400, message.encode("utf-8"), "text/plain")
+                return
+            try:
+                output = inference.encode(predict(rows), accept)
+            except Exception:
+                logger.exception("Prediction failed for a %s-row request", len(rows))
+                self._respond(500, b"Prediction failed", "text/plain")
+                return
+            self._respond(200, output if isinstance(output, bytes) else output.encode("utf-8"), accept)
+
+        def log_message(self, format, *args):
+            logger.debug(format, *args)
+
+    return InvocationHandler
+
+
+def create_server(
+    model,
+    host: str = "0.0.0.0",  # noqa: S104 - must listen on all interfaces inside the container
+    port: int = 8080,
+    dynamic_batching: bool = False,
+    max_batch_size: int = 64,
+    max_delay_ms: float = 2.0,
+) -> Tuple[ModelServer, Optional[DynamicBatcher]]:
+    predict = build_predictor(model)
+    batcher = None
+    if dynamic_batching:
+        batcher = DynamicBatcher(predict, max_batch_size=max_batch_size, max_delay_ms=max_delay_ms)
+        predict = batcher.submit
+    return ModelServer((host, port), make_handler(predict, inference.expected_features(model))), batcher
+
+
+def main():
+    model = inference.model_fn(os.getenv("SM_MODEL_DIR", DEFAULT_MODEL_DIR))
+    server, batcher = create_server(
+        model,
+        port=int(os.getenv("SAGEMAKER_BIND_TO_PORT", "8080")),
+        dynamic_batching=_env_flag("ENABLE_DYNAMIC_BATCHING"),
+        max_batch_size=int(os.getenv("MAX_BATCH_SIZE", "64")),
+        max_delay_ms=float(os.getenv("MAX_BATCH_DELAY_MS", "2")),
+    )
+    logger.info("Serving on port %s (dynamic batching %s)", server.server_address[1], "on" if batcher else "off")
+    try:
+        server.serve_forever()
+    finally:
+        if batcher:
+            batcher.close()
+
+
+if __name__ == "__main__":
+    main()
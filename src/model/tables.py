@@ -0,0 +1,98 @@
+"""Chunked CSV/Parquet table readers.
+
+Kept free of torch so that drift checks, profiling and the dataset cache import quickly; the
+torch datasets in :mod:`src.model.data` build on these readers.
+"""
+from __future__ import annotations
+
+import pathlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+LABEL_COLUMN = "label"
+DEFAULT_CHUNKSIZE = 65536
+
+
+TABLE_SUFFIXES = (".csv", ".csv.gz", ".parquet")
+
+
+def table_files(path: str | pathlib.Path) -> List[pathlib.Path]:
+    """``path`` itself, or the CSV/Parquet shards under it when it is a directory."""
+    path = pathlib.Path(path)
+    if not path.is_dir():
+        return [path]
+    files = sorted(p for p in path.rglob("*") if p.is_file() and p.name.endswith(TABLE_SUFFIXES))
+    if not files:
+        raise FileNotFoundError(f"No {', '.join(TABLE_SUFFIXES)} files under {path}")
+    return files
+
+
+def iter_frames(
+    path: str | pathlib.Path,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    columns: Optional[List[str]] = None,
+    dtype: Optional[Dict[str, type]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Read a CSV/Parquet file, or every shard of a directory, ``chunksize`` rows at a time."""
+    for file in table_files(path):
+        if file.suffix == ".parquet":
+            import pyarrow.parquet as pq
+
+            for batch in pq.ParquetFile(file).iter_batches(batch_size=chunksize, columns=columns):
+                frame = batch.to_pandas()
+                yield frame.astype(dtype) if dtype else frame
+        else:
+            yield from pd.read_csv(file, chunksize=chunksize, usecols=columns, dtype=dtype)
+
+
+def read_table(path: str | pathlib.Path) -> pd.DataFrame:
+    """Load a CSV/Parquet file, or concatenate every shard of a directory."""
+    frames = [pd.read_parquet(f) if f.suffix == ".parquet" else pd.read_csv(f) for f in table_files(path)]
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+def feature_columns(csv_path: str | pathlib.Path, label_column: str = LABEL_COLUMN) -> List[str]:
+    first = table_files(csv_path)[0]
+    if first.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        header = pq.read_schema(first).names
+    else:
+        header = pd.read_csv(first, nrows=0).columns
+    return [c for c in header if c != label_column]
+
+
+def float32_schema(columns: List[str]) -> Dict[str, type]:
+    return {c: np.float32 for c in columns}
+
+
+def iter_chunks(
+    csv_path: str | pathlib.Path,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    label_column: str = LABEL_COLUMN,
+    label_dtype: Optional[type] = None,
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Yield ``(X, y)`` chunks parsed straight into a float32 feature matrix."""
+    features = feature_columns(csv_path, label_column)
+    schema = float32_schema(features)
+    if label_dtype is not None:
+        schema[label_column] = label_dtype
+    for chunk in iter_frames(csv_path, chunksize, dtype=schema):
+        X = chunk[features].to_numpy(dtype=np.float32)
+        y = chunk[label_column].to_numpy()
+        yield X, y
+
+
+def scan_labels(
+    csv_path: str | pathlib.Path, chunksize: int = DEFAULT_CHUNKSIZE, label_column: str = LABEL_COLUMN
+) -> Tuple[int, np.ndarray]:
+    """Count rows and collect distinct labels reading only the label column."""
+    n_rows = 0
+    classes = None
+    for chunk in iter_frames(csv_path, chunksize, columns=[label_column]):
+        values = chunk[label_column].to_numpy()
+        n_rows += len(values)
+        classes = np.unique(values) if classes is None else np.union1d(classes, values)
+    return n_rows, classes if classes is not None else np.array([])
@@ -4,30 +4,124 @@ import json
 import os
 import pathlib
 import time
-from typing import Dict, Literal, Tuple
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Dict, List, Literal, Optional, Tuple
 
 import numpy as np
-import pandas as pd
 import torch
 from torch import nn
-from torch.utils.data import DataLoader, TensorDataset
+from torch.nn.parallel import DistributedDataParallel
+from torch.utils.data import DataLoader, DistributedSampler, TensorDataset
 
 from src.common.logging import configure_logging
 from src.common.metrics import classification_metrics, regression_metrics
+from src.model.checkpoint import CheckpointManager
+from src.model.data import ResidentBatches, StreamingTabularDataset
+from src.model.dataset_cache import open_cached
+from src.model.distributed import DEFAULT_BACKEND, DistributedContext
+from src.model.drift import BaselineBuilder, DriftBaseline
+from src.model.metadata import ModelMetadata, array_feature_stats, feature_stats, label_mapping
 from src.model.nn import SimpleMLP
+from src.model.parallel import ParallelConfig, add_parallel_arguments, available_cpus
+from src.model.precision import PRECISIONS, autocast, resolve_precision
+from src.model.profile import DatasetProfile
+from src.model.tables import DEFAULT_CHUNKSIZE, LABEL_COLUMN, feature_columns, read_table, scan_labels
 
 logger = configure_logging(__name__)
 
 ProblemType = Literal["classification", "regression"]
+DataMode = Literal["memory", "resident", "streaming"]
 
 
-def load_data(csv_path: str | pathlib.Path) -> Tuple[np.ndarray, np.ndarray]:
-    df = pd.read_csv(csv_path)
-    y = df["label"].values
-    X = df.drop(columns=["label"]).values.astype(np.float32)
+def load_data(csv_path: str | pathlib.Path, cache_dir: str | pathlib.Path | None = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Load ``(X, y)`` from a CSV/Parquet file or shard directory, or memory-mapped from the
+    dataset cache when ``cache_dir`` is set."""
+    if cache_dir is not None:
+        return open_cached(csv_path, cache_dir)
+    df = read_table(csv_path)
+    y = df["label"].to_numpy(copy=True)
+    X = np.require(df.drop(columns=["label"]).to_numpy(dtype=np.float32), requirements="W")
     return X, y
 
 
+def resolve_parallel(
+    parallel: ParallelConfig | None, data_mode: DataMode, distributed: DistributedContext | None = None
+) -> ParallelConfig:
+    """Auto-tune unset ``parallel`` fields for ``data_mode``, sharing cores among local ranks."""
+    processes = distributed.local_world_size if distributed else 1
+    cores = max(1, available_cpus() // processes)
+    return (parallel or ParallelConfig()).resolved(cores, streaming=data_mode == "streaming")
+
+
+def _compute_loss(criterion, preds: torch.Tensor, batch_y: torch.Tensor, problem_type: ProblemType) -> torch.Tensor:
+    if problem_type == "regression" or preds.shape[1] == 1:
+        return criterion(preds.squeeze(), batch_y.float())
+    return criterion(preds, batch_y.long())
+
+
+def _to_predictions(preds: torch.Tensor, problem_type: ProblemType, output_dim: int) -> np.ndarray:
+    preds = preds.float()
+    if problem_type == "regression":
+        return preds.squeeze().numpy()
+    if output_dim == 1:
+        return (preds.squeeze().numpy() > 0.5).astype(int)
+    return np.argmax(preds.numpy(), axis=1)
+
+
+@dataclass
+class TrainingArtifacts:
+    """What training learns about the data besides the weights; written by :func:`save_artifacts`."""
+
+    metadata: ModelMetadata
+    drift_baseline: Optional[DriftBaseline] = None
+    profile: Optional[DatasetProfile] = None
+
+    def save(self, output_dir: str | pathlib.Path) -> None:
+        self.metadata.save(output_dir)
+        if self.drift_baseline is not None:
+            self.drift_baseline.save(output_dir)
+        if self.profile is not None:
+            self.profile.save(output_dir)
+
+
+class _DataSummary:
+    """Feature stats, drift histograms and profile accumulated from streamed ``(X, y)`` chunks."""
+
+    def __init__(self, feature_names: List[str]):
+        self.feature_names = feature_names
+        self.sums = np.zeros(len(feature_names))
+        self.sq_sums = np.zeros(len(feature_names))
+        self.count = 0
+        self.baseline = BaselineBuilder(feature_names)
+        self.profile = DatasetProfile()
+
+    def update(self, X: np.ndarray, y: np.ndarray) -> None:
+        x64 = X.astype(np.float64)
+        self.sums += x64.sum(0)
+        self.sq_sums += (x64**2).sum(0)
+        self.count += len(X)
+        self.baseline.update(X)
+        columns = {name: X[:, i] for i, name in enumerate(self.feature_names)}
+        self.profile.update_columns({**columns, LABEL_COLUMN: y})
+
+    def stats(self) -> Dict[str, List[float]] | None:
+        return feature_stats(self.sums, self.sq_sums, self.count) if self.count else None
+
+
+def _collect_predictions(
+    model: SimpleMLP, batches, problem_type: ProblemType, output_dim: int, summary: _DataSummary | None = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    y_parts, pred_parts = [], []
+    with torch.no_grad():
+        for batch_x, batch_y in batches:
+            y_parts.append(batch_y.numpy())
+            pred_parts.append(np.atleast_1d(_to_predictions(model(batch_x), problem_type, output_dim)))
+            if summary is not None:
+                summary.update(batch_x.numpy(), batch_y.numpy())
+    return np.concatenate(y_parts), np.concatenate(pred_parts)
+
+
 def train_model(
     train_csv: str | pathlib.Path,
     val_csv: str | pathlib.Path,
@@ -36,60 +130,140 @@ def train_model(
     batch_size: int = 64,
     lr: float = 1e-3,
     seed: int = 42,
-) -> Tuple[SimpleMLP, Dict[str, float]]:
+    data_mode: DataMode = "memory",
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    shuffle_buffer: int = 65536,
+    cache_dir: str | pathlib.Path | None = None,
+    keep_top_k: int = 1,
+    half_precision_checkpoints: bool = False,
+    checkpoint_dir: str | pathlib.Path | None = None,
+    parallel: ParallelConfig | None = None,
+    distributed: DistributedContext | None = None,
+    precision: str = "fp32",
+) -> Tuple[SimpleMLP, Dict[str, float], TrainingArtifacts | None]:
+    """Train ``SimpleMLP`` on a train/val CSV pair.
+
+    ``data_mode="memory"`` loads both files up front. ``data_mode="streaming"`` reads them in
+    ``chunksize`` row chunks through :class:`StreamingTabularDataset`, shuffling via a bounded
+    ``shuffle_buffer``, so peak memory stays flat as the row count grows. In memory mode,
+    ``cache_dir`` opens both files zero-copy from the binary dataset cache instead of parsing CSV.
+    ``data_mode="resident"`` also loads everything up front but skips ``DataLoader``: minibatches
+    are sliced from a per-epoch permutation of the tensors and validation is a single forward pass.
+
+    Returns ``(model, metrics, artifacts)``. :class:`TrainingArtifacts` holds the
+    :class:`ModelMetadata` manifest (dims, feature names, feature stats, label mapping), a
+    :class:`DriftBaseline` of the training features and a :class:`DatasetProfile` of the training
+    data (features and label), all written out by :func:`save_artifacts`. In streaming mode they
+    are accumulated from the same chunks as the final training-set predictions, so the training
+    file is read once more after the last epoch, not once per artifact.
+
+    The weights of the ``keep_top_k`` best validation epochs are snapshotted by a
+    :class:`CheckpointManager` (optionally as float16 and spilled to ``checkpoint_dir``), and the
+    best one is restored before computing the returned metrics.
+
+    ``parallel`` controls DataLoader workers; unset fields are auto-tuned by
+    :func:`resolve_parallel`. Thread pools are process-wide, so ``train_model`` leaves them
+    alone: entry points call :meth:`ParallelConfig.apply_threads` before training.
+
+    With an enabled ``distributed`` context (its process group already joined), the model is
+    wrapped in ``DistributedDataParallel`` and each rank trains on its own shard of the training
+    data: a ``DistributedSampler`` in memory mode, a strided slice in resident mode, and a
+    share of the chunks in streaming mode. Validation losses are summed over all ranks so every
+    rank takes the same checkpoint and early-stopping decisions. Only rank 0 spills
+    checkpoints and computes metrics and artifacts; other ranks return their (identical) weights
+    with empty metrics and no artifacts.
+
+    ``precision="bf16"`` runs forward passes (training, validation and the returned metrics)
+    under bfloat16 autocast while weights stay float32; it falls back to float32 on CPUs
+    without native bf16 support.
+    """
+    dctx = distributed or DistributedContext()
+    precision = resolve_precision(precision)
     torch.manual_seed(seed)
     np.random.seed(seed)
+    loader_kwargs = resolve_parallel(parallel, data_mode, dctx).dataloader_kwargs()
+    train_sampler = None
 
-    X_train, y_train = load_data(train_csv)
-    X_val, y_val = load_data(val_csv)
-    input_dim = X_train.shape[1]
-    output_dim = 1 if problem_type == "regression" or len(np.unique(y_train)) == 2 else len(np.unique(y_train))
+    if data_mode == "streaming":
+        _, classes = scan_labels(train_csv, chunksize)
+        input_dim = len(feature_columns(train_csv))
+        label_dtype = np.float32 if problem_type == "regression" else np.int64
+        shard = {"num_replicas": dctx.world_size, "rank": dctx.rank}
+        train_ds = StreamingTabularDataset(
+            train_csv, batch_size, chunksize, shuffle_buffer=shuffle_buffer, seed=seed, label_dtype=label_dtype, **shard
+        )
+        val_ds = StreamingTabularDataset(val_csv, batch_size, chunksize, label_dtype=label_dtype, **shard)
+        # Rank 0's final pass reads both files whole, so its metrics cover every row; whole
+        # chunks also feed the profile and drift histograms.
+        eval_train_ds = StreamingTabularDataset(train_csv, chunksize, chunksize, label_dtype=label_dtype)
+        eval_val_ds = StreamingTabularDataset(val_csv, chunksize, chunksize, label_dtype=label_dtype)
+        train_loader = DataLoader(train_ds, batch_size=None, **loader_kwargs)
+        val_loader = DataLoader(val_ds, batch_size=None, **loader_kwargs)
+    else:
+        X_train, y_train = load_data(train_csv, cache_dir)
+        X_val, y_val = load_data(val_csv, cache_dir)
+        classes = np.unique(y_train)
+        input_dim = X_train.shape[1]
+        train_ds = TensorDataset(torch.from_numpy(X_train), torch.from_numpy(np.asarray(y_train)))
+        val_ds = TensorDataset(torch.from_numpy(X_val), torch.from_numpy(np.asarray(y_val)))
+        if data_mode == "resident":
+            rank_rows = slice(dctx.rank, None, dctx.world_size)
+            train_loader = ResidentBatches(
+                train_ds.tensors[0][rank_rows], train_ds.tensors[1][rank_rows], batch_size=batch_size, seed=seed
+            )
+            val_loader = [val_ds.tensors]
+        elif dctx.enabled:
+            train_sampler = DistributedSampler(train_ds, dctx.world_size, dctx.rank, shuffle=True, seed=seed)
+            val_sampler = DistributedSampler(val_ds, dctx.world_size, dctx.rank, shuffle=False)
+            train_loader = DataLoader(train_ds, batch_size=batch_size, sampler=train_sampler, **loader_kwargs)
+            val_loader = DataLoader(val_ds, batch_size=batch_size, sampler=val_sampler, **loader_kwargs)
+        else:
+            train_loader = DataLoader(train_ds, batch_size=batch_size, shuffle=True, **loader_kwargs)
+            val_loader = DataLoader(val_ds, batch_size=batch_size, **loader_kwargs)
+
+    output_dim = 1 if problem_type == "regression" or len(classes) == 2 else len(classes)
     model = SimpleMLP(input_dim=input_dim, output_dim=output_dim, problem_type=problem_type)
     criterion = nn.MSELoss() if problem_type == "regression" else nn.CrossEntropyLoss()
+    # DDP broadcasts rank 0's initial weights and all-reduces gradients in backward().
+    ddp_model = DistributedDataParallel(model) if dctx.enabled else model
     optimizer = torch.optim.Adam(model.parameters(), lr=lr)
 
-    train_ds = TensorDataset(torch.tensor(X_train, dtype=torch.float32), torch.tensor(y_train))
-    val_ds = TensorDataset(torch.tensor(X_val, dtype=torch.float32), torch.tensor(y_val))
-
-    train_loader = DataLoader(train_ds, batch_size=batch_size, shuffle=True)
-    val_loader = DataLoader(val_ds, batch_size=batch_size)
-
+    checkpoints = CheckpointManager(
+        keep_top_k, half_precision_checkpoints, checkpoint_dir if dctx.is_main else None
+    )
     best_val = float("inf")
-    best_state = None
     patience, patience_counter = 2, 0
 
     for epoch in range(epochs):
+        if data_mode == "streaming":
+            train_ds.set_epoch(epoch)
+        if train_sampler is not None:
+            train_sampler.set_epoch(epoch)
         model.train()
-        for batch_x, batch_y in train_loader:
-            optimizer.zero_grad()
-            preds = model(batch_x)
-            if problem_type == "regression":
-                loss = criterion(preds.squeeze(), batch_y.float())
-            else:
-                if preds.shape[1] == 1:
-                    loss = criterion(preds.squeeze(), batch_y.float())
-                else:
-                    loss = criterion(preds, batch_y.long())
-            loss.backward()
-            optimizer.step()
+        # Ranks may get a different number of batches; join() shadows the collectives of
+        # ranks that finish early.
+        with ddp_model.join() if dctx.enabled else nullcontext():
+            for batch_x, batch_y in train_loader:
+                optimizer.zero_grad()
+                with autocast(precision):
+                    preds = ddp_model(batch_x)
+                loss = _compute_loss(criterion, preds.float(), batch_y, problem_type)
+                loss.backward()
+                optimizer.step()
 
         val_loss = 0.0
+        n_val_batches = 0
         model.eval()
-        with torch.no_grad():
+        with torch.no_grad(), autocast(precision):
             for batch_x, batch_y in val_loader:
-                preds = model(batch_x)
-                if problem_type == "regression":
-                    val_loss += criterion(preds.squeeze(), batch_y.float()).item()
-                else:
-                    if preds.shape[1] == 1:
-                        val_loss += criterion(preds.squeeze(), batch_y.float()).item()
-                    else:
-                        val_loss += criterion(preds, batch_y.long()).item()
-        val_loss /= len(val_loader)
+                val_loss += _compute_loss(criterion, model(batch_x).float(), batch_y, problem_type).item()
+                n_val_batches += 1
+        val_loss, n_val_batches = dctx.all_reduce_sum(val_loss, n_val_batches)
+        val_loss /= max(n_val_batches, 1)
         logger.info("Epoch %s validation loss %.4f", epoch, val_loss)
+        checkpoints.update(model, epoch, val_loss)
         if val_loss < best_val:
             best_val = val_loss
-            best_state = model.state_dict()
             patience_counter = 0
         else:
             patience_counter += 1
@@ -97,31 +271,74 @@ def train_model(
                 logger.info("Early stopping at epoch %s", epoch)
                 break
 
-    if best_state:
-        model.load_state_dict(best_state)
+    checkpoints.restore(model)
+    checkpoints.close()
+    if not dctx.is_main:
+        return model, {}, None
 
     model.eval()
-    with torch.no_grad():
-        train_preds = model(torch.tensor(X_train, dtype=torch.float32))
-        val_preds = model(torch.tensor(X_val, dtype=torch.float32))
+    features = feature_columns(train_csv)
+    if data_mode == "streaming":
+        summary = _DataSummary(features)
+        with autocast(precision):
+            y_val, val_pred_labels = _collect_predictions(
+                model, DataLoader(eval_val_ds, batch_size=None, **loader_kwargs), problem_type, output_dim
+            )
+            y_train, train_pred_labels = _collect_predictions(
+                model,
+                DataLoader(eval_train_ds, batch_size=None, **loader_kwargs),
+                problem_type,
+                output_dim,
+                summary=summary,
+            )
+        train_stats, drift_baseline, profile = summary.stats(), summary.baseline.build(), summary.profile
+    else:
+        X_train_t = train_ds.tensors[0]
+        train_stats = array_feature_stats(X_train_t.numpy())
+        drift_baseline = DriftBaseline.from_array(X_train_t.numpy(), features)
+        profile = DatasetProfile.from_array(X_train_t.numpy(), features, **{LABEL_COLUMN: np.asarray(y_train)})
+        with torch.no_grad(), autocast(precision):
+            train_pred_labels = _to_predictions(model(X_train_t), problem_type, output_dim)
+            val_pred_labels = _to_predictions(model(val_ds.tensors[0]), problem_type, output_dim)
+    metadata = ModelMetadata(
+        input_dim=input_dim,
+        output_dim=output_dim,
+        problem_type=problem_type,
+        feature_names=features,
+        feature_stats=train_stats,
+        label_mapping=label_mapping(classes, problem_type),
+    )
     if problem_type == "regression":
-        metrics = regression_metrics(y_val, val_preds.squeeze().numpy())
+        metrics = regression_metrics(y_val, val_pred_labels)
     else:
-        if output_dim == 1:
-            train_pred_labels = (train_preds.squeeze().numpy() > 0.5).astype(int)
-            val_pred_labels = (val_preds.squeeze().numpy() > 0.5).astype(int)
-        else:
-            train_pred_labels = np.argmax(train_preds.numpy(), axis=1)
-            val_pred_labels = np.argmax(val_preds.numpy(), axis=1)
         metrics = classification_metrics(y_val, val_pred_labels)
         metrics["train_accuracy"] = float(classification_metrics(y_train, train_pred_labels)["accuracy"])
-    return model, metrics
+    return model, metrics, TrainingArtifacts(metadata, drift_baseline, profile)
+
 
+def save_artifacts(
+    model: SimpleMLP,
+    metrics: Dict[str, float],
+    output_dir: str | pathlib.Path,
+    artifacts: TrainingArtifacts | None = None,
+) -> None:
+    """Write ``model.pt``, ``metrics.json`` and ``artifacts`` (manifest, drift baseline, profile).
 
-def save_artifacts(model: SimpleMLP, metrics: Dict[str, float], output_dir: str | pathlib.Path) -> None:
+    Without ``artifacts`` only a manifest of the model's dims is written.
+    """
     out_path = pathlib.Path(output_dir)
     out_path.mkdir(parents=True, exist_ok=True)
     torch.save(model.state_dict(), out_path / "model.pt")
+    if artifacts is None:
+        artifacts = TrainingArtifacts(
+            ModelMetadata(
+                input_dim=model.model[0].in_features,
+                output_dim=model.model[-1].out_features,
+                problem_type=model.problem_type,
+                hidden_dim=model.model[0].out_features,
+            )
+        )
+    artifacts.save(out_path)
     with open(out_path / "metrics.json", "w", encoding="utf-8") as f:
         json.dump(metrics, f, indent=2)
 
@@ -136,12 +353,45 @@ def main():
     parser.add_argument("--output-dir", default="artifacts/run-default")
     parser.add_argument("--epochs", type=int, default=5)
     parser.add_argument("--run-id", default=None)
+    parser.add_argument("--data-mode", choices=["memory", "resident", "streaming"], default="memory")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--shuffle-buffer", type=int, default=65536)
+    parser.add_argument("--cache-dir", default=os.getenv("DATASET_CACHE_DIR"))
+    parser.add_argument("--keep-top-k", type=int, default=1)
+    parser.add_argument("--half-precision-checkpoints", action="store_true")
+    parser.add_argument("--checkpoint-dir", default=None)
+    parser.add_argument("--dist-backend", "--dist_backend", dest="dist_backend", default=DEFAULT_BACKEND)
+    parser.add_argument("--precision", choices=PRECISIONS, default="fp32", help="bf16: bfloat16 autocast on CPU")
+    add_parallel_arguments(parser)
     args = parser.parse_args()
     run_id = args.run_id or f"run-{int(time.time())}"
     output_dir = pathlib.Path(args.output_dir) / run_id
-    model, metrics = train_model(args.train_csv, args.val_csv, args.problem_type, epochs=args.epochs)
-    save_artifacts(model, metrics, output_dir)
-    logger.info("Saved artifacts to %s", output_dir)
+    # torchrun (or SageMaker SM_HOSTS) decides the world; a plain launch trains in one process.
+    distributed = DistributedContext.from_env(backend=args.dist_backend).init()
+    parallel = resolve_parallel(ParallelConfig.from_args(args), args.data_mode, distributed)
+    parallel.apply_threads()
+    try:
+        model, metrics, artifacts = train_model(
+            args.train_csv,
+            args.val_csv,
+            args.problem_type,
+            epochs=args.epochs,
+            data_mode=args.data_mode,
+            chunksize=args.chunksize,
+            shuffle_buffer=args.shuffle_buffer,
+            cache_dir=args.cache_dir,
+            keep_top_k=args.keep_top_k,
+            half_precision_checkpoints=args.half_precision_checkpoints,
+            checkpoint_dir=args.checkpoint_dir,
+            parallel=parallel,
+            distributed=distributed,
+            precision=args.precision,
+        )
+        if distributed.is_main:
+            save_artifacts(model, metrics, output_dir, artifacts)
+            logger.info("Saved artifacts to %s", output_dir)
+    finally:
+        distributed.shutdown()
 
 
 if __name__ == "__main__":
@@ -1,22 +1,214 @@
+"""Concurrent status monitoring for AutoPilot jobs and pipeline executions.
+
+:func:`watch` tracks any number of targets from one event loop and yields a
+:class:`StatusChange` whenever a target's status changes. Each target polls its ``Describe*``
+API through one shared boto3 client (run in worker threads, at most ``max_concurrency`` calls
+in flight), waiting an exponentially growing, fully jittered delay while nothing changes;
+throttling errors also just extend the wait.
+
+With ``events`` (any async iterable of EventBridge events, e.g. :func:`sqs_events` on the queue
+targeted by :func:`src.sagemaker.triggers.eventbridge_rules.sagemaker_status_rule`), a matching
+event wakes its target immediately and polling only serves as a slow safety net. Pipeline
+executions emit status-change events; AutoPilot jobs have none of their own and are woken by
+any event naming them, otherwise they fall back to polling.
+"""
 from __future__ import annotations
 
-import time
+import asyncio
+import json
+import random
+from dataclasses import dataclass, field
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional
 
 import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
 
 from src.common.logging import configure_logging
 
 logger = configure_logging(__name__)
 
+AUTOPILOT = "autopilot"
+PIPELINE = "pipeline"
+TERMINAL_STATUSES = {
+    AUTOPILOT: {"Completed", "Failed", "Stopped"},
+    PIPELINE: {"Succeeded", "Failed", "Stopped"},
+}
+THROTTLING_ERRORS = {"ThrottlingException", "Throttling", "TooManyRequestsException", "RequestLimitExceeded"}
+CLIENT_CONFIG = Config(retries={"mode": "adaptive", "max_attempts": 5}, max_pool_connections=20)
 
-def monitor_job(job_name: str, region: str | None = None, poll: int = 30):
-    client = boto3.client("sagemaker", region_name=region)
+
+@dataclass(frozen=True)
+class Backoff:
+    """Full-jitter exponential backoff: ``uniform(0, min(maximum, initial * multiplier**attempt))``."""
+
+    initial: float = 5.0
+    maximum: float = 60.0
+    multiplier: float = 2.0
+    # Floor so a run of small jittered delays cannot hammer the API.
+    minimum: float = 1.0
+
+    def delay(self, attempt: int, rng: random.Random = random) -> float:
+        cap = min(self.maximum, self.initial * self.multiplier**attempt)
+        return max(self.minimum, rng.uniform(0, cap))
+
+
+# With events waking targets, polling only has to catch missed or absent events.
+EVENT_DRIVEN_BACKOFF = Backoff(initial=60.0, maximum=600.0)
+
+
+@dataclass(frozen=True)
+class Target:
+    kind: str
+    name: str
+
+    @classmethod
+    def autopilot(cls, job_name: str) -> "Target":
+        return cls(AUTOPILOT, job_name)
+
+    @classmethod
+    def pipeline(cls, execution_arn: str) -> "Target":
+        return cls(PIPELINE, execution_arn)
+
+    def describe(self, client) -> Dict:
+        if self.kind == AUTOPILOT:
+            return client.describe_auto_ml_job_v2(AutoMLJobName=self.name)
+        return client.describe_pipeline_execution(PipelineExecutionArn=self.name)
+
+    def status(self, response: Dict) -> tuple:
+        if self.kind == AUTOPILOT:
+            return response["AutoMLJobStatus"], response.get("AutoMLJobSecondaryStatus", "")
+        return response["PipelineExecutionStatus"], ""
+
+    def matches(self, event: Dict) -> bool:
+        """Whether an EventBridge event names this target (by ARN, name or ARN suffix)."""
+        keys = set(event.get("resources", []))
+        keys.update(v for v in event.get("detail", {}).values() if isinstance(v, str))
+        return self.name in keys or any(k.endswith("/" + self.name) for k in keys)
+
+
+@dataclass(frozen=True)
+class StatusChange:
+    target: Target
+    status: str
+    secondary_status: str = ""
+    terminal: bool = False
+    response: Dict = field(default_factory=dict, compare=False, repr=False)
+
+
+async def _poll(
+    target: Target,
+    client,
+    backoff: Backoff,
+    limiter: asyncio.Semaphore,
+    wake: asyncio.Event,
+    out: asyncio.Queue,
+    rng: random.Random,
+) -> None:
+    last, attempt = None, 0
     while True:
-        resp = client.describe_auto_ml_job_v2(AutoMLJobName=job_name)
-        status = resp["AutoMLJobStatus"]
-        sec_status = resp.get("AutoMLJobSecondaryStatus", "")
-        logger.info("AutoPilot job %s status: %s %s", job_name, status, sec_status)
-        if status in {"Completed", "Failed", "Stopped"}:
-            break
-        time.sleep(poll)
-    return resp
+        # Cleared before describing, so an event arriving mid-call still triggers another look.
+        wake.clear()
+        async with limiter:
+            try:
+                response = await asyncio.to_thread(target.describe, client)
+            except ClientError as exc:
+                if exc.response.get("Error", {}).get("Code") not in THROTTLING_ERRORS:
+                    raise
+                logger.info("Throttled describing %s; backing off", target.name)
+                response = None
+        if response is not None:
+            status, secondary = target.status(response)
+            terminal = status in TERMINAL_STATUSES[target.kind]
+            if (status, secondary) != last:
+                last, attempt = (status, secondary), 0
+                await out.put(StatusChange(target, status, secondary, terminal, response))
+            if terminal:
+                return
+        try:
+            await asyncio.wait_for(wake.wait(), timeout=backoff.delay(attempt, rng))
+            attempt = 0
+        except asyncio.TimeoutError:
+            attempt += 1
+
+
+async def _route(events: AsyncIterable[Dict], wakes: Dict[Target, asyncio.Event]) -> None:
+    async for event in events:
+        for target, wake in wakes.items():
+            if target.matches(event):
+                wake.set()
+
+
+async def watch(
+    targets: Iterable[Target],
+    client=None,
+    backoff: Optional[Backoff] = None,
+    max_concurrency: int = 10,
+    events: Optional[AsyncIterable[Dict]] = None,
+    seed: Optional[int] = None,
+) -> AsyncIterator[StatusChange]:
+    """Yield status changes of all ``targets`` until every one reaches a terminal status.
+
+    The first status of each target is always yielded. An error other than throttling from a
+    ``Describe*`` call propagates out of the generator. ``backoff`` defaults to
+    :data:`EVENT_DRIVEN_BACKOFF` when ``events`` is given and to ``Backoff()`` otherwise.
+    """
+    backoff = backoff or (EVENT_DRIVEN_BACKOFF if events is not None else Backoff())
+    targets = list(dict.fromkeys(targets))
+    client = client or boto3.client("sagemaker", config=CLIENT_CONFIG)
+    limiter = asyncio.Semaphore(max_concurrency)
+    rng = random.Random(seed)
+    out: asyncio.Queue = asyncio.Queue()
+    wakes = {t: asyncio.Event() for t in targets}
+    pollers = [asyncio.create_task(_poll(t, client, backoff, limiter, wakes[t], out, rng)) for t in targets]
+    router = asyncio.create_task(_route(events, wakes)) if events is not None else None
+    pending = set(pollers)
+    try:
+        while pending or not out.empty():
+            getter = asyncio.create_task(out.get())
+            done, _ = await asyncio.wait(pending | {getter}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                yield getter.result()
+            else:
+                getter.cancel()
+            for task in done - {getter}:
+                pending.discard(task)
+                task.result()
+    finally:
+        for task in pollers + ([router] if router else []):
+            task.cancel()
+        await asyncio.gather(*pollers, *([router] if router else []), return_exceptions=True)
+
+
+async def sqs_events(queue_url: str, client=None, wait_seconds: int = 20) -> AsyncIterator[Dict]:
+    """Long-poll an SQS queue fed by EventBridge, yielding (and deleting) each event."""
+    client = client or boto3.client("sqs")
+    while True:
+        response = await asyncio.to_thread(
+            client.receive_message, QueueUrl=queue_url, MaxNumberOfMessages=10, WaitTimeSeconds=wait_seconds
+        )
+        for message in response.get("Messages", []):
+            yield json.loads(message["Body"])
+            await asyncio.to_thread(client.delete_message, QueueUrl=queue_url, ReceiptHandle=message["ReceiptHandle"])
+
+
+async def wait_all(targets: Iterable[Target], **kwargs) -> Dict[Target, StatusChange]:
+    """Final status of every target."""
+    final: Dict[Target, StatusChange] = {}
+    async for change in watch(targets, **kwargs):
+        logger.info("%s %s status: %s %s", change.target.kind, change.target.name, change.status, change.secondary_status)
+        if change.terminal:
+            final[change.target] = change
+    return final
+
+
+def monitor_jobs(job_names: List[str], region: str | None = None, **kwargs) -> Dict[str, Dict]:
+    """Block until all AutoPilot jobs finish; returns the final describe response per job."""
+    client = boto3.client("sagemaker", region_name=region, config=CLIENT_CONFIG)
+    final = asyncio.run(wait_all([Target.autopilot(n) for n in job_names], client=client, **kwargs))
+    return {target.name: change.response for target, change in final.items()}
+
+
+def monitor_job(job_name: str, region: str | None = None, poll: int = 30):
+    """Block until one AutoPilot job finishes, polling at most every ``poll`` seconds."""
+    return monitor_jobs([job_name], region, backoff=Backoff(maximum=poll))[job_name]
@@ -1,7 +1,19 @@
+"""Top-k AutoPilot candidate selection over every page of ``ListCandidatesForAutoMLJob``.
+
+Candidates are requested sorted server-side by ``FinalObjectiveMetricValue`` in the direction
+of the objective, streamed page by page into a bounded heap, and pagination stops once a page
+starts below the current k-th best objective (ties still read on, as tie-breaks may reorder
+them). Ties on the objective are broken by candidate metrics such as ``InferenceLatency``, or by
+any callable, e.g. one returning the model size.
+"""
 from __future__ import annotations
 
+import heapq
 import json
-from typing import Dict
+import math
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
 import boto3
 
@@ -9,22 +21,138 @@ from src.common.logging import configure_logging
 
 logger = configure_logging(__name__)
 
+PAGE_SIZE = 100
+MINIMIZE = "Minimize"
 
-def select_best_candidate(job_name: str, region: str | None = None) -> Dict[str, str]:
-    client = boto3.client("sagemaker", region_name=region)
-    candidates = client.list_auto_ml_candidates(AutoMLJobName=job_name, StatusEquals="Completed")[
-        "Candidates"
-    ]
-    if not candidates:
-        raise RuntimeError("No completed candidates")
-    best = sorted(candidates, key=lambda c: c["FinalAutoMLJobObjectiveMetric"]["Value"], reverse=True)[0]
-    result = {
-        "candidate_name": best["CandidateName"],
-        "metric": best["FinalAutoMLJobObjectiveMetric"]["MetricName"],
-        "value": best["FinalAutoMLJobObjectiveMetric"]["Value"],
-        "model_artifacts": best["InferenceContainers"][0]["ModelDataUrl"],
+
+@dataclass(frozen=True)
+class TieBreaker:
+    """Secondary sort key; ``value`` defaults to reading candidate metric ``name``."""
+
+    name: str
+    minimize: bool = True
+    value: Optional[Callable[[Dict], Optional[float]]] = None
+
+    def __call__(self, candidate: Dict) -> Optional[float]:
+        if self.value is not None:
+            return self.value(candidate)
+        for metric in candidate.get("CandidateProperties", {}).get("CandidateMetrics", []):
+            if self.name in (metric.get("StandardMetricName"), metric.get("MetricName")):
+                return metric.get("Value")
+        return None
+
+
+INFERENCE_LATENCY = TieBreaker("InferenceLatency")
+DEFAULT_TIE_BREAKERS = (INFERENCE_LATENCY,)
+
+
+def _oriented(value: Optional[float], minimize: bool) -> float:
+    """Larger is better; missing values rank last."""
+    if value is None or math.isnan(value):
+        return -math.inf
+    return -value if minimize else value
+
+
+def _objective(candidate: Dict) -> Tuple[float, bool]:
+    objective = candidate["FinalAutoMLJobObjectiveMetric"]
+    return objective["Value"], objective.get("Type") == MINIMIZE
+
+
+def _rank_key(candidate: Dict, tie_breakers: Sequence[TieBreaker]) -> Tuple[float, ...]:
+    value, minimize = _objective(candidate)
+    return (_oriented(value, minimize),) + tuple(_oriented(tb(candidate), tb.minimize) for tb in tie_breakers)
+
+
+def iter_candidates(client, job_name: str, minimize: bool = False, page_size: int = PAGE_SIZE) -> Iterator[Dict]:
+    """Completed candidates of ``job_name``, best objective first, across all pages."""
+    paginator = client.get_paginator("list_candidates_for_auto_ml_job")
+    pages = paginator.paginate(
+        AutoMLJobName=job_name,
+        StatusEquals="Completed",
+        SortBy="FinalObjectiveMetricValue",
+        SortOrder="Ascending" if minimize else "Descending",
+        PaginationConfig={"PageSize": page_size},
+    )
+    for page in pages:
+        yield from page.get("Candidates", [])
+
+
+def top_candidates(
+    client,
+    job_name: str,
+    k: int = 1,
+    tie_breakers: Sequence[TieBreaker] = DEFAULT_TIE_BREAKERS,
+    minimize: bool = False,
+    page_size: int = PAGE_SIZE,
+) -> List[Dict]:
+    """The ``k`` best completed candidates of ``job_name``, best first.
+
+    ``minimize`` sets the requested server-side order and must match the objective (e.g. True
+    for MSE); each candidate's reported objective ``Type`` still decides the ranking, and early
+    termination is only used while the two agree.
+    """
+    heap: List[Tuple[Tuple[float, ...], int, Dict]] = []
+    seen = 0
+    for candidate in iter_candidates(client, job_name, minimize, page_size):
+        if "FinalAutoMLJobObjectiveMetric" not in candidate:
+            continue
+        value, cand_minimize = _objective(candidate)
+        if len(heap) == k and cand_minimize == minimize and _oriented(value, minimize) < heap[0][0][0]:
+            break
+        # -seen: on a full tie the candidate listed first wins.
+        entry = (_rank_key(candidate, tie_breakers), -seen, candidate)
+        seen += 1
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+    return [entry[2] for entry in sorted(heap, key=lambda e: e[:2], reverse=True)]
+
+
+def candidate_summary(candidate: Dict, job_name: str, tie_breakers: Sequence[TieBreaker] = DEFAULT_TIE_BREAKERS) -> Dict:
+    objective = candidate["FinalAutoMLJobObjectiveMetric"]
+    containers = candidate.get("InferenceContainers") or []
+    summary = {
+        "job_name": job_name,
+        "candidate_name": candidate["CandidateName"],
+        "metric": objective["MetricName"],
+        "value": objective["Value"],
+        "model_artifacts": containers[0]["ModelDataUrl"] if containers else None,
     }
-    with open("best_candidate.json", "w", encoding="utf-8") as f:
+    summary.update({tb.name: tb(candidate) for tb in tie_breakers})
+    return summary
+
+
+def select_top_k(
+    job_names: Sequence[str],
+    k: int = 1,
+    tie_breakers: Sequence[TieBreaker] = DEFAULT_TIE_BREAKERS,
+    minimize: bool = False,
+    client=None,
+    region: str | None = None,
+    max_workers: int = 8,
+) -> List[Dict]:
+    """Best ``k`` candidates across ``job_names``, listed concurrently with one shared client."""
+    client = client or boto3.client("sagemaker", region_name=region)
+
+    def per_job(job_name: str):
+        return [(job_name, c) for c in top_candidates(client, job_name, k, tie_breakers, minimize)]
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(job_names)))) as pool:
+        results = [pair for pairs in pool.map(per_job, job_names) for pair in pairs]
+    # Stable sort keeps job order, then server order, for full ties.
+    ranked = sorted(results, key=lambda pair: _rank_key(pair[1], tie_breakers), reverse=True)[:k]
+    return [candidate_summary(candidate, job_name, tie_breakers) for job_name, candidate in ranked]
+
+
+def select_best_candidate(
+    job_name: str, region: str | None = None, output_path: str = "best_candidate.json", minimize: bool = False
+) -> Dict[str, str]:
+    results = select_top_k([job_name], k=1, minimize=minimize, region=region)
+    if not results:
+        raise RuntimeError("No completed candidates")
+    result = results[0]
+    with open(output_path, "w", encoding="utf-8") as f:
         json.dump(result, f, indent=2)
     logger.info("Best candidate %s with metric %s=%s", result["candidate_name"], result["metric"], result["value"])
     return result
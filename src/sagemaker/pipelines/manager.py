@@ -0,0 +1,212 @@
+"""Pipeline lifecycle without rebuilding the SageMaker SDK objects on every call.
+
+Building the pipeline with the SDK constructs a ``PipelineSession`` and every step's
+processors/estimators, and uploads step code to S3, which takes seconds. :class:`PipelineManager`
+only does that when the *definition hash* changes: a SHA-256 over the resolved configuration and
+the content of the step code (``src/sagemaker/pipelines`` and the ``src/model`` training source
+directory). The built definition is cached on disk under that hash, and the hash is recorded in
+the deployed pipeline's description, so :meth:`PipelineManager.upsert` is a single
+``DescribePipeline`` call when nothing changed. Starting and describing executions go straight
+through a boto3 client and never import the SDK.
+"""
+from __future__ import annotations
+
+import hashlib
+import importlib.metadata
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import boto3
+
+from src.common.config import ProjectConfig, load_yaml, thaw
+from src.common.logging import configure_logging
+
+logger = configure_logging(__name__)
+
+SRC_ROOT = Path(__file__).resolve().parents[2]
+CODE_PATHS = (SRC_ROOT / "sagemaker" / "pipelines", SRC_ROOT / "model")
+DEFAULT_CACHE_DIR = Path(os.getenv("PIPELINE_CACHE_DIR", ".cache/pipelines"))
+HASH_MARKER = "definition-hash:"
+
+
+def _sdk_version() -> Optional[str]:
+    # The SDK renders image URIs and step arguments, so its version is part of the definition.
+    try:
+        return importlib.metadata.version("sagemaker")
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def _code_files(paths: Iterable[Path]) -> List[Path]:
+    files = []
+    for root in paths:
+        files.extend(p for p in root.rglob("*") if p.is_file() and "__pycache__" not in p.parts and p.suffix != ".pyc")
+    return sorted(files)
+
+
+def _update_with_code(digest, code_paths: Iterable[Path]) -> None:
+    for path in _code_files(code_paths):
+        digest.update(str(path.relative_to(SRC_ROOT) if path.is_relative_to(SRC_ROOT) else path).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(path.read_bytes())
+
+
+def compute_code_version(code_paths: Iterable[Path] = CODE_PATHS) -> str:
+    """SHA-256 of every step code file (path and content)."""
+    digest = hashlib.sha256()
+    _update_with_code(digest, code_paths)
+    return digest.hexdigest()
+
+
+def definition_hash(config: Dict, code_paths: Iterable[Path] = CODE_PATHS) -> str:
+    """SHA-256 of the canonical JSON ``config`` plus every step code file (path and content)."""
+    digest = hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode("utf-8"))
+    _update_with_code(digest, code_paths)
+    return digest.hexdigest()
+
+
+class PipelineManager:
+    def __init__(
+        self,
+        config_path: str = "configs/project.yaml",
+        pipeline_config_path: str = "configs/pipeline.yaml",
+        tags_path: Optional[str] = "configs/tags.yaml",
+        cache_dir: str | Path = DEFAULT_CACHE_DIR,
+        client=None,
+        build_definition: Optional[Callable[[], str]] = None,
+        code_paths: Iterable[Path] = CODE_PATHS,
+    ):
+        self.config_path = config_path
+        self.pipeline_config_path = pipeline_config_path
+        self.tags_path = tags_path
+        self.cache_dir = Path(cache_dir)
+        self.client = client or boto3.client("sagemaker", region_name=self.project.aws_region)
+        self._build_definition = build_definition or self._build_with_sdk
+        self.code_paths = tuple(code_paths)
+        self._hash: Optional[tuple] = None
+        self._code_version: Optional[str] = None
+
+    # Both come from the config cache, so they are cheap to re-read and follow file edits.
+    @property
+    def project(self) -> ProjectConfig:
+        return ProjectConfig.load(self.config_path, tags_path=self.tags_path)
+
+    @property
+    def pipeline_cfg(self):
+        return load_yaml(self.pipeline_config_path)
+
+    @property
+    def pipeline_name(self) -> str:
+        return self.pipeline_cfg["pipeline_name"]
+
+    def _build_with_sdk(self) -> str:
+        from src.sagemaker.pipelines.pipeline import DEFAULT_CACHE_EXPIRY, create_pipeline
+
+        pipeline = create_pipeline(
+            region=self.project.aws_region,
+            role=self.project.sagemaker_execution_role_arn,
+            pipeline_name=self.pipeline_name,
+            bucket=self.project.s3_bucket_name,
+            model_package_group=self.project.model_package_group_name,
+            process_instance_type=self.pipeline_cfg["process_instance_type"],
+            train_instance_type=self.pipeline_cfg["train_instance_type"],
+            train_parallelism=thaw(self.pipeline_cfg.get("train_parallelism")),
+            enable_cache=bool(self.pipeline_cfg.get("enable_cache", False)),
+            cache_expire_after=self.pipeline_cfg.get("cache_expire_after", DEFAULT_CACHE_EXPIRY),
+            process_instance_count=int(self.pipeline_cfg.get("process_instance_count", 1)),
+            split_key_column=self.pipeline_cfg.get("split_key_column"),
+            train_instance_count=int(self.pipeline_cfg.get("train_instance_count", 1)),
+            train_distribution=thaw(self.pipeline_cfg.get("train_distribution")),
+            precision=self.pipeline_cfg.get("precision", "fp32"),
+        )
+        return pipeline.definition()
+
+    @property
+    def hash(self) -> str:
+        project, pipeline_cfg = self.project, self.pipeline_cfg
+        # Cached config objects are replaced, not mutated, when their files change.
+        if self._hash is None or self._hash[0] is not project or self._hash[1] is not pipeline_cfg:
+            config = {"project": thaw(vars(project)), "pipeline": thaw(pipeline_cfg), "sdk": _sdk_version()}
+            self._hash = (project, pipeline_cfg, definition_hash(config, self.code_paths))
+        return self._hash[2]
+
+    @property
+    def code_version(self) -> str:
+        if self._code_version is None:
+            self._code_version = compute_code_version(self.code_paths)
+        return self._code_version
+
+    def definition(self) -> str:
+        """Pipeline definition JSON, built with the SDK only on a cache miss."""
+        path = self.cache_dir / f"{self.pipeline_name}-{self.hash}.json"
+        if path.exists():
+            return path.read_text(encoding="utf-8")
+        logger.info("Building pipeline definition %s (hash %s)", self.pipeline_name, self.hash[:12])
+        definition = self._build_definition()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(definition, encoding="utf-8")
+        tmp.replace(path)
+        return definition
+
+    def deployed_hash(self) -> Optional[str]:
+        """Hash recorded on the deployed pipeline; ``""`` if it has none, None if it does not exist."""
+        try:
+            description = self.client.describe_pipeline(PipelineName=self.pipeline_name).get("PipelineDescription", "")
+        except self.client.exceptions.ResourceNotFound:
+            return None
+        return description.rpartition(HASH_MARKER)[2].strip() if HASH_MARKER in description else ""
+
+    def upsert(self) -> Dict[str, object]:
+        """Create or update the pipeline unless the deployed one already has this hash."""
+        deployed = self.deployed_hash()
+        if deployed == self.hash:
+            logger.info("Pipeline %s is up to date (hash %s)", self.pipeline_name, self.hash[:12])
+            return {"pipeline_name": self.pipeline_name, "hash": self.hash, "updated": False}
+        request = {
+            "PipelineName": self.pipeline_name,
+            "PipelineDefinition": self.definition(),
+            "PipelineDescription": f"{HASH_MARKER} {self.hash}",
+            "RoleArn": self.project.sagemaker_execution_role_arn,
+        }
+        if deployed is None:
+            arn = self.client.create_pipeline(ClientRequestToken=self.hash, **request)["PipelineArn"]
+        else:
+            arn = self.client.update_pipeline(**request)["PipelineArn"]
+        logger.info("Upserted pipeline %s (hash %s)", arn, self.hash[:12])
+        return {"pipeline_name": self.pipeline_name, "hash": self.hash, "updated": True, "arn": arn}
+
+    def start(
+        self,
+        dataset_s3: str,
+        problem_type: str = "classification",
+        metric_threshold: float = 0.7,
+        client_request_token: Optional[str] = None,
+        extra_parameters: Optional[Dict[str, str]] = None,
+    ) -> str:
+        parameters = {
+            "DatasetS3Uri": dataset_s3,
+            "ProblemType": problem_type,
+            "MetricThreshold": str(metric_threshold),
+            "ApprovalStatus": self.pipeline_cfg.get("model_approval_status", "PendingManualApproval"),
+            **(extra_parameters or {}),
+        }
+        request = {
+            "PipelineName": self.pipeline_name,
+            "PipelineParameters": [{"Name": k, "Value": v} for k, v in parameters.items()],
+        }
+        if client_request_token:
+            request["ClientRequestToken"] = client_request_token
+        return self.client.start_pipeline_execution(**request)["PipelineExecutionArn"]
+
+    def describe(self, execution_arn: str) -> Dict:
+        return self.client.describe_pipeline_execution(PipelineExecutionArn=execution_arn)
+
+
+@lru_cache(maxsize=None)
+def get_manager(config_path: str = "configs/project.yaml", pipeline_config_path: str = "configs/pipeline.yaml") -> PipelineManager:
+    """Process-wide manager per config pair, so repeated calls share the client and the hash."""
+    return PipelineManager(config_path, pipeline_config_path)
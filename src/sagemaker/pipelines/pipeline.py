@@ -1,25 +1,48 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Literal
+from typing import Any, Dict, Literal, Optional
 
 import boto3
+from sagemaker.workflow.functions import Join
 from sagemaker.workflow.parameters import ParameterFloat, ParameterString
 from sagemaker.workflow.pipeline import Pipeline
 from sagemaker.workflow.pipeline_context import PipelineSession
+from sagemaker.workflow.steps import CacheConfig
 
+from src.sagemaker.pipelines.preflight import CODE_VERSION_KEY, DATASET_FINGERPRINT_KEY
 from src.sagemaker.pipelines.steps.condition import create_condition_step
 from src.sagemaker.pipelines.steps.evaluate import create_evaluate_step
 from src.sagemaker.pipelines.steps.preprocess import create_preprocess_step
 from src.sagemaker.pipelines.steps.register import create_register_step
 from src.sagemaker.pipelines.steps.train import create_training_step
 
+# ISO 8601 duration, as SageMaker expects for CacheConfig.expire_after.
+DEFAULT_CACHE_EXPIRY = "P30D"
+# Largest accuracy drop (relative RMSE increase for regression) tolerated from bf16 inference.
+DEFAULT_MAX_PRECISION_DELTA = 0.01
+
 
 def get_session(region: str) -> PipelineSession:
     boto_sess = boto3.Session(region_name=region)
     return PipelineSession(boto_sess)
 
 
+def cache_config(enable_cache: bool, expire_after: str = DEFAULT_CACHE_EXPIRY) -> Optional[CacheConfig]:
+    """Step cache settings; SageMaker reuses a step's result when its arguments are unchanged."""
+    return CacheConfig(enable_caching=True, expire_after=expire_after) if enable_cache else None
+
+
+def run_uri(bucket: str, dataset_fingerprint: ParameterString, *parts: str) -> Join:
+    """``s3://{bucket}/runs/{dataset fingerprint}/...``: where one dataset's intermediates live.
+
+    Step cache keys are built from step arguments only, so every data-dependent URI carries the
+    fingerprint: a new dataset misses the cache instead of reusing (and re-registering) the
+    previous model, and never reads shards left behind by an earlier dataset's run.
+    """
+    return Join(on="/", values=[f"s3://{bucket}/runs", dataset_fingerprint, *parts])
+
+
 def create_pipeline(
     region: str,
     role: str,
@@ -28,46 +51,74 @@ def create_pipeline(
     model_package_group: str,
     process_instance_type: str,
     train_instance_type: str,
+    train_parallelism: Optional[Dict[str, Any]] = None,
+    enable_cache: bool = False,
+    cache_expire_after: str = DEFAULT_CACHE_EXPIRY,
+    process_instance_count: int = 1,
+    split_key_column: Optional[str] = None,
+    train_instance_count: int = 1,
+    train_distribution: Optional[Dict[str, Any]] = None,
+    precision: str = "fp32",
 ) -> Pipeline:
     session = get_session(region)
+    step_cache = cache_config(enable_cache, cache_expire_after)
     dataset_param = ParameterString(name="DatasetS3Uri")
     problem_type_param = ParameterString(name="ProblemType", default_value="classification")
     metric_threshold_param = ParameterFloat(name="MetricThreshold", default_value=0.7)
+    max_precision_delta_param = ParameterFloat(name="MaxPrecisionDelta", default_value=DEFAULT_MAX_PRECISION_DELTA)
     approval_status_param = ParameterString(name="ApprovalStatus", default_value="PendingManualApproval")
+    # Scopes the run's S3 prefixes and is recorded on the registered model package for the
+    # pre-flight check; callers set it from the dataset's S3 listing.
+    fingerprint_param = ParameterString(name="DatasetFingerprint", default_value="")
+    code_version_param = ParameterString(name="CodeVersion", default_value="")
 
     preprocess = create_preprocess_step(
         session=session,
         role=role,
         input_s3_uri=dataset_param,
-        output_prefix=f"s3://{bucket}/runs/preprocessed",
+        output_prefix=run_uri(bucket, fingerprint_param, "preprocessed"),
         instance_type=process_instance_type,
+        cache_config=step_cache,
+        instance_count=process_instance_count,
+        key_column=split_key_column,
     )
 
     train_step = create_training_step(
         session=session,
         role=role,
-        train_s3=preprocess.properties.ProcessingOutputConfig.Outputs["train"].S3Output.S3Uri,
-        val_s3=preprocess.properties.ProcessingOutputConfig.Outputs["val"].S3Output.S3Uri,
-        output_prefix=f"s3://{bucket}/runs/training",
+        train_s3=run_uri(bucket, fingerprint_param, "preprocessed", "train"),
+        val_s3=run_uri(bucket, fingerprint_param, "preprocessed", "val"),
+        output_prefix=run_uri(bucket, fingerprint_param, "training"),
         instance_type=train_instance_type,
         problem_type=problem_type_param,
+        parallelism=train_parallelism,
+        cache_config=step_cache,
+        instance_count=train_instance_count,
+        distribution=train_distribution,
+        precision=precision,
+        depends_on=[preprocess],
     )
 
     evaluate_step = create_evaluate_step(
         session=session,
         role=role,
         model_path=train_step.properties.ModelArtifacts.S3ModelArtifacts,
-        test_s3=preprocess.properties.ProcessingOutputConfig.Outputs["test"].S3Output.S3Uri,
-        output_prefix=f"s3://{bucket}/runs/evaluation",
+        test_s3=run_uri(bucket, fingerprint_param, "preprocessed", "test"),
+        output_prefix=run_uri(bucket, fingerprint_param, "evaluation"),
         instance_type=process_instance_type,
+        cache_config=step_cache,
+        precision=precision,
     )
 
     register_step = create_register_step(
-        model=train_step.get_expected_model(),
+        session=session,
         model_data=train_step.properties.ModelArtifacts.S3ModelArtifacts,
         role=role,
         model_package_group=model_package_group,
         approval_status=approval_status_param,
+        customer_metadata={DATASET_FINGERPRINT_KEY: fingerprint_param, CODE_VERSION_KEY: code_version_param},
+        code_location=f"s3://{bucket}/runs/code",
+        precision=precision,
     )
 
     condition_step = create_condition_step(
@@ -75,11 +126,20 @@ def create_pipeline(
         metric_name="accuracy",
         threshold=metric_threshold_param,
         register_step=register_step,
+        max_precision_delta=max_precision_delta_param,
     )
 
     pipeline = Pipeline(
         name=pipeline_name,
-        parameters=[dataset_param, problem_type_param, metric_threshold_param, approval_status_param],
+        parameters=[
+            dataset_param,
+            problem_type_param,
+            metric_threshold_param,
+            max_precision_delta_param,
+            approval_status_param,
+            fingerprint_param,
+            code_version_param,
+        ],
         steps=[preprocess, train_step, evaluate_step, condition_step],
         sagemaker_session=session,
     )
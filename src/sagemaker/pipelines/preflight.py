@@ -0,0 +1,99 @@
+"""Pre-flight check: skip a pipeline execution that would retrain an already-registered model.
+
+Every execution records its dataset fingerprint and code version as customer metadata on the
+model package it registers. Before starting, :func:`preflight` computes both for the requested
+dataset and looks for a non-rejected package in the model package group with the same pair.
+The fingerprint always comes from the S3 listing (keys, sizes, ETags) of the dataset prefix the
+pipeline reads, so every caller records and compares the same value for the same data.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Optional
+
+import boto3
+
+from src.common.logging import configure_logging
+
+logger = configure_logging(__name__)
+
+DATASET_FINGERPRINT_KEY = "dataset_fingerprint"
+CODE_VERSION_KEY = "code_version"
+# Matches are normally among the newest packages; a small cap keeps the search to one page.
+DEFAULT_MAX_PACKAGES = 20
+
+
+def s3_dataset_fingerprint(s3_uri: str, client=None) -> str:
+    """Fingerprint of every object under an S3 prefix from its keys, sizes and ETags."""
+    bucket, _, prefix = s3_uri.removeprefix("s3://").partition("/")
+    client = client or boto3.client("s3")
+    entries = {}
+    for page in client.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            entries[obj["Key"][len(prefix) :].lstrip("/")] = [obj["Size"], obj["ETag"].strip('"')]
+    payload = json.dumps(entries, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def dataset_fingerprint(dataset_s3: str, s3_client=None) -> str:
+    if not dataset_s3.startswith("s3://"):
+        raise ValueError(f"Dataset fingerprints come from S3 listings; expected an s3:// URI, got {dataset_s3!r}")
+    return s3_dataset_fingerprint(dataset_s3, s3_client)
+
+
+def find_registered_model(
+    client,
+    model_package_group: str,
+    fingerprint: str,
+    code_version: str,
+    max_packages: int = DEFAULT_MAX_PACKAGES,
+) -> Optional[str]:
+    """ARN of the newest non-rejected package trained on ``fingerprint`` with ``code_version``.
+
+    Packages are described newest first, one at a time, and the search stops at the first match
+    or after ``max_packages`` packages.
+    """
+    pages = client.get_paginator("list_model_packages").paginate(
+        ModelPackageGroupName=model_package_group,
+        SortBy="CreationTime",
+        SortOrder="Descending",
+        PaginationConfig={"MaxItems": max_packages, "PageSize": min(max_packages, 100)},
+    )
+    for page in pages:
+        for summary in page.get("ModelPackageSummaryList", []):
+            if summary.get("ModelApprovalStatus") == "Rejected":
+                continue
+            package = client.describe_model_package(ModelPackageName=summary["ModelPackageArn"])
+            metadata = package.get("CustomerMetadataProperties", {})
+            if metadata.get(DATASET_FINGERPRINT_KEY) == fingerprint and metadata.get(CODE_VERSION_KEY) == code_version:
+                return summary["ModelPackageArn"]
+    return None
+
+
+@dataclass(frozen=True)
+class PreflightResult:
+    dataset_fingerprint: str
+    code_version: str
+    model_package_arn: Optional[str] = None
+
+    @property
+    def skip(self) -> bool:
+        return self.model_package_arn is not None
+
+    def pipeline_parameters(self) -> dict:
+        return {"DatasetFingerprint": self.dataset_fingerprint, "CodeVersion": self.code_version}
+
+
+def preflight(
+    manager, dataset_s3: str, s3_client=None, max_packages: int = DEFAULT_MAX_PACKAGES
+) -> PreflightResult:
+    """Fingerprint the ``dataset_s3`` prefix and look for a matching registered model."""
+    fingerprint = dataset_fingerprint(dataset_s3, s3_client)
+    existing = find_registered_model(
+        manager.client, manager.project.model_package_group_name, fingerprint, manager.code_version, max_packages
+    )
+    if existing:
+        logger.info("Dataset %s (fingerprint %s) already produced %s", dataset_s3, fingerprint[:12], existing)
+    return PreflightResult(fingerprint, manager.code_version, existing)
@@ -2,64 +2,45 @@ from __future__ import annotations
 
 import argparse
 import json
-from typing import Optional
-
-from src.common.config import ProjectConfig, load_yaml, resolve_env
-from src.sagemaker.pipelines.pipeline import create_pipeline
-
-
-def upsert_pipeline(config_path: str = "configs/project.yaml", pipeline_config_path: str = "configs/pipeline.yaml"):
-    project = ProjectConfig.load(config_path, tags_path="configs/tags.yaml")
-    pipeline_cfg = load_yaml(pipeline_config_path)
-    pipeline = create_pipeline(
-        region=project.aws_region,
-        role=project.sagemaker_execution_role_arn,
-        pipeline_name=pipeline_cfg["pipeline_name"],
-        bucket=project.s3_bucket_name,
-        model_package_group=project.model_package_group_name,
-        process_instance_type=pipeline_cfg["process_instance_type"],
-        train_instance_type=pipeline_cfg["train_instance_type"],
-    )
-    definition = pipeline.definition()
-    return definition
-
-
-def start_pipeline_execution(dataset_s3: str, problem_type: str, metric_threshold: float, config_path: str = "configs/project.yaml", pipeline_config_path: str = "configs/pipeline.yaml"):
-    project = ProjectConfig.load(config_path, tags_path="configs/tags.yaml")
-    pipeline_cfg = load_yaml(pipeline_config_path)
-    pipeline = create_pipeline(
-        region=project.aws_region,
-        role=project.sagemaker_execution_role_arn,
-        pipeline_name=pipeline_cfg["pipeline_name"],
-        bucket=project.s3_bucket_name,
-        model_package_group=project.model_package_group_name,
-        process_instance_type=pipeline_cfg["process_instance_type"],
-        train_instance_type=pipeline_cfg["train_instance_type"],
-    )
-    execution = pipeline.start(
-        parameters={
-            "DatasetS3Uri": dataset_s3,
-            "ProblemType": problem_type,
-            "MetricThreshold": metric_threshold,
-            "ApprovalStatus": pipeline_cfg.get("model_approval_status", "PendingManualApproval"),
-        }
-    )
-    return execution.arn
+from typing import Dict, Optional
+
+from src.sagemaker.pipelines.manager import get_manager
+from src.sagemaker.pipelines.preflight import preflight
+
+
+def upsert_pipeline(
+    config_path: str = "configs/project.yaml", pipeline_config_path: str = "configs/pipeline.yaml"
+) -> Dict[str, object]:
+    """Create or update the pipeline if its definition hash changed.
+
+    Returns the upsert summary (name, hash, whether it was updated); an up-to-date pipeline
+    costs one describe call and never builds the SDK definition.
+    """
+    return get_manager(config_path, pipeline_config_path).upsert()
+
+
+def start_pipeline_execution(
+    dataset_s3: str,
+    problem_type: str,
+    metric_threshold: float,
+    config_path: str = "configs/project.yaml",
+    pipeline_config_path: str = "configs/pipeline.yaml",
+    force: bool = False,
+) -> Optional[str]:
+    """Start an execution; None if this dataset and code version already registered a model.
+
+    The dataset is fingerprinted from the S3 listing of ``dataset_s3``; ``force`` starts the
+    execution regardless.
+    """
+    manager = get_manager(config_path, pipeline_config_path)
+    check = preflight(manager, dataset_s3)
+    if check.skip and not force:
+        return None
+    return manager.start(dataset_s3, problem_type, metric_threshold, extra_parameters=check.pipeline_parameters())
 
 
 def describe_execution(execution_arn: str, config_path: str = "configs/project.yaml", pipeline_config_path: str = "configs/pipeline.yaml"):
-    project = ProjectConfig.load(config_path, tags_path="configs/tags.yaml")
-    pipeline_cfg = load_yaml(pipeline_config_path)
-    pipeline = create_pipeline(
-        region=project.aws_region,
-        role=project.sagemaker_execution_role_arn,
-        pipeline_name=pipeline_cfg["pipeline_name"],
-        bucket=project.s3_bucket_name,
-        model_package_group=project.model_package_group_name,
-        process_instance_type=pipeline_cfg["process_instance_type"],
-        train_instance_type=pipeline_cfg["train_instance_type"],
-    )
-    return pipeline.describe_execution(execution_arn)
+    return get_manager(config_path, pipeline_config_path).describe(execution_arn)
 
 
 def cli():
@@ -72,14 +53,14 @@ def cli():
     run_parser.add_argument("--dataset-s3", required=True)
     run_parser.add_argument("--problem-type", default="classification")
     run_parser.add_argument("--metric-threshold", type=float, default=0.7)
+    run_parser.add_argument("--force", action="store_true", help="Start even if a matching model is registered")
 
     args = parser.parse_args()
     if args.command == "upsert":
-        definition = upsert_pipeline()
-        print(definition)
+        print(json.dumps(upsert_pipeline(), indent=2))
     elif args.command == "run":
-        arn = start_pipeline_execution(args.dataset_s3, args.problem_type, args.metric_threshold)
-        print(arn)
+        arn = start_pipeline_execution(args.dataset_s3, args.problem_type, args.metric_threshold, force=args.force)
+        print(arn or "Skipped: this dataset and code version already produced a registered model")
 
 
 if __name__ == "__main__":
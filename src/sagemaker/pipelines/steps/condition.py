@@ -1,20 +1,23 @@
-from sagemaker.workflow.conditions import ConditionGreaterThanOrEqualTo
+from typing import Optional
+
+from sagemaker.workflow.conditions import ConditionGreaterThanOrEqualTo, ConditionLessThanOrEqualTo
 from sagemaker.workflow.condition_step import ConditionStep
 from sagemaker.workflow.functions import JsonGet
 
 
-def create_condition_step(evaluate_step, metric_name: str, threshold: float, register_step):
-    cond = ConditionGreaterThanOrEqualTo(
-        left=JsonGet(
-            step_name=evaluate_step.name,
-            property_file=evaluate_step.property_files[0],
-            json_path=f"metrics.{metric_name}",
-        ),
-        right=threshold,
-    )
+def create_condition_step(
+    evaluate_step, metric_name: str, threshold: float, register_step, max_precision_delta: Optional[float] = None
+):
+    def metric(json_path: str) -> JsonGet:
+        return JsonGet(step_name=evaluate_step.name, property_file=evaluate_step.property_files[0], json_path=json_path)
+
+    conditions = [ConditionGreaterThanOrEqualTo(left=metric(f"metrics.{metric_name}"), right=threshold)]
+    if max_precision_delta is not None:
+        # Degradation of the reduced-precision (bf16) metrics against fp32; 0 when running fp32.
+        conditions.append(ConditionLessThanOrEqualTo(left=metric("precision.metric_delta"), right=max_precision_delta))
     return ConditionStep(
         name="MetricThresholdCheck",
-        conditions=[cond],
+        conditions=conditions,
         if_steps=[register_step],
         else_steps=[],
     )
@@ -2,13 +2,23 @@ from __future__ import annotations
 
 import os
 from pathlib import Path
+from typing import Optional
 
 from sagemaker.processing import ProcessingInput, ProcessingOutput, ScriptProcessor
 from sagemaker.workflow.properties import PropertyFile
-from sagemaker.workflow.steps import ProcessingStep
+from sagemaker.workflow.steps import CacheConfig, ProcessingStep
 
 
-def create_evaluate_step(session, role: str, model_path: str, test_s3: str, output_prefix: str, instance_type: str):
+def create_evaluate_step(
+    session,
+    role: str,
+    model_path: str,
+    test_s3: str,
+    output_prefix: str,
+    instance_type: str,
+    cache_config: Optional[CacheConfig] = None,
+    precision: str = "fp32",
+):
     processor = ScriptProcessor(
         command=["python3"],
         image_uri="763104351884.dkr.ecr.us-east-1.amazonaws.com/sagemaker-scikit-learn:1.2-1",
@@ -29,6 +39,7 @@ def create_evaluate_step(session, role: str, model_path: str, test_s3: str, outp
             ProcessingOutput(source="/opt/ml/processing/output", destination=output_prefix),
         ],
         code=code_path,
+        job_arguments=["--precision", precision],
         property_files=[
             PropertyFile(
                 name="EvaluationMetrics",
@@ -36,5 +47,6 @@ def create_evaluate_step(session, role: str, model_path: str, test_s3: str, outp
                 path="metrics.json",
             )
         ],
+        cache_config=cache_config,
     )
     return step
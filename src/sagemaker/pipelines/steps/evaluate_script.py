@@ -1,29 +1,40 @@
+import argparse
 import json
 import os
-import pandas as pd
-import torch
+import tarfile
 
-from src.common.metrics import classification_metrics, regression_metrics
-from src.model.nn import SimpleMLP
+from src.model.evaluate import evaluate, load_model, precision_report
+from src.model.precision import PRECISIONS
+from src.model.quantization import DEFAULT_MAX_METRIC_DELTA
 
 
 def main():
-    model_path = "/opt/ml/processing/model/model.pt"
-    test_path = "/opt/ml/processing/test/test.csv"
-    df = pd.read_csv(test_path)
-    X = df.drop(columns=["label"]).values
-    y = df["label"].values
-    model = SimpleMLP(input_dim=X.shape[1], output_dim=1, problem_type="classification")
-    state = torch.load(model_path, map_location="cpu")
-    model.load_state_dict(state)
-    model.eval()
-    with torch.no_grad():
-        preds = model(torch.tensor(X, dtype=torch.float32))
-    pred_labels = (preds.squeeze().numpy() > 0.5).astype(int)
-    metrics = classification_metrics(y, pred_labels)
+    parser = argparse.ArgumentParser(description="Pipeline evaluation step")
+    parser.add_argument("--precision", choices=PRECISIONS, default="fp32")
+    parser.add_argument("--max-metric-delta", type=float, default=DEFAULT_MAX_METRIC_DELTA)
+    args = parser.parse_args()
+    model_dir = "/opt/ml/processing/model"
+    model_path = os.path.join(model_dir, "model.pt")
+    # Preprocess writes the test split as Parquet shards; evaluate reads the whole directory.
+    test_path = "/opt/ml/processing/test"
+    if not os.path.exists(model_path):
+        # Training step outputs arrive as model.tar.gz holding model.pt and model_meta.json.
+        with tarfile.open(os.path.join(model_dir, "model.tar.gz")) as tar:
+            tar.extractall(model_dir)  # noqa: S202 - archive written by our own training step
+    model = load_model(model_path)
+    cache_dir = os.getenv("DATASET_CACHE_DIR")
+    # The condition step reads metrics.<name> and precision.metric_delta (0 for fp32).
+    report = {
+        "metrics": evaluate(model, test_path, model.problem_type, cache_dir=cache_dir, precision=args.precision),
+        "precision": {"precision": "fp32", "metric_delta": 0.0},
+    }
+    if args.precision != "fp32":
+        report["precision"] = precision_report(
+            model, test_path, model.problem_type, args.precision, args.max_metric_delta, cache_dir=cache_dir
+        )
     os.makedirs("/opt/ml/processing/output", exist_ok=True)
     with open("/opt/ml/processing/output/metrics.json", "w", encoding="utf-8") as f:
-        json.dump(metrics, f, indent=2)
+        json.dump(report, f, indent=2)
 
 
 if __name__ == "__main__":
@@ -2,9 +2,11 @@ from __future__ import annotations
 
 import os
 from pathlib import Path
+from typing import Optional
 
 from sagemaker.processing import ProcessingInput, ProcessingOutput, ScriptProcessor
-from sagemaker.workflow.steps import ProcessingStep
+from sagemaker.workflow.functions import Join
+from sagemaker.workflow.steps import CacheConfig, ProcessingStep
 
 
 def create_preprocess_step(
@@ -13,26 +15,42 @@ def create_preprocess_step(
     input_s3_uri: str,
     output_prefix: str,
     instance_type: str,
+    cache_config: Optional[CacheConfig] = None,
+    instance_count: int = 1,
+    key_column: Optional[str] = None,
 ) -> ProcessingStep:
     processor = ScriptProcessor(
         command=["python3"],
         image_uri="763104351884.dkr.ecr.us-east-1.amazonaws.com/sagemaker-scikit-learn:1.2-1",
         role=role,
-        instance_count=1,
+        instance_count=instance_count,
         instance_type=instance_type,
         sagemaker_session=session,
     )
     source_dir = str(Path(__file__).parent)
     code_path = os.path.join(source_dir, "preprocess_script.py")
+    # Each instance gets a disjoint subset of the input files and writes host-prefixed shards.
+    distribution = "ShardedByS3Key" if instance_count > 1 else "FullyReplicated"
+    arguments = ["--key-column", key_column] if key_column else []
     step = ProcessingStep(
         name="Preprocess",
         processor=processor,
-        inputs=[ProcessingInput(source=input_s3_uri, destination="/opt/ml/processing/input")],
+        inputs=[
+            ProcessingInput(
+                source=input_s3_uri,
+                destination="/opt/ml/processing/input",
+                s3_data_distribution_type=distribution,
+            )
+        ],
         outputs=[
-            ProcessingOutput(source="/opt/ml/processing/output/train", destination=f"{output_prefix}/train"),
-            ProcessingOutput(source="/opt/ml/processing/output/val", destination=f"{output_prefix}/val"),
-            ProcessingOutput(source="/opt/ml/processing/output/test", destination=f"{output_prefix}/test"),
+            ProcessingOutput(
+                source=f"/opt/ml/processing/output/{split}",
+                destination=Join(on="/", values=[output_prefix, split]),
+            )
+            for split in ("train", "val", "test")
         ],
         code=code_path,
+        job_arguments=arguments or None,
+        cache_config=cache_config,
     )
     return step
@@ -1,21 +1,274 @@
+"""Streaming, sharded train/val/test split for the Preprocess processing job.
+
+Input files (CSV, optionally gzipped, or Parquet) are read in chunks, each in a worker process,
+and every row is assigned to a split without a global shuffle:
+
+* with ``--key-column``, always from a deterministic hash of that column, so every row of a key
+  (a user, a session, ...) lands in the same split and no key leaks across splits. Label
+  proportions then hold only in expectation over keys: stratification is not applied, because
+  per-row stratification would scatter a key's rows over all three splits;
+* otherwise, with stratification (on by default when the label column exists), from a
+  per-label counter stepped through a low-discrepancy sequence, so every label is split in the
+  target proportions within each file;
+* otherwise from a hash of the whole row, so a row lands in the same split however the input
+  is sharded, chunked or ordered.
+
+Splits are buffered per worker and written as compressed Parquet shards by a thread pool while
+the next chunk is parsed. With ``instance_count > 1`` and ``ShardedByS3Key`` inputs, each
+instance sees a subset of the files; shard names carry the host index so instances never
+collide in the shared output prefix.
+
+This file runs standalone in the processing container, so it only depends on numpy, pandas
+and pyarrow.
+"""
+from __future__ import annotations
+
+import argparse
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split
+
+SPLITS = ("train", "val", "test")
+DEFAULT_FRACTIONS = (0.7, 0.15, 0.15)
+DEFAULT_CHUNKSIZE = 100_000
+DEFAULT_ROWS_PER_SHARD = 1_000_000
+INPUT_SUFFIXES = (".csv", ".csv.gz", ".parquet")
+RESOURCE_CONFIG = "/opt/ml/config/resourceconfig.json"
+# Fractional part of the golden ratio: successive multiples are spread evenly over [0, 1).
+GOLDEN = 0.6180339887498949
+
+
+def _hash_key(seed: int) -> str:
+    return f"{seed:016d}"[-16:]
+
+
+def hash_unit(frame: pd.DataFrame, key_column: Optional[str] = None, seed: int = 0) -> np.ndarray:
+    """Deterministic value in [0, 1) per row, from ``key_column`` or the full row content."""
+    data = frame[key_column] if key_column else frame
+    hashes = pd.util.hash_pandas_object(data, index=False, hash_key=_hash_key(seed)).to_numpy()
+    return (hashes >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+class SplitAssigner:
+    """Maps rows to split indices (0=train, 1=val, 2=test).
+
+    A ``key_column`` takes precedence over ``stratify`` so that keys never span splits.
+    """
+
+    def __init__(
+        self,
+        fractions: Sequence[float] = DEFAULT_FRACTIONS,
+        key_column: Optional[str] = None,
+        label_column: Optional[str] = None,
+        stratify: bool = True,
+        seed: int = 0,
+    ):
+        if len(fractions) != len(SPLITS) or abs(sum(fractions) - 1.0) > 1e-9:
+            raise ValueError(f"fractions must be {len(SPLITS)} values summing to 1, got {fractions}")
+        self.bounds = np.cumsum(fractions)[:-1]
+        self.key_column = key_column
+        self.label_column = label_column
+        self.stratify = stratify and label_column is not None and key_column is None
+        self.seed = seed
+        self.counters: Dict[object, int] = {}
+
+    def _stratified_unit(self, labels: np.ndarray) -> np.ndarray:
+        units = np.empty(len(labels), dtype=np.float64)
+        codes, uniques = pd.factorize(labels, use_na_sentinel=False)
+        for code, label in enumerate(uniques):
+            rows = np.flatnonzero(codes == code)
+            start = self.counters.get(label, 0)
+            # Per-label offset so labels do not share one sequence phase.
+            offset = hash_unit(pd.DataFrame({"l": [str(label)]}), seed=self.seed)[0]
+            units[rows] = np.modf((start + np.arange(len(rows))) * GOLDEN + offset)[0]
+            self.counters[label] = start + len(rows)
+        return units
+
+    def assign(self, frame: pd.DataFrame) -> np.ndarray:
+        if self.stratify and self.label_column in frame:
+            units = self._stratified_unit(frame[self.label_column].to_numpy())
+        else:
+            units = hash_unit(frame, self.key_column, self.seed)
+        return np.searchsorted(self.bounds, units, side="right")
+
+
+class ShardWriter:
+    """Buffers one split's rows and writes ``rows_per_shard``-row Parquet (or CSV) shards."""
+
+    def __init__(
+        self,
+        out_dir: Path,
+        prefix: str,
+        pool: ThreadPoolExecutor,
+        rows_per_shard: int = DEFAULT_ROWS_PER_SHARD,
+        output_format: str = "parquet",
+        compression: str = "zstd",
+    ):
+        self.out_dir = out_dir
+        self.prefix = prefix
+        self.pool = pool
+        self.rows_per_shard = rows_per_shard
+        self.output_format = output_format
+        self.compression = compression
+        self.buffer: List[pd.DataFrame] = []
+        self.buffered = 0
+        self.shards = 0
+        self.rows = 0
+        self.futures = []
+
+    def add(self, frame: pd.DataFrame) -> None:
+        if len(frame):
+            self.buffer.append(frame)
+            self.buffered += len(frame)
+            self.rows += len(frame)
+        if self.buffered >= self.rows_per_shard:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.buffer:
+            return
+        frame = pd.concat(self.buffer, ignore_index=True)
+        self.buffer, self.buffered = [], 0
+        suffix = "parquet" if self.output_format == "parquet" else "csv"
+        path = self.out_dir / f"{self.prefix}-{self.shards:05d}.{suffix}"
+        self.shards += 1
+        future = self.pool.submit(_write_shard, frame, path, self.output_format, self.compression)
+        self.futures.append(future)
+
+    def close(self) -> None:
+        self.flush()
+        for future in self.futures:
+            future.result()
+
+
+def _write_shard(frame: pd.DataFrame, path: Path, output_format: str, compression: str) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    if output_format == "parquet":
+        frame.to_parquet(tmp, index=False, compression=compression)
+    else:
+        frame.to_csv(tmp, index=False)
+    tmp.replace(path)
+
+
+def input_files(input_dir: str | Path) -> List[Path]:
+    return sorted(p for p in Path(input_dir).rglob("*") if p.is_file() and p.name.endswith(INPUT_SUFFIXES))
+
+
+def iter_frames(path: Path, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def split_file(
+    path: Path,
+    output_dir: Path,
+    prefix: str,
+    fractions: Sequence[float] = DEFAULT_FRACTIONS,
+    key_column: Optional[str] = None,
+    label_column: Optional[str] = "label",
+    stratify: bool = True,
+    seed: int = 0,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    rows_per_shard: int = DEFAULT_ROWS_PER_SHARD,
+    output_format: str = "parquet",
+    compression: str = "zstd",
+    write_threads: int = 2,
+) -> Dict[str, int]:
+    """Split one input file into ``output_dir/<split>/<prefix>-NNNNN.parquet`` shards."""
+    assigner = SplitAssigner(fractions, key_column, label_column, stratify, seed)
+    with ThreadPoolExecutor(max_workers=write_threads) as pool:
+        writers = []
+        for split in SPLITS:
+            (output_dir / split).mkdir(parents=True, exist_ok=True)
+            writers.append(ShardWriter(output_dir / split, prefix, pool, rows_per_shard, output_format, compression))
+        for frame in iter_frames(path, chunksize):
+            splits = assigner.assign(frame)
+            for index, writer in enumerate(writers):
+                writer.add(frame[splits == index])
+        for writer in writers:
+            writer.close()
+    return {split: writer.rows for split, writer in zip(SPLITS, writers, strict=True)}
+
+
+def host_index(resource_config: str = RESOURCE_CONFIG) -> int:
+    """This instance's position among the processing job's hosts (0 when run locally)."""
+    try:
+        with open(resource_config, encoding="utf-8") as f:
+            config = json.load(f)
+    except OSError:
+        return 0
+    return sorted(config["hosts"]).index(config["current_host"])
+
+
+def preprocess(
+    input_dir: str | Path,
+    output_dir: str | Path,
+    workers: Optional[int] = None,
+    host: int = 0,
+    **options,
+) -> Dict[str, int]:
+    """Split every input file in parallel processes; returns row counts per split."""
+    files = input_files(input_dir)
+    if not files:
+        raise FileNotFoundError(f"No {', '.join(INPUT_SUFFIXES)} files under {input_dir}")
+    output_dir = Path(output_dir)
+    prefixes = [f"part-{host:03d}-{i:05d}" for i in range(len(files))]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(files)))
+    if workers == 1:
+        results = [split_file(f, output_dir, p, **options) for f, p in zip(files, prefixes, strict=True)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(split_file, f, output_dir, p, **options)
+                for f, p in zip(files, prefixes, strict=True)
+            ]
+            results = [future.result() for future in futures]
+    return {split: sum(r[split] for r in results) for split in SPLITS}
 
 
 def main():
-    input_path = "/opt/ml/processing/input"
-    df = pd.read_csv(os.path.join(input_path, "data.csv"))
-    train_df, temp_df = train_test_split(df, test_size=0.3, random_state=42, stratify=df["label"] if "label" in df else None)
-    val_df, test_df = train_test_split(temp_df, test_size=0.5, random_state=42, stratify=temp_df["label"] if "label" in temp_df else None)
-
-    os.makedirs("/opt/ml/processing/output/train", exist_ok=True)
-    os.makedirs("/opt/ml/processing/output/val", exist_ok=True)
-    os.makedirs("/opt/ml/processing/output/test", exist_ok=True)
-
-    train_df.to_csv("/opt/ml/processing/output/train/train.csv", index=False)
-    val_df.to_csv("/opt/ml/processing/output/val/val.csv", index=False)
-    test_df.to_csv("/opt/ml/processing/output/test/test.csv", index=False)
+    parser = argparse.ArgumentParser(description="Sharded train/val/test split")
+    parser.add_argument("--input-dir", default="/opt/ml/processing/input")
+    parser.add_argument("--output-dir", default="/opt/ml/processing/output")
+    parser.add_argument(
+        "--key-column", default=None, help="Hash this column for the split; disables stratification (default: whole row)"
+    )
+    parser.add_argument("--label-column", default="label")
+    parser.add_argument("--no-stratify", action="store_true")
+    parser.add_argument("--fractions", type=float, nargs=3, default=list(DEFAULT_FRACTIONS))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--rows-per-shard", type=int, default=DEFAULT_ROWS_PER_SHARD)
+    parser.add_argument("--output-format", choices=["parquet", "csv"], default="parquet")
+    parser.add_argument("--compression", default="zstd")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    counts = preprocess(
+        args.input_dir,
+        args.output_dir,
+        workers=args.workers,
+        host=host_index(),
+        fractions=args.fractions,
+        key_column=args.key_column,
+        label_column=args.label_column,
+        stratify=not args.no_stratify,
+        seed=args.seed,
+        chunksize=args.chunksize,
+        rows_per_shard=args.rows_per_shard,
+        output_format=args.output_format,
+        compression=args.compression,
+    )
+    print(json.dumps(counts))
 
 
 if __name__ == "__main__":
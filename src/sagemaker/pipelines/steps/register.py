@@ -1,15 +1,42 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Optional
+
+from sagemaker.pytorch import PyTorchModel
 from sagemaker.workflow.model_step import ModelStep
-from sagemaker.workflow.steps import CacheConfig
 
 
-def create_register_step(model, model_data: str, role: str, model_package_group: str, approval_status: str = "PendingManualApproval"):
-    return ModelStep(
-        name="RegisterModel",
-        model=model,
+def create_register_step(
+    session,
+    model_data: str,
+    role: str,
+    model_package_group: str,
+    approval_status: str = "PendingManualApproval",
+    customer_metadata: Optional[Dict[str, str]] = None,
+    inference_instance_type: str = "ml.m5.large",
+    code_location: Optional[str] = None,
+    precision: str = "fp32",
+) -> ModelStep:
+    # SageMaker does not cache model registration steps, so this step takes no CacheConfig.
+    model = PyTorchModel(
         model_data=model_data,
-        cache_config=CacheConfig(enable_caching=True, expire_after="30d"),
-        approval_status=approval_status,
-        model_package_group_name=model_package_group,
-        model_metrics=None,
         role=role,
+        entry_point="inference.py",
+        source_dir=str(Path(__file__).parent.parent.parent.parent / "model"),
+        framework_version="2.2",
+        py_version="py310",
+        code_location=code_location,
+        env={"INFERENCE_PRECISION": precision},
+        sagemaker_session=session,
+    )
+    step_args = model.register(
+        content_types=["text/csv", "application/json"],
+        response_types=["application/json"],
+        inference_instances=[inference_instance_type],
+        transform_instances=[inference_instance_type],
+        model_package_group_name=model_package_group,
+        approval_status=approval_status,
+        customer_metadata_properties=customer_metadata,
     )
+    return ModelStep(name="RegisterModel", step_args=step_args)
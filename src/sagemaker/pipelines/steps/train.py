@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Any, Dict, List, Optional
 
 from sagemaker.pytorch import PyTorch
-from sagemaker.workflow.steps import TrainingStep
+from sagemaker.workflow.steps import CacheConfig, Step, TrainingStep
 
 
 def create_training_step(
@@ -14,16 +15,28 @@ def create_training_step(
     output_prefix: str,
     instance_type: str,
     problem_type: str,
+    parallelism: Optional[Dict[str, Any]] = None,
+    cache_config: Optional[CacheConfig] = None,
+    instance_count: int = 1,
+    distribution: Optional[Dict[str, Any]] = None,
+    precision: str = "fp32",
+    depends_on: Optional[List[Step]] = None,
 ) -> TrainingStep:
+    hyperparameters = {"problem_type": problem_type, "epochs": 3, "precision": precision}
+    # DataLoader/thread knobs understood by src.model.parallel.add_parallel_arguments.
+    hyperparameters.update({k: v for k, v in (parallelism or {}).items() if v is not None})
     estimator = PyTorch(
         entry_point="train.py",
-        source_dir=str(Path(__file__).parent.parent.parent / "model"),
+        source_dir=str(Path(__file__).parent.parent.parent.parent / "model"),
         role=role,
-        instance_count=1,
+        instance_count=instance_count,
         instance_type=instance_type,
         framework_version="2.2",
         py_version="py310",
-        hyperparameters={"problem_type": problem_type, "epochs": 3},
+        hyperparameters=hyperparameters,
+        output_path=output_prefix,
+        # CPU instances need no distribution: train.py joins the gloo group itself from SM_HOSTS.
+        distribution=distribution,
         sagemaker_session=session,
     )
     step = TrainingStep(
@@ -33,6 +46,7 @@ def create_training_step(
             "train": train_s3,
             "val": val_s3,
         },
-        cache_config=None,
+        cache_config=cache_config,
+        depends_on=depends_on,
     )
     return step
@@ -0,0 +1,359 @@
+"""Coalesce per-object S3 events into one pipeline start per uploaded dataset.
+
+Object-created events are buffered by dataset prefix (``<datasets_prefix>/<dataset_id>/``). A
+prefix becomes due once no new object has arrived for ``quiet_period_s`` or, when a
+``marker_name`` such as ``_SUCCESS`` is configured, as soon as that marker object lands. Due
+prefixes are claimed with a conditional state transition before the pipeline is started, so
+concurrent flushes start each dataset exactly once.
+
+Ingesting an event only touches its own prefix: :meth:`EventCoalescer.start_if_due` reads that
+one row when its marker arrives. Finding prefixes whose quiet period has elapsed needs a scan of
+all pending rows, which is left to the scheduled :meth:`EventCoalescer.flush`.
+
+The buffer is DynamoDB in the Lambda, where started rows carry an ``expires_at`` TTL attribute so
+the table does not grow without bound; :class:`InMemoryEventBuffer` and
+:class:`SQLiteEventBuffer` implement the same interface for local runs and tests.
+"""
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+from src.common.logging import configure_logging
+
+logger = configure_logging(__name__)
+
+PENDING = "pending"
+STARTED = "started"
+DEFAULT_QUIET_PERIOD_S = 300.0
+# Started rows must outlive late objects of the same upload, or those would reopen the dataset.
+DEFAULT_STARTED_TTL_S = 30 * 24 * 3600.0
+TTL_ATTRIBUTE = "expires_at"
+
+
+@dataclass
+class BufferedDataset:
+    prefix: str
+    first_seen: float
+    last_seen: float
+    object_count: int = 0
+    marker_seen: bool = False
+    state: str = PENDING
+    execution_arn: Optional[str] = None
+
+    def is_due(self, now: float, quiet_period_s: float, require_marker: bool) -> bool:
+        if self.state != PENDING:
+            return False
+        if require_marker:
+            return self.marker_seen
+        return now - self.last_seen >= quiet_period_s
+
+
+class EventBuffer:
+    """Interface shared by the buffer backends.
+
+    ``record`` never reopens a started prefix: objects arriving after the start belong to the
+    dataset that was already submitted.
+    """
+
+    def record(self, prefix: str, now: float, marker: bool = False) -> None:
+        raise NotImplementedError
+
+    def pending(self) -> Iterable[BufferedDataset]:
+        raise NotImplementedError
+
+    def claim(self, prefix: str, now: float) -> bool:
+        """Atomically move ``prefix`` from pending to started; False if someone else did."""
+        raise NotImplementedError
+
+    def release(self, prefix: str) -> None:
+        """Return a claimed prefix to pending after a failed start."""
+        raise NotImplementedError
+
+    def complete(self, prefix: str, execution_arn: str) -> None:
+        raise NotImplementedError
+
+    def get(self, prefix: str) -> Optional[BufferedDataset]:
+        raise NotImplementedError
+
+    def due(self, now: float, quiet_period_s: float, require_marker: bool) -> List[str]:
+        return sorted(d.prefix for d in self.pending() if d.is_due(now, quiet_period_s, require_marker))
+
+
+class InMemoryEventBuffer(EventBuffer):
+    def __init__(self):
+        self._rows: Dict[str, BufferedDataset] = {}
+        self._lock = threading.Lock()
+
+    def record(self, prefix: str, now: float, marker: bool = False) -> None:
+        with self._lock:
+            row = self._rows.setdefault(prefix, BufferedDataset(prefix, first_seen=now, last_seen=now))
+            row.last_seen = max(row.last_seen, now)
+            row.object_count += 1
+            row.marker_seen = row.marker_seen or marker
+
+    def pending(self) -> Iterable[BufferedDataset]:
+        with self._lock:
+            return [BufferedDataset(**vars(r)) for r in self._rows.values() if r.state == PENDING]
+
+    def claim(self, prefix: str, now: float) -> bool:
+        with self._lock:
+            row = self._rows.get(prefix)
+            if row is None or row.state != PENDING:
+                return False
+            row.state = STARTED
+            return True
+
+    def release(self, prefix: str) -> None:
+        with self._lock:
+            self._rows[prefix].state = PENDING
+
+    def complete(self, prefix: str, execution_arn: str) -> None:
+        with self._lock:
+            self._rows[prefix].execution_arn = execution_arn
+
+    def get(self, prefix: str) -> Optional[BufferedDataset]:
+        with self._lock:
+            row = self._rows.get(prefix)
+            return BufferedDataset(**vars(row)) if row else None
+
+
+class SQLiteEventBuffer(EventBuffer):
+    """Durable single-host buffer; safe to share between processes through the same file."""
+
+    def __init__(self, path: str = ":memory:"):
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS buffered_datasets (
+                prefix TEXT PRIMARY KEY,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                object_count INTEGER NOT NULL DEFAULT 0,
+                marker_seen INTEGER NOT NULL DEFAULT 0,
+                state TEXT NOT NULL DEFAULT 'pending',
+                execution_arn TEXT
+            )"""
+        )
+
+    def _execute(self, sql: str, params=()) -> sqlite3.Cursor:
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    def record(self, prefix: str, now: float, marker: bool = False) -> None:
+        self._execute(
+            """INSERT INTO buffered_datasets (prefix, first_seen, last_seen, object_count, marker_seen)
+               VALUES (?, ?, ?, 1, ?)
+               ON CONFLICT(prefix) DO UPDATE SET
+                   last_seen = max(last_seen, excluded.last_seen),
+                   object_count = object_count + 1,
+                   marker_seen = max(marker_seen, excluded.marker_seen)""",
+            (prefix, now, now, int(marker)),
+        )
+
+    @staticmethod
+    def _row(values) -> BufferedDataset:
+        prefix, first_seen, last_seen, count, marker, state, arn = values
+        return BufferedDataset(prefix, first_seen, last_seen, count, bool(marker), state, arn)
+
+    def pending(self) -> Iterable[BufferedDataset]:
+        rows = self._execute("SELECT * FROM buffered_datasets WHERE state = ?", (PENDING,)).fetchall()
+        return [self._row(r) for r in rows]
+
+    def claim(self, prefix: str, now: float) -> bool:
+        cursor = self._execute(
+            "UPDATE buffered_datasets SET state = ? WHERE prefix = ? AND state = ?", (STARTED, prefix, PENDING)
+        )
+        return cursor.rowcount == 1
+
+    def release(self, prefix: str) -> None:
+        self._execute("UPDATE buffered_datasets SET state = ? WHERE prefix = ?", (PENDING, prefix))
+
+    def complete(self, prefix: str, execution_arn: str) -> None:
+        self._execute("UPDATE buffered_datasets SET execution_arn = ? WHERE prefix = ?", (execution_arn, prefix))
+
+    def get(self, prefix: str) -> Optional[BufferedDataset]:
+        row = self._execute("SELECT * FROM buffered_datasets WHERE prefix = ?", (prefix,)).fetchone()
+        return self._row(row) if row else None
+
+
+class DynamoDBEventBuffer(EventBuffer):
+    """Buffer in a DynamoDB table keyed by ``prefix`` (string hash key), shared by all Lambdas.
+
+    Enable TTL on the table's ``expires_at`` attribute: a claim stamps it ``started_ttl_s``
+    after the start and a release clears it again.
+    """
+
+    def __init__(self, table_name: str, client=None, started_ttl_s: float = DEFAULT_STARTED_TTL_S):
+        if client is None:
+            import boto3
+
+            client = boto3.client("dynamodb")
+        self.table_name = table_name
+        self.client = client
+        self.started_ttl_s = started_ttl_s
+
+    def record(self, prefix: str, now: float, marker: bool = False) -> None:
+        expression = (
+            "SET first_seen = if_not_exists(first_seen, :now), last_seen = :now, "
+            "#state = if_not_exists(#state, :pending) ADD object_count :one"
+        )
+        values = {":now": {"N": repr(now)}, ":pending": {"S": PENDING}, ":one": {"N": "1"}}
+        if marker:
+            expression = expression.replace("ADD", ", marker_seen = :true ADD")
+            values[":true"] = {"BOOL": True}
+        self.client.update_item(
+            TableName=self.table_name,
+            Key={"prefix": {"S": prefix}},
+            UpdateExpression=expression,
+            ExpressionAttributeNames={"#state": "state"},
+            ExpressionAttributeValues=values,
+        )
+
+    @staticmethod
+    def _row(item) -> BufferedDataset:
+        return BufferedDataset(
+            prefix=item["prefix"]["S"],
+            first_seen=float(item["first_seen"]["N"]),
+            last_seen=float(item["last_seen"]["N"]),
+            object_count=int(item.get("object_count", {"N": "0"})["N"]),
+            marker_seen=item.get("marker_seen", {"BOOL": False})["BOOL"],
+            state=item["state"]["S"],
+            execution_arn=item.get("execution_arn", {}).get("S"),
+        )
+
+    def pending(self) -> Iterable[BufferedDataset]:
+        paginator = self.client.get_paginator("scan")
+        pages = paginator.paginate(
+            TableName=self.table_name,
+            FilterExpression="#state = :pending",
+            ExpressionAttributeNames={"#state": "state"},
+            ExpressionAttributeValues={":pending": {"S": PENDING}},
+            ConsistentRead=True,
+        )
+        return [self._row(item) for page in pages for item in page.get("Items", [])]
+
+    def _transition(self, prefix: str, from_state: str, to_state: str, expires_at: Optional[float] = None) -> bool:
+        values = {":to": {"S": to_state}, ":from": {"S": from_state}}
+        if expires_at is None:
+            expression = "SET #state = :to REMOVE #ttl"
+        else:
+            expression = "SET #state = :to, #ttl = :ttl"
+            values[":ttl"] = {"N": str(int(expires_at))}
+        try:
+            self.client.update_item(
+                TableName=self.table_name,
+                Key={"prefix": {"S": prefix}},
+                UpdateExpression=expression,
+                ConditionExpression="#state = :from",
+                ExpressionAttributeNames={"#state": "state", "#ttl": TTL_ATTRIBUTE},
+                ExpressionAttributeValues=values,
+            )
+        except self.client.exceptions.ConditionalCheckFailedException:
+            return False
+        return True
+
+    def claim(self, prefix: str, now: float) -> bool:
+        return self._transition(prefix, PENDING, STARTED, expires_at=now + self.started_ttl_s)
+
+    def release(self, prefix: str) -> None:
+        self._transition(prefix, STARTED, PENDING)
+
+    def complete(self, prefix: str, execution_arn: str) -> None:
+        self.client.update_item(
+            TableName=self.table_name,
+            Key={"prefix": {"S": prefix}},
+            UpdateExpression="SET execution_arn = :arn",
+            ExpressionAttributeValues={":arn": {"S": execution_arn}},
+        )
+
+    def get(self, prefix: str) -> Optional[BufferedDataset]:
+        item = self.client.get_item(TableName=self.table_name, Key={"prefix": {"S": prefix}}, ConsistentRead=True)
+        return self._row(item["Item"]) if "Item" in item else None
+
+
+def dataset_token(prefix: str) -> str:
+    """Stable ``ClientRequestToken`` for a dataset, so even a duplicated start is deduplicated."""
+    return hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+
+
+class EventCoalescer:
+    """Buffer S3 object-created events and start ``start(prefix, token)`` once per dataset."""
+
+    def __init__(
+        self,
+        buffer: EventBuffer,
+        start: Callable[[str, str], str],
+        datasets_prefix: str = "datasets",
+        prefix_depth: int = 1,
+        quiet_period_s: float = DEFAULT_QUIET_PERIOD_S,
+        marker_name: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.buffer = buffer
+        self.start = start
+        self.datasets_prefix = datasets_prefix.strip("/")
+        self.prefix_depth = prefix_depth
+        self.quiet_period_s = quiet_period_s
+        self.marker_name = marker_name or None
+        self.clock = clock
+
+    def dataset_prefix(self, key: str) -> Optional[str]:
+        """``datasets/<id>/part-0001.parquet`` -> ``datasets/<id>/`` (``prefix_depth`` levels deep)."""
+        parts = key.lstrip("/").split("/")
+        root = self.datasets_prefix.split("/") if self.datasets_prefix else []
+        depth = len(root) + self.prefix_depth
+        if parts[: len(root)] != root or len(parts) <= depth:
+            return None
+        return "/".join(parts[:depth]) + "/"
+
+    def ingest(self, event: dict) -> Optional[str]:
+        key = event.get("detail", {}).get("object", {}).get("key")
+        prefix = self.dataset_prefix(key) if key else None
+        if prefix is None:
+            logger.info("Ignoring object %s outside %s/", key, self.datasets_prefix)
+            return None
+        marker = self.marker_name is not None and key.rsplit("/", 1)[-1] == self.marker_name
+        self.buffer.record(prefix, self.clock(), marker=marker)
+        return prefix
+
+    def _start(self, prefix: str, now: float) -> Optional[str]:
+        if not self.buffer.claim(prefix, now):
+            return None
+        try:
+            arn = self.start(prefix, dataset_token(prefix))
+        except Exception:
+            self.buffer.release(prefix)
+            raise
+        self.buffer.complete(prefix, arn)
+        logger.info("Started %s for %s", arn, prefix)
+        return arn
+
+    def start_if_due(self, prefix: str, now: Optional[float] = None) -> Dict[str, str]:
+        """Start ``prefix`` if its marker has arrived, reading only that prefix's row.
+
+        Without a marker a prefix that was just recorded cannot be due yet; its quiet period is
+        checked by the scheduled :meth:`flush`.
+        """
+        if self.marker_name is None:
+            return {}
+        now = self.clock() if now is None else now
+        row = self.buffer.get(prefix)
+        if row is None or not row.is_due(now, self.quiet_period_s, require_marker=True):
+            return {}
+        arn = self._start(prefix, now)
+        return {prefix: arn} if arn else {}
+
+    def flush(self, now: Optional[float] = None) -> Dict[str, str]:
+        """Start every due dataset this caller manages to claim; returns ``{prefix: arn}``."""
+        now = self.clock() if now is None else now
+        started = {}
+        for prefix in self.buffer.due(now, self.quiet_period_s, require_marker=self.marker_name is not None):
+            arn = self._start(prefix, now)
+            if arn:
+                started[prefix] = arn
+        return started
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
-import math
+import argparse
+import json
+import pathlib
 from typing import Dict
 
+from src.model.drift import DEFAULT_THRESHOLDS, METRICS, DriftBaseline, DriftReport, compute_drift
+from src.model.profile import DatasetProfile, profile_files
+
 
 def compute_simple_drift(old_stats: Dict, new_stats: Dict) -> float:
     """Compute a naive drift score based on mean differences."""
@@ -14,5 +19,45 @@ def compute_simple_drift(old_stats: Dict, new_stats: Dict) -> float:
     return score
 
 
-def decide_retrain(drift_score: float, threshold: float = 0.2) -> bool:
-    return drift_score > threshold
+def check_drift(model_dir: str | pathlib.Path, data: str | pathlib.Path) -> DriftReport:
+    """Score new data against the ``drift_baseline.json`` saved next to the model artifact."""
+    return compute_drift(DriftBaseline.load(model_dir), data)
+
+
+def profile_drift(model_dir: str | pathlib.Path, data: str | pathlib.Path | DatasetProfile) -> float:
+    """:func:`compute_simple_drift` between the training profile and a profile of ``data``."""
+    current = data if isinstance(data, DatasetProfile) else profile_files([data])
+    return compute_simple_drift(DatasetProfile.load(model_dir).flat_stats(), current.flat_stats())
+
+
+def decide_retrain(
+    drift: float | DriftReport, threshold: float | None = None, metric: str = "psi", min_features: int = 1
+) -> bool:
+    """Retrain when at least ``min_features`` features drift beyond ``threshold`` on ``metric``.
+
+    A plain float (e.g. from :func:`compute_simple_drift`) is compared to ``threshold`` directly.
+    """
+    if isinstance(drift, DriftReport):
+        return len(drift.drifted(metric, threshold)) >= min_features
+    return drift > (0.2 if threshold is None else threshold)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-feature drift of new data against a model's baseline")
+    parser.add_argument("--model-dir", required=True)
+    parser.add_argument("--data-csv", required=True)
+    parser.add_argument("--metric", choices=METRICS, default="psi")
+    parser.add_argument("--threshold", type=float, default=None, help=f"Defaults: {DEFAULT_THRESHOLDS}")
+    parser.add_argument("--min-features", type=int, default=1)
+    parser.add_argument("--output", default="drift_report.json")
+    args = parser.parse_args()
+    report = check_drift(args.model_dir, args.data_csv)
+    result = report.to_dict()
+    result["drifted_features"] = report.drifted(args.metric, args.threshold)
+    result["retrain"] = decide_retrain(report, args.threshold, args.metric, args.min_features)
+    pathlib.Path(args.output).write_text(json.dumps(result, indent=2))
+    print(json.dumps({"retrain": result["retrain"], "drifted_features": result["drifted_features"]}))
+
+
+if __name__ == "__main__":
+    main()
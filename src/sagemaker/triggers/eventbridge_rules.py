@@ -12,6 +12,18 @@ def schedule_rule(project_name: str) -> Dict:
     }
 
 
+def coalesce_flush_rule(project_name: str, minutes: int = 1) -> Dict:
+    """Periodic rule whose target input ``{"action": "flush"}`` starts quiet buffered datasets."""
+    return {
+        "Name": f"{project_name}-coalesce-flush",
+        "ScheduleExpression": f"rate({minutes} minute{'s' if minutes != 1 else ''})",
+        "State": "ENABLED",
+    }
+
+
+FLUSH_TARGET_INPUT = json.dumps({"action": "flush"})
+
+
 def s3_event_rule(bucket: str, datasets_prefix: str) -> Dict:
     return {
         "Name": f"{bucket}-datasets",
@@ -24,3 +36,20 @@ def s3_event_rule(bucket: str, datasets_prefix: str) -> Dict:
         ),
         "State": "ENABLED",
     }
+
+
+def sagemaker_status_rule(project_name: str) -> Dict:
+    """Pipeline execution and training job status changes, for the monitor's event-driven mode."""
+    return {
+        "Name": f"{project_name}-sagemaker-status",
+        "EventPattern": json.dumps(
+            {
+                "source": ["aws.sagemaker"],
+                "detail-type": [
+                    "SageMaker Model Building Pipeline Execution Status Change",
+                    "SageMaker Training Job State Change",
+                ],
+            }
+        ),
+        "State": "ENABLED",
+    }
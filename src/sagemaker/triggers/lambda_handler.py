@@ -1,35 +1,195 @@
+"""EventBridge-triggered Lambda that starts the retraining pipeline or an AutoPilot job.
+
+Everything expensive happens once per execution environment, during init: settings are read
+from the environment (and an optional ``PIPELINE_CONFIG_PATH`` file) and a single boto3
+``sagemaker`` client is created with adaptive retries. An invocation is then one
+``StartPipelineExecution`` call by pipeline name; the SageMaker Python SDK is never imported.
+The dataset prefix is fingerprinted from its S3 listing first, since the pipeline scopes its
+intermediate S3 prefixes (and so its step cache keys) by ``DatasetFingerprint``.
+The EventBridge event id is used as the idempotency token, so redelivered events do not
+start duplicate executions.
+
+With ``COALESCE_TABLE`` set, object-created events are buffered per dataset prefix in that
+DynamoDB table and a dataset starts the pipeline once, after ``COALESCE_QUIET_SECONDS`` without
+new objects or as soon as its ``COALESCE_MARKER`` object (e.g. ``_SUCCESS``) arrives. An
+object event only reads and writes its own dataset's row; a periodic ``{"action": "flush"}``
+event scans the table for datasets whose quiet period has elapsed. Started rows expire after
+``COALESCE_TTL_DAYS`` (enable TTL on the table's ``expires_at`` attribute).
+"""
+from __future__ import annotations
+
+import json
+import logging
 import os
+import time
+from dataclasses import dataclass
 
-from src.sagemaker.pipelines.run_pipeline import start_pipeline_execution
-from src.sagemaker.autopilot.create_job import create_autopilot_job
+import boto3
+from botocore.config import Config
 
+from src.sagemaker.pipelines.preflight import dataset_fingerprint
+from src.sagemaker.triggers.coalesce import (
+    DEFAULT_QUIET_PERIOD_S,
+    DEFAULT_STARTED_TTL_S,
+    DynamoDBEventBuffer,
+    EventCoalescer,
+)
 
-def lambda_handler(event, context):
-    action = os.getenv("TRIGGER_MODE", "pipeline")
-    dataset_s3 = event.get("detail", {}).get("object", {}).get("key")
-    bucket = os.getenv("BUCKET_NAME")
-    if dataset_s3 and not dataset_s3.startswith("s3://"):
-        dataset_s3 = f"s3://{bucket}/{dataset_s3}"
-
-    if action == "autopilot":
-        job_name = f"autopilot-{os.getenv('ENV', 'dev')}"
-        role = os.getenv("SAGEMAKER_ROLE_ARN")
-        create_autopilot_job(
-            job_name=job_name,
-            s3_uri=dataset_s3,
-            target_column="label",
-            problem_type="classification",
-            objective_metric="Accuracy",
-            max_candidates=3,
-            max_runtime_seconds=3600,
-            role_arn=role,
-            output_path=f"s3://{bucket}/autopilot/{job_name}",
-            region=os.getenv("AWS_REGION", "us-east-1"),
+_INIT_STARTED = time.perf_counter()
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+# Bulk uploads fan out into bursts of invocations; let botocore back off on throttling
+# instead of failing the invocation.
+CLIENT_CONFIG = Config(retries={"mode": "adaptive", "max_attempts": 10}, connect_timeout=5, read_timeout=30)
+
+
+@dataclass(frozen=True)
+class TriggerSettings:
+    pipeline_name: str | None
+    bucket: str | None
+    problem_type: str = "classification"
+    metric_threshold: float = 0.7
+    approval_status: str = "PendingManualApproval"
+    trigger_mode: str = "pipeline"
+    coalesce_table: str | None = None
+    quiet_period_s: float = DEFAULT_QUIET_PERIOD_S
+    marker_name: str | None = None
+    datasets_prefix: str = "datasets"
+    started_ttl_s: float = DEFAULT_STARTED_TTL_S
+
+    @classmethod
+    def load(cls, environ=os.environ) -> "TriggerSettings":
+        file_cfg = _read_config_file(environ.get("PIPELINE_CONFIG_PATH"))
+        return cls(
+            pipeline_name=environ.get("PIPELINE_NAME") or file_cfg.get("pipeline_name"),
+            bucket=environ.get("BUCKET_NAME"),
+            problem_type=environ.get("PROBLEM_TYPE") or file_cfg.get("problem_type", "classification"),
+            metric_threshold=float(environ.get("METRIC_THRESHOLD") or file_cfg.get("metric_threshold_accuracy", 0.7)),
+            approval_status=environ.get("MODEL_APPROVAL_STATUS")
+            or file_cfg.get("model_approval_status", "PendingManualApproval"),
+            trigger_mode=environ.get("TRIGGER_MODE", "pipeline"),
+            coalesce_table=environ.get("COALESCE_TABLE") or None,
+            quiet_period_s=float(environ.get("COALESCE_QUIET_SECONDS", DEFAULT_QUIET_PERIOD_S)),
+            marker_name=environ.get("COALESCE_MARKER") or None,
+            datasets_prefix=environ.get("DATASETS_PREFIX", "datasets"),
+            started_ttl_s=float(environ.get("COALESCE_TTL_DAYS", DEFAULT_STARTED_TTL_S / 86400)) * 86400,
         )
+
+
+def _read_config_file(path: str | None) -> dict:
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            return json.load(f)
+        import yaml
+
+        return yaml.safe_load(f) or {}
+
+
+SETTINGS = TriggerSettings.load()
+REGION = os.getenv("AWS_REGION", "us-east-1")
+sagemaker_client = boto3.client("sagemaker", region_name=REGION, config=CLIENT_CONFIG)
+s3_client = boto3.client("s3", region_name=REGION, config=CLIENT_CONFIG)
+
+
+def build_coalescer(settings: TriggerSettings, client=None) -> EventCoalescer | None:
+    if not settings.coalesce_table:
+        return None
+    return EventCoalescer(
+        DynamoDBEventBuffer(
+            settings.coalesce_table,
+            client or boto3.client("dynamodb", region_name=REGION, config=CLIENT_CONFIG),
+            started_ttl_s=settings.started_ttl_s,
+        ),
+        start=lambda prefix, token: start_pipeline(f"s3://{settings.bucket}/{prefix}", token, settings),
+        datasets_prefix=settings.datasets_prefix,
+        quiet_period_s=settings.quiet_period_s,
+        marker_name=settings.marker_name,
+    )
+
+
+COALESCER = build_coalescer(SETTINGS)
+INIT_SECONDS = time.perf_counter() - _INIT_STARTED
+_cold = True
+
+
+def dataset_uri(event: dict, bucket: str | None) -> str | None:
+    key = event.get("detail", {}).get("object", {}).get("key")
+    if key and not key.startswith("s3://"):
+        return f"s3://{bucket}/{key}"
+    return key
+
+
+def pipeline_parameters(
+    settings: TriggerSettings, dataset_s3: str | None, fingerprint: str | None = None
+) -> list:
+    params = {
+        "ProblemType": settings.problem_type,
+        "MetricThreshold": str(settings.metric_threshold),
+        "ApprovalStatus": settings.approval_status,
+    }
+    if dataset_s3:
+        params["DatasetS3Uri"] = dataset_s3
+    if fingerprint:
+        params["DatasetFingerprint"] = fingerprint
+    return [{"Name": name, "Value": value} for name, value in params.items()]
+
+
+def start_pipeline(dataset_s3: str | None, event_id: str | None = None, settings: TriggerSettings = SETTINGS) -> str:
+    if not settings.pipeline_name:
+        raise ValueError("Set PIPELINE_NAME or PIPELINE_CONFIG_PATH for the trigger Lambda")
+    fingerprint = dataset_fingerprint(dataset_s3, s3_client) if dataset_s3 else None
+    request = {
+        "PipelineName": settings.pipeline_name,
+        "PipelineParameters": pipeline_parameters(settings, dataset_s3, fingerprint),
+        "PipelineExecutionDescription": f"Triggered for {dataset_s3 or 'schedule'}",
+    }
+    if event_id:
+        # ClientRequestToken must be 32-128 characters; EventBridge ids are 36-character UUIDs.
+        request["ClientRequestToken"] = event_id.ljust(32, "0")[:128]
+    return sagemaker_client.start_pipeline_execution(**request)["PipelineExecutionArn"]
+
+
+def _start_autopilot(dataset_s3: str | None, settings: TriggerSettings) -> str:
+    from src.sagemaker.autopilot.create_job import create_autopilot_job
+
+    job_name = f"autopilot-{os.getenv('ENV', 'dev')}"
+    return create_autopilot_job(
+        job_name=job_name,
+        s3_uri=dataset_s3,
+        target_column="label",
+        problem_type=settings.problem_type,
+        objective_metric="Accuracy",
+        max_candidates=3,
+        max_runtime_seconds=3600,
+        role_arn=os.getenv("SAGEMAKER_ROLE_ARN"),
+        output_path=f"s3://{settings.bucket}/autopilot/{job_name}",
+        region=REGION,
+    )
+
+
+def _coalesced(event: dict) -> bool:
+    return event.get("action") == "flush" or event.get("detail-type") == "Object Created"
+
+
+def lambda_handler(event, context):
+    global _cold
+    cold, _cold = _cold, False
+    if COALESCER is not None and SETTINGS.trigger_mode == "pipeline" and _coalesced(event):
+        if event.get("action") == "flush":
+            started = COALESCER.flush()
+        else:
+            prefix = COALESCER.ingest(event)
+            started = COALESCER.start_if_due(prefix) if prefix else {}
+        logger.info("Coalesced event; started %s (cold start %s, init %.3fs)", started, cold, INIT_SECONDS)
+        return {"status": "buffered", "started": started}
+    dataset_s3 = dataset_uri(event, SETTINGS.bucket)
+    if SETTINGS.trigger_mode == "autopilot":
+        arn = _start_autopilot(dataset_s3, SETTINGS)
     else:
-        start_pipeline_execution(
-            dataset_s3=dataset_s3,
-            problem_type="classification",
-            metric_threshold=0.7,
-        )
-    return {"status": "triggered"}
+        arn = start_pipeline(dataset_s3, event.get("id"))
+    logger.info("Triggered %s for %s (cold start %s, init %.3fs)", arn, dataset_s3, cold, INIT_SECONDS)
+    return {"status": "triggered", "arn": arn}
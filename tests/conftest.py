@@ -0,0 +1,29 @@
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def write_tabular_csv(path: pathlib.Path, n_rows: int, n_features: int = 5, problem_type: str = "classification", seed: int = 0) -> pathlib.Path:
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, n_features))
+    if problem_type == "classification":
+        y = (X[:, 0] + 0.5 * X[:, 1] > 0).astype(int)
+    else:
+        y = X @ rng.normal(size=n_features)
+    df = pd.DataFrame(X, columns=[f"feature_{i}" for i in range(n_features)])
+    df["label"] = y
+    df.to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture
+def tabular_csv(tmp_path: pathlib.Path) -> pathlib.Path:
+    return write_tabular_csv(tmp_path / "data.csv", 300)
+
+
+@pytest.fixture
+def make_tabular_csv(tmp_path: pathlib.Path):
+    """Factory writing ``name`` under ``tmp_path``; same arguments as :func:`write_tabular_csv`."""
+    return lambda name, n_rows, **kwargs: write_tabular_csv(tmp_path / name, n_rows, **kwargs)
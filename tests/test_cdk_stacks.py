@@ -0,0 +1,33 @@
+import pathlib
+
+import pytest
+
+CDK_DIR = pathlib.Path(__file__).resolve().parents[1] / "infra" / "cdk"
+
+
+def test_event_buffer_table_expires_started_rows(monkeypatch):
+    cdk = pytest.importorskip("aws_cdk")
+    from aws_cdk import assertions
+
+    monkeypatch.syspath_prepend(str(CDK_DIR))
+    monkeypatch.chdir(CDK_DIR)
+    from stacks.eventbridge_stack import EventBridgeStack
+    from stacks.iam_stack import IamStack
+    from stacks.s3_stack import S3Stack
+
+    app = cdk.App()
+    s3_stack = S3Stack(app, "s3", env_name="test", project_name="p")
+    iam_stack = IamStack(app, "iam", env_name="test", project_name="p", bucket=s3_stack.bucket)
+    stack = EventBridgeStack(
+        app,
+        "events",
+        env_name="test",
+        project_name="p",
+        bucket=s3_stack.bucket,
+        lambda_role=iam_stack.lambda_role,
+        sagemaker_role=iam_stack.sagemaker_role,
+    )
+    assertions.Template.from_stack(stack).has_resource_properties(
+        "AWS::DynamoDB::Table",
+        {"TimeToLiveSpecification": {"AttributeName": "expires_at", "Enabled": True}},
+    )
@@ -0,0 +1,40 @@
+import torch
+
+from src.model.checkpoint import CheckpointManager
+from src.model.nn import SimpleMLP
+
+
+def _perturb(model):
+    with torch.no_grad():
+        for p in model.parameters():
+            p.add_(1.0)
+
+
+def test_restores_true_best_epoch(tmp_path):
+    model = SimpleMLP(input_dim=4)
+    manager = CheckpointManager(top_k=2, spill_dir=tmp_path)
+    best_weights = None
+    for epoch, score in enumerate([0.9, 0.5, 0.7, 0.8]):
+        _perturb(model)
+        manager.update(model, epoch, score)
+        if epoch == 1:
+            best_weights = {k: v.clone() for k, v in model.state_dict().items()}
+    assert [s.epoch for s in manager.snapshots] == [1, 2]
+    manager.restore(model)
+    manager.close()
+    for k, v in model.state_dict().items():
+        assert torch.equal(v, best_weights[k])
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["epoch-0001.pt", "epoch-0002.pt"]
+
+
+def test_half_precision_snapshots():
+    model = SimpleMLP(input_dim=4)
+    manager = CheckpointManager(half_precision=True)
+    manager.update(model, 0, 1.0)
+    assert all(v.dtype == torch.float16 for v in manager.best.state.values())
+    expected = {k: v.clone() for k, v in model.state_dict().items()}
+    _perturb(model)
+    manager.restore(model)
+    for k, v in model.state_dict().items():
+        assert v.dtype == torch.float32
+        torch.testing.assert_close(v, expected[k], atol=1e-2, rtol=1e-3)
@@ -0,0 +1,79 @@
+import os
+from dataclasses import FrozenInstanceError
+
+import pytest
+
+from src.common import config
+from src.common.config import ConfigRegistry, ProjectConfig, placeholders, resolve_env, thaw
+
+PROJECT_YAML = """\
+project_name: demo
+aws_region: us-east-1
+s3_bucket_name: ${PROJECT}-${STAGE}-bucket
+sagemaker_execution_role_arn: ${ROLE_ARN}
+model_package_group_name: group
+default_tags: ${tags}
+environment_name: dev
+"""
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_resolves_multiple_placeholders_recursively():
+    env = {"A": "x", "B": "y"}
+    assert resolve_env("${A}-${B}/${A}", env) == "x-y/x"
+    assert resolve_env("pre-${MISSING}-post", env) == "pre--post"
+    assert resolve_env({"k": ["${A}", {"n": "${B}"}], "i": 3}, env) == {"k": ["x", {"n": "y"}], "i": 3}
+    assert placeholders({"a": "${A}${B}", "b": ["${A}"]}) == ("A", "B")
+
+
+def test_registry_parses_once_and_revalidates_by_mtime(tmp_path, monkeypatch):
+    path = tmp_path / "pipeline.yaml"
+    path.write_text("pipeline_name: one\nsteps: [a, b]\n")
+    clock = FakeClock()
+    registry = ConfigRegistry(revalidate_s=5.0, clock=clock)
+    opens = []
+    real_open = open
+    monkeypatch.setattr("builtins.open", lambda *a, **k: opens.append(a[0]) or real_open(*a, **k))
+
+    first = registry.load(path)
+    assert registry.load(path) is first
+    assert first["steps"] == ("a", "b")
+    with pytest.raises(TypeError):
+        first["pipeline_name"] = "mutated"
+    assert thaw(first) == {"pipeline_name": "one", "steps": ["a", "b"]}
+
+    path.write_text("pipeline_name: two-changed\n")
+    os.utime(path, ns=(0, 10**9))
+    assert registry.load(path) is first, "not re-checked within revalidate_s"
+    clock.now = 10.0
+    assert registry.load(path)["pipeline_name"] == "two-changed"
+    clock.now = 20.0
+    registry.load(path)
+    assert len(opens) == 2
+
+
+def test_project_config_is_frozen_and_cached_per_environment(tmp_path, monkeypatch):
+    (tmp_path / "project.yaml").write_text(PROJECT_YAML)
+    (tmp_path / "tags.yaml").write_text("owner: team\n")
+    monkeypatch.setattr(config, "REGISTRY", ConfigRegistry(revalidate_s=0.0))
+    monkeypatch.setenv("PROJECT", "demo")
+    monkeypatch.setenv("STAGE", "dev")
+    monkeypatch.setenv("ROLE_ARN", "arn:role")
+
+    project = ProjectConfig.load(tmp_path / "project.yaml", tags_path=tmp_path / "tags.yaml")
+    assert project.s3_bucket_name == "demo-dev-bucket"
+    assert project.sagemaker_execution_role_arn == "arn:role"
+    assert dict(project.default_tags) == {"owner": "team"}
+    assert ProjectConfig.load(tmp_path / "project.yaml", tags_path=tmp_path / "tags.yaml") is project
+    with pytest.raises(FrozenInstanceError):
+        project.aws_region = "eu-west-1"
+
+    monkeypatch.setenv("STAGE", "prod")
+    assert ProjectConfig.load(tmp_path / "project.yaml", tags_path=tmp_path / "tags.yaml").s3_bucket_name == "demo-prod-bucket"
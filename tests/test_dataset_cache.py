@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+
+from src.model.dataset_cache import open_cached
+from src.model.train import load_data, train_model
+
+
+def test_cache_matches_csv_and_is_reused(tabular_csv, tmp_path):
+    cache_dir = tmp_path.parent / f"{tmp_path.name}-cache"
+    X, y = open_cached(tabular_csv, cache_dir, chunksize=64)
+    df = pd.read_csv(tabular_csv)
+    assert isinstance(X, np.memmap) and X.dtype == np.float32
+    np.testing.assert_allclose(X, df.drop(columns=["label"]).to_numpy(np.float32))
+    np.testing.assert_array_equal(y, df["label"].to_numpy())
+    entries = list(cache_dir.iterdir())
+    X2, _ = load_data(tabular_csv, cache_dir)
+    assert list(cache_dir.iterdir()) == entries
+    assert X2.filename == X.filename
+
+
+def test_training_from_cache(tabular_csv, tmp_path):
+    _, metrics, _ = train_model(tabular_csv, tabular_csv, "classification", epochs=1, cache_dir=tmp_path.parent / f"{tmp_path.name}-cache")
+    assert "accuracy" in metrics
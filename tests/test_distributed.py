@@ -0,0 +1,67 @@
+import json
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+from src.model.distributed import DistributedContext
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+
+def test_context_from_torchrun_and_sagemaker_env():
+    torchrun = DistributedContext.from_env({"RANK": "3", "WORLD_SIZE": "4", "LOCAL_RANK": "1", "LOCAL_WORLD_SIZE": "2"})
+    assert (torchrun.rank, torchrun.world_size, torchrun.local_world_size) == (3, 4, 2)
+    assert torchrun.enabled and not torchrun.is_main
+    sagemaker = DistributedContext.from_env({"SM_HOSTS": '["algo-2", "algo-1"]', "SM_CURRENT_HOST": "algo-2"})
+    assert (sagemaker.rank, sagemaker.world_size, sagemaker.master_addr) == (1, 2, "algo-1")
+    single = DistributedContext.from_env({"SM_HOSTS": '["algo-1"]', "SM_CURRENT_HOST": "algo-1"})
+    assert not single.enabled and single.is_main and single.all_reduce_sum(1.0, 2.0) == [1.0, 2.0]
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="multi-process gloo run")
+def test_torchrun_trains_two_ranks_and_rank_zero_saves(tmp_path, make_tabular_csv):
+    train_csv = make_tabular_csv("train.csv", 400)
+    val_csv = make_tabular_csv("val.csv", 100, seed=1)
+    command = [
+        sys.executable, "-m", "torch.distributed.run", "--standalone", "--nproc_per_node=2",
+        "-m", "src.model.train",
+        "--train-csv", str(train_csv), "--val-csv", str(val_csv), "--epochs", "10",
+        "--output-dir", str(tmp_path / "out"), "--run-id", "ddp",
+        "--checkpoint-dir", str(tmp_path / "ckpt"), "--num-threads", "1", "--num-workers", "0",
+    ]  # fmt: skip
+    result = subprocess.run(command, cwd=ROOT, capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stderr[-2000:]
+    out = tmp_path / "out" / "ddp"
+    metrics = json.loads((out / "metrics.json").read_text())
+    assert metrics["accuracy"] > 0.6
+    assert {"metrics.json", "model.pt", "model_meta.json"} <= {p.name for p in out.iterdir()}
+    # Only rank 0 spills checkpoints, so the shared directory holds one file per kept epoch.
+    assert len(list((tmp_path / "ckpt").iterdir())) == 1
+    # Both ranks log identical all-reduced validation losses.
+    losses = [line for line in result.stdout.splitlines() + result.stderr.splitlines() if "validation loss" in line]
+    assert len(losses) % 2 == 0 and len({line.split("validation loss")[1] for line in losses}) == len(losses) // 2
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="multi-process gloo run")
+def test_streaming_ranks_report_metrics_on_the_whole_validation_set(tmp_path, make_tabular_csv):
+    from src.model.evaluate import evaluate, load_model
+
+    train_csv = make_tabular_csv("train.csv", 400)
+    val_csv = make_tabular_csv("val.csv", 100, seed=1)
+    command = [
+        sys.executable, "-m", "torch.distributed.run", "--standalone", "--nproc_per_node=2",
+        "-m", "src.model.train",
+        "--train-csv", str(train_csv), "--val-csv", str(val_csv), "--epochs", "3",
+        "--data-mode", "streaming", "--chunksize", "16",
+        "--output-dir", str(tmp_path / "out"), "--run-id", "ddp", "--num-threads", "1", "--num-workers", "0",
+    ]  # fmt: skip
+    result = subprocess.run(command, cwd=ROOT, capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stderr[-2000:]
+    out = tmp_path / "out" / "ddp"
+    metrics = json.loads((out / "metrics.json").read_text())
+    # Small chunks deal the validation file across both ranks; rank 0's final metrics must still
+    # match a single-process evaluation of the saved model on every row.
+    expected = evaluate(load_model(out / "model.pt"), val_csv, "classification")
+    assert {k: metrics[k] for k in expected} == pytest.approx(expected)
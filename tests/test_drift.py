@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.model.drift import BASELINE_FILE, DriftBaseline, HistogramAccumulator, compute_drift, drift_scores
+from src.model.train import save_artifacts, train_model
+from src.sagemaker.triggers.drift_checks import check_drift, decide_retrain
+
+
+def test_histograms_match_searchsorted_reference():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(4000, 6)).astype(np.float32)
+    X[::13, 2] = np.nan
+    X[:500, 4] = 0.0
+    baseline = DriftBaseline.from_array(X, [f"f{i}" for i in range(6)])
+    for j in range(6):
+        col = X[:, j]
+        idx = np.searchsorted(baseline.edges[j], col, side="right")
+        idx[np.isnan(col)] = baseline.edges.shape[1] + 1
+        np.testing.assert_array_equal(baseline.counts[j], np.bincount(idx, minlength=baseline.counts.shape[1]))
+
+    chunked = baseline.accumulator()
+    chunked.update_array(X, chunksize=333)
+    np.testing.assert_array_equal(chunked.counts, baseline.counts)
+
+
+def test_scores_match_textbook_formulas():
+    ref = np.array([[50, 30, 20]])
+    cur = np.array([[20, 30, 50]])
+    scores = drift_scores(ref, cur)
+    p, q = ref[0] / 100, cur[0] / 100
+    assert scores["psi"][0] == pytest.approx(((q - p) * np.log(q / p)).sum(), rel=1e-3)
+    assert scores["ks"][0] == pytest.approx(0.3, rel=1e-3)
+    m = (p + q) / 2
+    js = np.sqrt(0.5 * (p * np.log2(p / m)).sum() + 0.5 * (q * np.log2(q / m)).sum())
+    assert scores["js"][0] == pytest.approx(js, rel=1e-3)
+    assert all(drift_scores(ref, ref)[metric][0] == pytest.approx(0.0, abs=1e-9) for metric in ("psi", "ks", "js"))
+
+
+def test_only_shifted_and_nulled_features_drift():
+    rng = np.random.default_rng(1)
+    names = [f"f{i}" for i in range(20)]
+    baseline = DriftBaseline.from_array(rng.normal(size=(50_000, 20)).astype(np.float32), names)
+    new = rng.normal(size=(20_000, 20)).astype(np.float32)
+    new[:, 3] += 1.0
+    new[::3, 7] = np.nan
+    report = compute_drift(baseline, new, chunksize=4096)
+    for metric in ("psi", "ks", "js"):
+        assert report.drifted(metric) == ["f3", "f7"]
+    assert decide_retrain(report)
+    assert not decide_retrain(report, min_features=3)
+    assert not decide_retrain(compute_drift(baseline, rng.normal(size=(20_000, 20)).astype(np.float32)))
+    assert decide_retrain(0.5) and not decide_retrain(0.1)
+
+
+def test_training_writes_baseline_used_by_drift_check(tmp_path, make_tabular_csv):
+    train_csv = make_tabular_csv("train.csv", 2000, seed=0)
+    model, metrics, artifacts = train_model(train_csv, train_csv, "classification", epochs=1)
+    save_artifacts(model, metrics, tmp_path / "run", artifacts)
+    assert (tmp_path / "run" / BASELINE_FILE).exists()
+    baseline = DriftBaseline.load(tmp_path / "run")
+    assert baseline.feature_names == [f"feature_{i}" for i in range(5)] and baseline.n_rows == 2000
+
+    fresh = make_tabular_csv("fresh.csv", 2000, seed=1)
+    assert not decide_retrain(check_drift(tmp_path / "run", fresh))
+    shifted = pd.read_csv(fresh).drop(columns="label")
+    shifted["feature_1"] += 2.0
+    shifted.to_csv(tmp_path / "shifted.csv", index=False)
+    report = check_drift(tmp_path / "run", tmp_path / "shifted.csv")
+    assert report.drifted() == ["feature_1"] and decide_retrain(report)
+
+
+def test_streaming_baseline_matches_array_baseline(make_tabular_csv):
+    csv = make_tabular_csv("train.csv", 3000, seed=2)
+    from_csv = DriftBaseline.from_csv(csv, chunksize=700)
+    X = pd.read_csv(csv).drop(columns="label").to_numpy(dtype=np.float32)
+    acc = HistogramAccumulator(from_csv.edges)
+    acc.update(X)
+    np.testing.assert_array_equal(from_csv.counts, acc.counts)
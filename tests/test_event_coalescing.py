@@ -0,0 +1,175 @@
+import threading
+
+import boto3
+import pytest
+
+from src.sagemaker.triggers.coalesce import (
+    DynamoDBEventBuffer,
+    EventCoalescer,
+    InMemoryEventBuffer,
+    SQLiteEventBuffer,
+    dataset_token,
+)
+
+
+def _event(key):
+    return {"detail-type": "Object Created", "detail": {"bucket": {"name": "b"}, "object": {"key": key}}}
+
+
+@pytest.fixture(params=["memory", "sqlite", "dynamodb"])
+def buffer(request, tmp_path):
+    if request.param == "memory":
+        yield InMemoryEventBuffer()
+    elif request.param == "sqlite":
+        yield SQLiteEventBuffer(str(tmp_path / "events.db"))
+    else:
+        moto = pytest.importorskip("moto")
+        with moto.mock_aws():
+            client = boto3.client("dynamodb", region_name="us-east-1")
+            client.create_table(
+                TableName="buffer",
+                KeySchema=[{"AttributeName": "prefix", "KeyType": "HASH"}],
+                AttributeDefinitions=[{"AttributeName": "prefix", "AttributeType": "S"}],
+                BillingMode="PAY_PER_REQUEST",
+            )
+            yield DynamoDBEventBuffer("buffer", client)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _coalescer(buffer, clock, **kwargs):
+    starts = []
+
+    def start(prefix, token):
+        starts.append((prefix, token))
+        return f"arn:execution/{len(starts)}"
+
+    return EventCoalescer(buffer, start, quiet_period_s=60, clock=clock, **kwargs), starts
+
+
+def test_bulk_upload_starts_once_after_quiet_period(buffer):
+    clock = FakeClock()
+    coalescer, starts = _coalescer(buffer, clock)
+    for i in range(200):
+        clock.now += 0.01
+        assert coalescer.ingest(_event(f"datasets/abc123/part-{i:05d}.parquet")) == "datasets/abc123/"
+        if i % 50 == 0:
+            assert coalescer.flush() == {}
+    clock.now += 59
+    assert coalescer.flush() == {}
+    clock.now += 2
+    assert coalescer.flush() == {"datasets/abc123/": "arn:execution/1"}
+    assert starts == [("datasets/abc123/", dataset_token("datasets/abc123/"))]
+
+    # Late objects and later flushes never restart the dataset.
+    coalescer.ingest(_event("datasets/abc123/late.parquet"))
+    clock.now += 120
+    assert coalescer.flush() == {}
+    row = buffer.get("datasets/abc123/")
+    assert row.object_count == 201 and row.execution_arn == "arn:execution/1"
+
+
+def test_marker_completes_dataset_immediately(buffer):
+    clock = FakeClock()
+    coalescer, starts = _coalescer(buffer, clock, marker_name="_SUCCESS")
+    coalescer.ingest(_event("datasets/v1/part-0.csv"))
+    clock.now += 3600
+    assert coalescer.flush() == {}
+    coalescer.ingest(_event("datasets/v1/_SUCCESS"))
+    coalescer.ingest(_event("datasets/v2/part-0.csv"))
+    assert list(coalescer.flush()) == ["datasets/v1/"]
+    assert [prefix for prefix, _ in starts] == ["datasets/v1/"]
+
+
+def test_keys_outside_datasets_prefix_are_ignored(buffer):
+    coalescer, _ = _coalescer(buffer, FakeClock())
+    assert coalescer.ingest(_event("models/abc/model.tar.gz")) is None
+    assert coalescer.ingest(_event("datasets/loose-file.csv")) is None
+    assert list(buffer.pending()) == []
+
+
+def test_failed_start_is_retried(buffer):
+    clock = FakeClock()
+    calls = []
+
+    def flaky_start(prefix, token):
+        calls.append(prefix)
+        if len(calls) == 1:
+            raise RuntimeError("throttled")
+        return "arn:execution/ok"
+
+    coalescer = EventCoalescer(buffer, flaky_start, quiet_period_s=0, clock=clock)
+    coalescer.ingest(_event("datasets/x/a.csv"))
+    with pytest.raises(RuntimeError):
+        coalescer.flush()
+    assert coalescer.flush() == {"datasets/x/": "arn:execution/ok"}
+
+
+def test_concurrent_flushes_start_exactly_once(tmp_path):
+    path = str(tmp_path / "events.db")
+    clock = FakeClock()
+    starts = []
+    lock = threading.Lock()
+
+    def start(prefix, token):
+        with lock:
+            starts.append(prefix)
+        return "arn"
+
+    seed = EventCoalescer(SQLiteEventBuffer(path), start, quiet_period_s=0, clock=clock)
+    for i in range(50):
+        seed.ingest(_event(f"datasets/d{i % 5}/part-{i}.csv"))
+    workers = [EventCoalescer(SQLiteEventBuffer(path), start, quiet_period_s=0, clock=clock) for _ in range(8)]
+    threads = [threading.Thread(target=w.flush) for w in workers]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(starts) == [f"datasets/d{i}/" for i in range(5)]
+
+
+def test_ingest_path_only_reads_its_own_prefix(buffer):
+    clock = FakeClock()
+    coalescer, starts = _coalescer(buffer, clock, marker_name="_SUCCESS")
+    buffer.pending = lambda: pytest.fail("object events must not scan the buffer")
+    coalescer.ingest(_event("datasets/v1/part-0.csv"))
+    assert coalescer.start_if_due("datasets/v1/") == {}
+    prefix = coalescer.ingest(_event("datasets/v1/_SUCCESS"))
+    assert coalescer.start_if_due(prefix) == {"datasets/v1/": "arn:execution/1"}
+    assert coalescer.start_if_due(prefix) == {}
+    assert len(starts) == 1
+
+
+def test_quiet_period_datasets_wait_for_the_scheduled_flush(buffer):
+    clock = FakeClock()
+    coalescer, _ = _coalescer(buffer, clock)
+    coalescer.ingest(_event("datasets/v1/part-0.csv"))
+    clock.now += 120
+    assert coalescer.start_if_due("datasets/v1/") == {}
+    assert list(coalescer.flush()) == ["datasets/v1/"]
+
+
+def test_started_rows_get_a_ttl():
+    moto = pytest.importorskip("moto")
+    with moto.mock_aws():
+        client = boto3.client("dynamodb", region_name="us-east-1")
+        client.create_table(
+            TableName="buffer",
+            KeySchema=[{"AttributeName": "prefix", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "prefix", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        buffer = DynamoDBEventBuffer("buffer", client, started_ttl_s=3600)
+        buffer.record("datasets/v1/", 1_000.0)
+        ttl = lambda: client.get_item(TableName="buffer", Key={"prefix": {"S": "datasets/v1/"}})["Item"].get("expires_at")  # noqa: E731
+        assert ttl() is None
+        assert buffer.claim("datasets/v1/", 1_000.0)
+        assert ttl() == {"N": "4600"}
+        buffer.release("datasets/v1/")
+        assert ttl() is None
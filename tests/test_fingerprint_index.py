@@ -0,0 +1,38 @@
+import hashlib
+import json
+import os
+
+from src.common import hashing
+from src.common.hashing import compute_dataset_fingerprint
+
+
+def _reference_fingerprint(base):
+    hashes = {}
+    for file in sorted(p for p in base.rglob("*") if p.is_file()):
+        hashes[str(file.relative_to(base))] = hashlib.sha256(file.read_bytes()).hexdigest()
+    return hashlib.sha256(json.dumps(hashes, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def test_indexed_fingerprint_matches_and_skips_unchanged(tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    (data / "nested").mkdir(parents=True)
+    for i in range(6):
+        (data / ("nested" if i % 2 else ".") / f"f{i}.csv").write_text(f"x\n{i}\n" * (i + 1))
+    index = tmp_path / "index.json"
+    # Age the files so their mtimes are safely older than the index write.
+    for p in data.rglob("*.csv"):
+        os.utime(p, ns=(p.stat().st_atime_ns, p.stat().st_mtime_ns - 10**10))
+
+    expected = _reference_fingerprint(data)
+    assert compute_dataset_fingerprint(data, max_workers=3) == expected
+    assert compute_dataset_fingerprint(data, index_path=index) == expected
+
+    hashed = []
+    real = hashing.compute_file_sha256
+    monkeypatch.setattr(hashing, "compute_file_sha256", lambda p: hashed.append(p) or real(p))
+    assert compute_dataset_fingerprint(data, index_path=index) == expected
+    assert hashed == []
+
+    (data / "f0.csv").write_text("changed\n")
+    assert compute_dataset_fingerprint(data, index_path=index) == _reference_fingerprint(data)
+    assert [p.name for p in hashed] == ["f0.csv"]
@@ -0,0 +1,60 @@
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+REPO_ROOT = pathlib.Path(__file__).resolve().parents[1]
+HEAVY_MODULES = {"torch", "pandas", "sklearn", "sagemaker", "pyarrow"}
+# Budgets are several times the measured import cost (typer alone is ~0.2s) so they only trip
+# when a heavy dependency sneaks back into module scope.
+HELP_BUDGET_S = 1.0
+AWS_COMMAND_BUDGET_S = 1.5
+LAMBDA_INIT_BUDGET_S = 1.0
+
+
+def _import_profile(*args: str):
+    """Run ``python -X importtime`` and return (imported top-level packages, total seconds)."""
+    proc = subprocess.run(  # noqa: S603 - this interpreter, fixed arguments
+        [sys.executable, "-X", "importtime", *args], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    packages, total_us = set(), 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        packages.add(name.strip().split(".")[0])
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+    return packages, total_us / 1e6
+
+
+def test_help_skips_heavy_imports():
+    packages, seconds = _import_profile("-m", "src.cli.main", "--help")
+    assert not packages & (HEAVY_MODULES | {"boto3"})
+    assert seconds < HELP_BUDGET_S
+
+
+@pytest.mark.parametrize("command", ["autopilot-monitor", "autopilot-select"])
+def test_aws_commands_only_import_boto3(command):
+    module = {
+        "autopilot-monitor": "src.sagemaker.autopilot.monitor_job",
+        "autopilot-select": "src.sagemaker.autopilot.select_best_model",
+    }[command]
+    packages, seconds = _import_profile("-c", f"import src.cli.main, {module}")
+    assert "boto3" in packages
+    assert not packages & HEAVY_MODULES
+    assert seconds < AWS_COMMAND_BUDGET_S
+
+
+def test_lambda_trigger_cold_start_budget():
+    env_prefix = "import os; os.environ.setdefault('PIPELINE_NAME', 'p'); os.environ.setdefault('AWS_REGION', 'us-east-1'); "
+    packages, seconds = _import_profile("-c", env_prefix + "import src.sagemaker.triggers.lambda_handler")
+    assert "sagemaker" not in packages
+    assert not packages & HEAVY_MODULES
+    assert seconds < LAMBDA_INIT_BUDGET_S
+
+
+def test_drift_checks_skip_torch():
+    packages, _ = _import_profile("-c", "import src.sagemaker.triggers.drift_checks")
+    assert "torch" not in packages
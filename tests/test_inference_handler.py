@@ -0,0 +1,105 @@
+import io
+import json
+import tarfile
+
+import numpy as np
+import pytest
+import torch
+
+from src.model import inference
+from src.model.evaluate import load_model_and_metadata
+from src.model.export import export_model_artifacts
+from src.model.nn import SimpleMLP
+from src.model.train import save_artifacts, train_model
+
+
+@pytest.fixture
+def model():
+    torch.manual_seed(0)
+    return SimpleMLP(input_dim=10).eval()
+
+
+def test_content_types_agree(model):
+    X = np.random.default_rng(0).normal(size=(7, 10)).astype(np.float32)
+    csv = "\n".join(",".join(f"{v:.9g}" for v in row) for row in X)
+    npy = io.BytesIO()
+    np.save(npy, X)
+    expected = model(torch.from_numpy(X)).detach().numpy()
+    for payload, content_type in [(csv, "text/csv"), (json.dumps({"data": X.tolist()}), "application/json"), (npy.getvalue(), "application/x-npy")]:
+        data = inference.input_fn(payload, content_type)
+        assert data.dtype == torch.float32 and data.shape == (7, 10)
+        np.testing.assert_allclose(inference.predict_fn(data, model), expected, rtol=1e-5)
+
+
+def test_outputs_preserve_float32_values(model):
+    preds = inference.predict_fn(inference.input_fn("1,2,3,4,5,6,7,8,9,10", "text/csv"), model)
+    body = json.loads(inference.output_fn(preds, "application/json"))
+    np.testing.assert_array_equal(np.asarray(body["predictions"], dtype=np.float32), preds)
+    assert np.array_equal(np.load(io.BytesIO(inference.output_fn(preds, "application/x-npy"))), preds)
+    with pytest.raises(ValueError):
+        inference.input_fn(b"", "image/png")
+
+
+def test_export_packages_self_describing_model(tabular_csv, tmp_path):
+    trained, metrics, artifacts = train_model(tabular_csv, tabular_csv, "classification", epochs=1)
+    save_artifacts(trained, metrics, tmp_path / "run", artifacts)
+    _, metadata = load_model_and_metadata(tmp_path / "run" / "model.pt")
+    assert metadata.input_dim == 5
+    assert metadata.feature_names == [f"feature_{i}" for i in range(5)]
+    assert metadata.label_mapping == [0, 1]
+
+    tar_path = export_model_artifacts(tmp_path / "run" / "model.pt", tmp_path / "export")
+    with tarfile.open(tar_path) as tar:
+        assert {"model.pt", "model_meta.json", "code/inference.py", "code/requirements.txt"} <= set(tar.getnames())
+        tar.extractall(tmp_path / "served")
+    served = inference.model_fn(tmp_path / "served")
+    preds = inference.predict_fn(inference.input_fn("1,2,3,4,5", "text/csv"), served)
+    assert preds.shape == (1, 1)
+    with pytest.raises(ValueError):
+        inference.predict_fn(inference.input_fn("1,2,3", "text/csv"), served)
+
+
+def test_export_falls_back_for_models_without_manifest(tmp_path):
+    legacy = SimpleMLP(input_dim=7, output_dim=2).eval()
+    (tmp_path / "legacy").mkdir()
+    torch.save(legacy.state_dict(), tmp_path / "legacy" / "model.pt")
+    tar_path = export_model_artifacts(tmp_path / "legacy" / "model.pt", tmp_path / "export")
+    with tarfile.open(tar_path) as tar:
+        tar.extractall(tmp_path / "served")
+    manifest = json.loads((tmp_path / "served" / "model_meta.json").read_text())
+    assert (manifest["input_dim"], manifest["output_dim"]) == (7, 2)
+    rows = torch.ones(3, 7)
+    np.testing.assert_allclose(inference.predict_fn(rows, inference.model_fn(tmp_path / "served")), legacy(rows).detach().numpy())
+
+
+@pytest.mark.parametrize("export_format", ["torchscript", "onnx"])
+def test_compiled_exports_match_eager(tabular_csv, tmp_path, export_format):
+    if export_format == "onnx":
+        pytest.importorskip("onnxruntime")
+    trained, metrics, artifacts = train_model(tabular_csv, tabular_csv, "classification", epochs=1)
+    save_artifacts(trained, metrics, tmp_path / "run", artifacts)
+
+    tar_path = export_model_artifacts(tmp_path / "run" / "model.pt", tmp_path / "export", export_format)
+    artifact = "model.ts" if export_format == "torchscript" else "model.onnx"
+    with tarfile.open(tar_path) as tar:
+        assert artifact in tar.getnames() and "model.pt" not in tar.getnames()
+        tar.extractall(tmp_path / "served")
+    assert json.loads((tmp_path / "served" / "model_meta.json").read_text())["artifact"] == artifact
+
+    served = inference.model_fn(tmp_path / "served")
+    rows = inference.input_fn(json.dumps({"data": np.random.default_rng(1).normal(size=(7, 5)).tolist()}), "application/json")
+    with torch.inference_mode():
+        expected = trained(rows).numpy()
+    np.testing.assert_allclose(inference.predict_fn(rows, served), expected, rtol=1e-5, atol=1e-6)
+    with pytest.raises(ValueError):
+        inference.predict_fn(inference.input_fn("1,2,3", "text/csv"), served)
+
+
+def test_text_outputs_keep_shape_and_non_finite_values():
+    preds = np.array([[0.5, np.inf], [-np.inf, np.nan], [1e-45, -3.4028235e38]], dtype=np.float32)
+    body = json.loads(inference.output_fn(preds, "application/json"))
+    np.testing.assert_array_equal(np.asarray(body["predictions"], dtype=np.float32), preds)
+    rows = [line.split(",") for line in inference.output_fn(preds, "text/csv").split("\n")]
+    np.testing.assert_array_equal(np.asarray(rows, dtype=np.float32), preds)
+    flat = np.array([1.0, 0.125], dtype=np.float32)
+    assert json.loads(inference.output_fn(flat, "application/json")) == {"predictions": [1.0, 0.125]}
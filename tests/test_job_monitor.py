@@ -0,0 +1,110 @@
+import asyncio
+import random
+import threading
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+from src.sagemaker.autopilot.monitor_job import Backoff, Target, monitor_jobs, wait_all, watch
+
+FAST = Backoff(initial=0.01, maximum=0.02, minimum=0.0)
+
+
+class ScriptedClient:
+    """Returns the next scripted status per target on every describe; the last one repeats."""
+
+    def __init__(self, scripts):
+        self.scripts = {name: list(statuses) for name, statuses in scripts.items()}
+        self.calls = {name: 0 for name in scripts}
+        self.in_flight = self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _next(self, name):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.calls[name] += 1
+            script = self.scripts[name]
+            status = script.pop(0) if len(script) > 1 else script[0]
+        time.sleep(0.005)
+        with self._lock:
+            self.in_flight -= 1
+        if isinstance(status, Exception):
+            raise status
+        return status
+
+    def describe_auto_ml_job_v2(self, AutoMLJobName):
+        status = self._next(AutoMLJobName)
+        return {"AutoMLJobName": AutoMLJobName, "AutoMLJobStatus": status[0], "AutoMLJobSecondaryStatus": status[1]}
+
+    def describe_pipeline_execution(self, PipelineExecutionArn):
+        return {"PipelineExecutionArn": PipelineExecutionArn, "PipelineExecutionStatus": self._next(PipelineExecutionArn)}
+
+
+def _throttled():
+    return ClientError({"Error": {"Code": "ThrottlingException", "Message": "slow down"}}, "DescribeAutoMLJobV2")
+
+
+async def _collect(targets, **kwargs):
+    return [change async for change in watch(targets, **kwargs)]
+
+
+def test_streams_only_status_changes_for_many_targets():
+    running = ("InProgress", "AnalyzingData")
+    scripts = {
+        "job-a": [running, running, ("InProgress", "TrainingModels"), ("Completed", "Completed")],
+        "job-b": [running, _throttled(), ("Failed", "Failed")],
+        "arn:pipeline/execution/x": ["Executing", "Executing", "Succeeded"],
+    }
+    client = ScriptedClient(scripts)
+    targets = [Target.autopilot("job-a"), Target.autopilot("job-b"), Target.pipeline("arn:pipeline/execution/x")]
+    changes = asyncio.run(_collect(targets, client=client, backoff=FAST, max_concurrency=2))
+
+    history = {t: [(c.status, c.secondary_status) for c in changes if c.target == t] for t in targets}
+    assert history[targets[0]] == [running, ("InProgress", "TrainingModels"), ("Completed", "Completed")]
+    assert history[targets[1]] == [running, ("Failed", "Failed")]
+    assert history[targets[2]] == [("Executing", ""), ("Succeeded", "")]
+    assert sum(c.terminal for c in changes) == 3
+    assert client.max_in_flight <= 2
+
+
+def test_non_throttling_errors_propagate():
+    error = ClientError({"Error": {"Code": "ValidationException", "Message": "no such job"}}, "DescribeAutoMLJobV2")
+    client = ScriptedClient({"missing": [error]})
+    with pytest.raises(ClientError):
+        asyncio.run(_collect([Target.autopilot("missing")], client=client, backoff=FAST))
+
+
+def test_events_wake_targets_before_the_backoff_expires():
+    client = ScriptedClient({"arn:exec/1": ["Executing", "Succeeded"]})
+    target = Target.pipeline("arn:exec/1")
+
+    async def events():
+        await asyncio.sleep(0.05)
+        yield {"detail": {"pipelineExecutionArn": "arn:exec/other"}}
+        yield {"detail": {"pipelineExecutionArn": "arn:exec/1", "currentPipelineExecutionStatus": "Succeeded"}}
+        await asyncio.sleep(3600)
+
+    started = time.perf_counter()
+    final = asyncio.run(wait_all([target], client=client, events=events()))
+    assert final[target].status == "Succeeded"
+    assert time.perf_counter() - started < 5
+    assert client.calls["arn:exec/1"] == 2
+
+
+def test_backoff_is_jittered_and_capped():
+    backoff = Backoff(initial=2, maximum=10, minimum=0.5)
+    rng = random.Random(0)
+    delays = [backoff.delay(attempt, rng) for attempt in range(10) for _ in range(50)]
+    assert all(0.5 <= d <= 10 for d in delays)
+    assert len(set(delays)) > 400
+    assert max(backoff.delay(0, rng) for _ in range(200)) <= 2
+
+
+def test_monitor_jobs_returns_final_responses(monkeypatch):
+    client = ScriptedClient({"j1": [("Completed", "Completed")], "j2": [("InProgress", ""), ("Stopped", "")]})
+    monkeypatch.setattr("src.sagemaker.autopilot.monitor_job.boto3.client", lambda *a, **k: client)
+    final = monitor_jobs(["j1", "j2"], backoff=FAST)
+    assert final["j1"]["AutoMLJobStatus"] == "Completed"
+    assert final["j2"]["AutoMLJobStatus"] == "Stopped"
@@ -0,0 +1,109 @@
+import hashlib
+import importlib
+import json
+
+import pytest
+from botocore.stub import ANY, Stubber
+
+EXECUTION_ARN = "arn:aws:sagemaker:us-east-1:123456789012:pipeline/p/execution/abc"
+
+
+def _reload_handler(monkeypatch):
+    monkeypatch.setenv("PIPELINE_NAME", "retrain-pipeline")
+    monkeypatch.setenv("BUCKET_NAME", "data-bucket")
+    monkeypatch.setenv("AWS_REGION", "us-east-1")
+    monkeypatch.setenv("METRIC_THRESHOLD", "0.8")
+    monkeypatch.delenv("TRIGGER_MODE", raising=False)
+    from src.sagemaker.triggers import lambda_handler
+
+    return importlib.reload(lambda_handler)
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    monkeypatch.delenv("COALESCE_TABLE", raising=False)
+    return _reload_handler(monkeypatch)
+
+
+def test_starts_pipeline_by_name_with_cached_client(handler):
+    client = handler.sagemaker_client
+    event = {"id": "0e3a1b2c-aaaa-bbbb-cccc-1234567890ab", "detail": {"object": {"key": "datasets/v1/data.csv"}}}
+    listing = {"Contents": [{"Key": "datasets/v1/data.csv", "Size": 10, "ETag": '"abc"'}], "KeyCount": 1}
+    fingerprint = hashlib.sha256(json.dumps({"": [10, "abc"]}).encode("utf-8")).hexdigest()
+    with Stubber(client) as stub, Stubber(handler.s3_client) as s3_stub:
+        for _ in range(2):
+            s3_stub.add_response("list_objects_v2", listing, {"Bucket": "data-bucket", "Prefix": "datasets/v1/data.csv"})
+            stub.add_response(
+                "start_pipeline_execution",
+                {"PipelineExecutionArn": EXECUTION_ARN},
+                {
+                    "PipelineName": "retrain-pipeline",
+                    "PipelineParameters": [
+                        {"Name": "ProblemType", "Value": "classification"},
+                        {"Name": "MetricThreshold", "Value": "0.8"},
+                        {"Name": "ApprovalStatus", "Value": "PendingManualApproval"},
+                        {"Name": "DatasetS3Uri", "Value": "s3://data-bucket/datasets/v1/data.csv"},
+                        {"Name": "DatasetFingerprint", "Value": fingerprint},
+                    ],
+                    "PipelineExecutionDescription": ANY,
+                    "ClientRequestToken": event["id"],
+                },
+            )
+        assert handler.lambda_handler(event, None) == {"status": "triggered", "arn": EXECUTION_ARN}
+        assert handler.lambda_handler(event, None)["arn"] == EXECUTION_ARN
+        stub.assert_no_pending_responses()
+    assert handler.sagemaker_client is client
+
+
+def test_settings_fall_back_to_pipeline_config(tmp_path):
+    from src.sagemaker.triggers.lambda_handler import TriggerSettings
+
+    config = tmp_path / "pipeline.yaml"
+    config.write_text("pipeline_name: from-file\nmetric_threshold_accuracy: 0.9\n")
+    settings = TriggerSettings.load({"PIPELINE_CONFIG_PATH": str(config)})
+    assert settings.pipeline_name == "from-file"
+    assert settings.metric_threshold == 0.9
+    assert TriggerSettings.load({"PIPELINE_CONFIG_PATH": str(config), "PIPELINE_NAME": "env"}).pipeline_name == "env"
+
+
+def test_scheduled_event_without_dataset_uses_pipeline_default(handler):
+    params = handler.pipeline_parameters(handler.SETTINGS, handler.dataset_uri({"detail": {}}, "data-bucket"))
+    assert "DatasetS3Uri" not in {p["Name"] for p in params}
+
+
+def test_object_events_are_coalesced_per_dataset(monkeypatch):
+    moto = pytest.importorskip("moto")
+    monkeypatch.setenv("COALESCE_TABLE", "dataset-events")
+    monkeypatch.setenv("COALESCE_MARKER", "_SUCCESS")
+    with moto.mock_aws():
+        import boto3
+
+        boto3.client("dynamodb", region_name="us-east-1").create_table(
+            TableName="dataset-events",
+            KeySchema=[{"AttributeName": "prefix", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "prefix", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        # The Lambda fingerprints the dataset prefix before starting the pipeline.
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="data-bucket")
+        handler = _reload_handler(monkeypatch)
+        events = [
+            {"id": f"evt-{i}", "detail-type": "Object Created", "detail": {"object": {"key": f"datasets/ds1/part-{i}.csv"}}}
+            for i in range(20)
+        ]
+        events.append({"id": "evt-done", "detail-type": "Object Created", "detail": {"object": {"key": "datasets/ds1/_SUCCESS"}}})
+        with Stubber(handler.sagemaker_client) as stub:
+            stub.add_response(
+                "start_pipeline_execution",
+                {"PipelineExecutionArn": EXECUTION_ARN},
+                {
+                    "PipelineName": "retrain-pipeline",
+                    "PipelineParameters": ANY,
+                    "PipelineExecutionDescription": "Triggered for s3://data-bucket/datasets/ds1/",
+                    "ClientRequestToken": ANY,
+                },
+            )
+            results = [handler.lambda_handler(event, None) for event in events]
+            results.append(handler.lambda_handler({"action": "flush"}, None))
+            stub.assert_no_pending_responses()
+    assert [r["started"] for r in results if r["started"]] == [{"datasets/ds1/": EXECUTION_ARN}]
@@ -0,0 +1,36 @@
+import argparse
+
+import torch
+
+from src.model.parallel import ParallelConfig, add_parallel_arguments
+from src.model.train import train_model
+
+
+def test_auto_tuning_splits_cores():
+    cfg = ParallelConfig().resolved(cpu_count=16, streaming=True)
+    assert cfg.num_workers == 4 and cfg.num_threads == 12 and cfg.persistent_workers
+    in_memory = ParallelConfig().resolved(cpu_count=16)
+    assert in_memory.num_workers == 0 and in_memory.num_threads == 16
+    single = ParallelConfig().resolved(cpu_count=1, streaming=True)
+    assert single.num_workers == 0 and single.num_threads == 1
+    assert "prefetch_factor" not in single.dataloader_kwargs()
+
+
+def test_sagemaker_hyperparameter_spelling():
+    parser = argparse.ArgumentParser()
+    add_parallel_arguments(parser)
+    args = parser.parse_args(["--num_workers", "2", "--pin_memory", "true", "--num-threads", "3"])
+    cfg = ParallelConfig.from_args(args)
+    assert cfg.num_workers == 2 and cfg.pin_memory and cfg.num_threads == 3
+
+
+def test_streaming_training_with_workers(tabular_csv):
+    parallel = ParallelConfig(num_workers=2, num_threads=1)
+    _, metrics, _ = train_model(tabular_csv, tabular_csv, "classification", epochs=2, data_mode="streaming", chunksize=64, parallel=parallel)
+    assert "accuracy" in metrics
+
+
+def test_training_leaves_process_threads_alone(tabular_csv):
+    before = torch.get_num_threads()
+    train_model(tabular_csv, tabular_csv, "classification", epochs=1, parallel=ParallelConfig(num_threads=before + 1))
+    assert torch.get_num_threads() == before
@@ -1,3 +1,7 @@
+import json
+
+import pytest
+
 from src.sagemaker.pipelines.pipeline import create_pipeline
 
 
@@ -13,3 +17,122 @@ def test_pipeline_builds(monkeypatch):
         train_instance_type="ml.m5.large",
     )
     assert pipeline.name == "test-pipeline"
+
+
+def test_steps_cache_when_enabled():
+    pipeline = create_pipeline(
+        region="us-east-1",
+        role="arn:aws:iam::123456789012:role/SageMaker",
+        pipeline_name="test-pipeline",
+        bucket="dummy-bucket",
+        model_package_group="pkg",
+        process_instance_type="ml.m5.large",
+        train_instance_type="ml.m5.large",
+        enable_cache=True,
+        cache_expire_after="P7D",
+    )
+    cached = {step.name: step.cache_config for step in pipeline.steps if getattr(step, "cache_config", None)}
+    assert set(cached) == {"Preprocess", "Train", "Evaluate"}
+    assert all(c.enable_caching and c.expire_after == "P7D" for c in cached.values())
+    assert {p.name for p in pipeline.parameters} >= {"DatasetFingerprint", "CodeVersion"}
+
+
+def test_multi_instance_settings_reach_the_jobs():
+    pipeline = create_pipeline(
+        region="us-east-1",
+        role="arn:aws:iam::123456789012:role/SageMaker",
+        pipeline_name="test-pipeline",
+        bucket="dummy-bucket",
+        model_package_group="pkg",
+        process_instance_type="ml.m5.large",
+        train_instance_type="ml.m5.large",
+        process_instance_count=2,
+        train_instance_count=3,
+    )
+    steps = {step.name: step for step in pipeline.steps}
+    assert steps["Train"].estimator.instance_count == 3
+    assert steps["Preprocess"].processor.instance_count == 2
+    assert steps["Preprocess"].inputs[0].s3_data_distribution_type == "ShardedByS3Key"
+
+
+def test_bf16_precision_is_gated_by_the_condition_step():
+    pipeline = create_pipeline(
+        region="us-east-1",
+        role="arn:aws:iam::123456789012:role/SageMaker",
+        pipeline_name="test-pipeline",
+        bucket="dummy-bucket",
+        model_package_group="pkg",
+        process_instance_type="ml.m5.large",
+        train_instance_type="ml.m5.large",
+        precision="bf16",
+    )
+    steps = {step.name: step for step in pipeline.steps}
+    assert steps["Evaluate"].job_arguments == ["--precision", "bf16"]
+    assert steps["Train"].estimator.hyperparameters()["precision"] == '"bf16"'
+    paths = [c.left.json_path for c in steps["MetricThresholdCheck"].conditions]
+    assert paths == ["metrics.accuracy", "precision.metric_delta"]
+
+
+def _resolve(node, parameters):
+    """Substitute parameter values into a definition fragment, as SageMaker does at run time."""
+    if isinstance(node, dict):
+        if set(node) == {"Get"} and node["Get"].startswith("Parameters."):
+            return parameters.get(node["Get"].removeprefix("Parameters."), node)
+        if set(node) == {"Std:Join"}:
+            join = node["Std:Join"]
+            return join["On"].join(str(_resolve(v, parameters)) for v in join["Values"])
+        return {k: _resolve(v, parameters) for k, v in node.items()}
+    if isinstance(node, list):
+        return [_resolve(v, parameters) for v in node]
+    return node
+
+
+def test_train_arguments_identify_the_dataset(monkeypatch):
+    moto = pytest.importorskip("moto")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+
+    def train_arguments(fingerprint):
+        pipeline = create_pipeline(
+            region="us-east-1",
+            role="arn:aws:iam::123456789012:role/SageMaker",
+            pipeline_name="test-pipeline",
+            bucket="dummy-bucket",
+            model_package_group="pkg",
+            process_instance_type="ml.m5.large",
+            train_instance_type="ml.m5.large",
+            enable_cache=True,
+        )
+        train = next(step for step in pipeline.steps if step.name == "Train")
+        # The inputs no longer reference Preprocess's properties, so the edge is explicit.
+        assert [step.name for step in train.depends_on] == ["Preprocess"]
+        arguments = json.loads(json.dumps(train.arguments, default=lambda variable: variable.expr))
+        return _resolve(arguments, {"DatasetFingerprint": fingerprint})
+
+    # Rendering the step arguments uploads the training code, which moto absorbs.
+    with moto.mock_aws():
+        import boto3
+
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="dummy-bucket")
+        first, second = train_arguments("aaa"), train_arguments("bbb")
+    channels = {c["ChannelName"]: c["DataSource"]["S3DataSource"]["S3Uri"] for c in first["InputDataConfig"]}
+    assert channels["train"] == "s3://dummy-bucket/runs/aaa/preprocessed/train"
+    assert first["OutputDataConfig"]["S3OutputPath"] == "s3://dummy-bucket/runs/aaa/training"
+    # Step cache keys come from the arguments, so a new dataset can never hit the old model.
+    assert first["InputDataConfig"] != second["InputDataConfig"]
+
+
+def test_preprocess_writes_each_dataset_to_its_own_prefix():
+    pipeline = create_pipeline(
+        region="us-east-1",
+        role="arn:aws:iam::123456789012:role/SageMaker",
+        pipeline_name="test-pipeline",
+        bucket="dummy-bucket",
+        model_package_group="pkg",
+        process_instance_type="ml.m5.large",
+        train_instance_type="ml.m5.large",
+    )
+    preprocess = next(step for step in pipeline.steps if step.name == "Preprocess")
+    # Shards of an earlier dataset's run are never under the prefix Train reads.
+    destinations = [_resolve(out.destination.expr, {"DatasetFingerprint": "aaa"}) for out in preprocess.outputs]
+    assert destinations == [f"s3://dummy-bucket/runs/aaa/preprocessed/{split}" for split in ("train", "val", "test")]
@@ -0,0 +1,117 @@
+import boto3
+import pytest
+from botocore.stub import Stubber
+
+from src.common import config
+from src.common.config import ConfigRegistry
+from src.sagemaker.pipelines.manager import HASH_MARKER, PipelineManager
+
+PIPELINE_ARN = "arn:aws:sagemaker:us-east-1:123456789012:pipeline/retrain"
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "REGISTRY", ConfigRegistry(revalidate_s=0.0))
+    monkeypatch.setenv("SAGEMAKER_ROLE_ARN", "arn:aws:iam::123456789012:role/sm")
+    (tmp_path / "project.yaml").write_text(
+        "project_name: p\naws_region: us-east-1\ns3_bucket_name: b\n"
+        "sagemaker_execution_role_arn: ${SAGEMAKER_ROLE_ARN}\nmodel_package_group_name: g\n"
+        "default_tags: {}\nenvironment_name: dev\n"
+    )
+    (tmp_path / "pipeline.yaml").write_text("pipeline_name: retrain\ntrain_instance_type: ml.m5.large\n")
+    code = tmp_path / "code"
+    code.mkdir()
+    (code / "step.py").write_text("print('v1')\n")
+    builds = []
+    client = boto3.client("sagemaker", region_name="us-east-1", aws_access_key_id="x", aws_secret_access_key="x")
+    mgr = PipelineManager(
+        str(tmp_path / "project.yaml"),
+        str(tmp_path / "pipeline.yaml"),
+        tags_path=None,
+        cache_dir=tmp_path / "cache",
+        client=client,
+        build_definition=lambda: builds.append(1) or '{"Version": "2020-12-01", "Steps": []}',
+        code_paths=[code],
+    )
+    mgr.builds = builds
+    mgr.code_dir = code
+    return mgr
+
+
+def _describe(stub, description):
+    stub.add_response(
+        "describe_pipeline",
+        {"PipelineArn": PIPELINE_ARN, "PipelineName": "retrain", "PipelineDescription": description},
+        {"PipelineName": "retrain"},
+    )
+
+
+def test_upserts_only_when_config_or_code_changes(manager):
+    first_hash = manager.hash
+    with Stubber(manager.client) as stub:
+        stub.add_client_error("describe_pipeline", "ResourceNotFound", http_status_code=404)
+        stub.add_response("create_pipeline", {"PipelineArn": PIPELINE_ARN})
+        assert manager.upsert()["updated"] is True
+
+        _describe(stub, f"{HASH_MARKER} {first_hash}")
+        assert manager.upsert()["updated"] is False
+
+        (manager.code_dir / "step.py").write_text("print('v2')\n")
+        manager._hash = None
+        assert manager.hash != first_hash
+        _describe(stub, f"{HASH_MARKER} {first_hash}")
+        stub.add_response("update_pipeline", {"PipelineArn": PIPELINE_ARN})
+        assert manager.upsert()["updated"] is True
+        stub.assert_no_pending_responses()
+    assert len(manager.builds) == 2
+
+
+def test_upsert_pipeline_skips_the_sdk_build_when_up_to_date(manager, monkeypatch):
+    from src.sagemaker.pipelines import run_pipeline
+
+    monkeypatch.setattr(run_pipeline, "get_manager", lambda *args: manager)
+    with Stubber(manager.client) as stub:
+        _describe(stub, f"{HASH_MARKER} {manager.hash}")
+        result = run_pipeline.upsert_pipeline()
+        stub.assert_no_pending_responses()
+    assert result == {"pipeline_name": "retrain", "hash": manager.hash, "updated": False}
+    assert manager.builds == []
+
+
+def test_definition_is_cached_on_disk_by_hash(manager):
+    definition = manager.definition()
+    assert manager.definition() == definition
+    assert len(manager.builds) == 1
+    assert (manager.cache_dir / f"retrain-{manager.hash}.json").exists()
+
+    pipeline_yaml = manager.pipeline_config_path
+    with open(pipeline_yaml, "a", encoding="utf-8") as f:
+        f.write("model_approval_status: Approved\n")
+    manager.definition()
+    assert len(manager.builds) == 2
+
+
+def test_start_and_describe_use_the_boto3_client(manager):
+    execution_arn = f"{PIPELINE_ARN}/execution/abc"
+    with Stubber(manager.client) as stub:
+        stub.add_response(
+            "start_pipeline_execution",
+            {"PipelineExecutionArn": execution_arn},
+            {
+                "PipelineName": "retrain",
+                "PipelineParameters": [
+                    {"Name": "DatasetS3Uri", "Value": "s3://b/datasets/1/"},
+                    {"Name": "ProblemType", "Value": "regression"},
+                    {"Name": "MetricThreshold", "Value": "0.9"},
+                    {"Name": "ApprovalStatus", "Value": "PendingManualApproval"},
+                ],
+            },
+        )
+        stub.add_response(
+            "describe_pipeline_execution",
+            {"PipelineExecutionArn": execution_arn, "PipelineExecutionStatus": "Executing"},
+            {"PipelineExecutionArn": execution_arn},
+        )
+        assert manager.start("s3://b/datasets/1/", "regression", 0.9) == execution_arn
+        assert manager.describe(execution_arn)["PipelineExecutionStatus"] == "Executing"
+    assert manager.builds == []
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+import torch
+
+from src.model import inference, precision
+from src.model.evaluate import load_model, precision_report
+from src.model.train import save_artifacts, train_model
+
+needs_bf16 = pytest.mark.skipif(not precision.bf16_supported(), reason="CPU lacks native bfloat16")
+
+
+def test_resolve_precision_validates_and_falls_back(monkeypatch):
+    with pytest.raises(ValueError):
+        precision.resolve_precision("fp16")
+    assert precision.resolve_precision(None) == "fp32"
+    monkeypatch.setattr(precision, "bf16_supported", lambda: False)
+    assert precision.resolve_precision("bf16") == "fp32"
+
+
+@needs_bf16
+def test_bf16_training_and_report(tabular_csv, tmp_path):
+    model, metrics, artifacts = train_model(tabular_csv, tabular_csv, "classification", epochs=2, precision="bf16")
+    assert all(p.dtype == torch.float32 for p in model.parameters())
+    save_artifacts(model, metrics, tmp_path / "run", artifacts)
+    report = precision_report(load_model(tmp_path / "run" / "model.pt"), tabular_csv, "classification")
+    assert report["precision"] == "bf16"
+    delta = report["baseline_metrics"]["accuracy"] - report["candidate_metrics"]["accuracy"]
+    assert report["metric_delta"] == pytest.approx(delta)
+    assert report["accepted"] == (report["metric_delta"] <= report["max_metric_delta"])
+
+
+def test_fp32_report_has_zero_delta(tabular_csv, tmp_path, monkeypatch):
+    model, metrics, _ = train_model(tabular_csv, tabular_csv, "classification", epochs=1)
+    report = precision_report(model, tabular_csv, "classification", precision="fp32")
+    assert report["metric_delta"] == 0 and report["accepted"]
+    assert "latency_ms" not in report
+    # bf16 on a CPU without support falls back to the same cheap fp32 report.
+    monkeypatch.setattr(precision, "bf16_supported", lambda: False)
+    assert precision_report(model, tabular_csv, "classification", precision="bf16") == report
+
+
+@needs_bf16
+def test_handler_serves_bf16_as_float32(tabular_csv, tmp_path, monkeypatch):
+    model, metrics, artifacts = train_model(tabular_csv, tabular_csv, "classification", epochs=1)
+    save_artifacts(model, metrics, tmp_path / "run", artifacts)
+    rows = torch.from_numpy(np.random.default_rng(0).normal(size=(8, 5)).astype(np.float32))
+    expected = inference.predict_fn(rows, inference.model_fn(tmp_path / "run"))
+    monkeypatch.setenv("INFERENCE_PRECISION", "bf16")
+    served = inference.model_fn(tmp_path / "run")
+    assert served.precision == "bf16"
+    prediction = inference.predict_fn(rows, served)
+    assert prediction.dtype == np.float32
+    np.testing.assert_allclose(prediction, expected, atol=0.1)
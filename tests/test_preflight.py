@@ -0,0 +1,117 @@
+from datetime import datetime
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+
+from src.sagemaker.pipelines.preflight import (
+    CODE_VERSION_KEY,
+    DATASET_FINGERPRINT_KEY,
+    find_registered_model,
+    preflight,
+    s3_dataset_fingerprint,
+)
+
+GROUP = "pkg-group"
+MATCH = {DATASET_FINGERPRINT_KEY: "fp", CODE_VERSION_KEY: "v1"}
+NOW = datetime(2024, 1, 1)
+
+
+def _package_arn(version):
+    return f"arn:aws:sagemaker:us-east-1:123456789012:model-package/{GROUP}/{version}"
+
+
+def _expect_packages(stub, packages, page_size=20):
+    """``packages``: list of (version, approval status, customer metadata), newest first.
+
+    Describe calls are expected up to the first package matching ``fp``/``v1``.
+    """
+    stub.add_response(
+        "list_model_packages",
+        {
+            "ModelPackageSummaryList": [
+                {
+                    "ModelPackageArn": _package_arn(version),
+                    "ModelPackageGroupName": GROUP,
+                    "CreationTime": NOW,
+                    "ModelPackageStatus": "Completed",
+                    "ModelApprovalStatus": status,
+                }
+                for version, status, _ in packages
+            ]
+        },
+        {"ModelPackageGroupName": GROUP, "SortBy": "CreationTime", "SortOrder": "Descending", "MaxResults": page_size},
+    )
+    for version, status, metadata in packages:
+        if status == "Rejected":
+            continue
+        stub.add_response(
+            "describe_model_package",
+            {
+                "ModelPackageName": GROUP,
+                "ModelPackageArn": _package_arn(version),
+                "CreationTime": NOW,
+                "ModelPackageStatus": "Completed",
+                "ModelPackageStatusDetails": {"ValidationStatuses": []},
+                "CustomerMetadataProperties": metadata,
+            },
+            {"ModelPackageName": _package_arn(version)},
+        )
+        if metadata == MATCH:
+            break
+
+
+@pytest.fixture
+def sagemaker_client():
+    return boto3.client("sagemaker", region_name="us-east-1", aws_access_key_id="x", aws_secret_access_key="x")
+
+
+def test_finds_only_matching_non_rejected_packages(sagemaker_client):
+    with Stubber(sagemaker_client) as stub:
+        older_code = {DATASET_FINGERPRINT_KEY: "fp", CODE_VERSION_KEY: "v0"}
+        _expect_packages(stub, [(3, "Rejected", MATCH), (2, "Approved", older_code), (1, "PendingManualApproval", MATCH)])
+        assert find_registered_model(sagemaker_client, GROUP, "fp", "v1") == _package_arn(1)
+        _expect_packages(stub, [(2, "Approved", {})])
+        assert find_registered_model(sagemaker_client, GROUP, "fp", "v1") is None
+        stub.assert_no_pending_responses()
+
+
+def test_search_stops_at_the_first_match(sagemaker_client):
+    with Stubber(sagemaker_client) as stub:
+        # Only the newest package is described; older ones are never fetched.
+        _expect_packages(stub, [(3, "Approved", MATCH), (2, "Approved", MATCH), (1, "Approved", {})], page_size=3)
+        assert find_registered_model(sagemaker_client, GROUP, "fp", "v1", max_packages=3) == _package_arn(3)
+        stub.assert_no_pending_responses()
+
+
+def test_s3_fingerprint_ignores_the_prefix_and_tracks_etags():
+    client = boto3.client("s3", region_name="us-east-1", aws_access_key_id="x", aws_secret_access_key="x")
+    with Stubber(client) as stub:
+        for prefix, etag in (("datasets/1/", '"abc"'), ("copies/1/", '"abc"'), ("datasets/1/", '"def"')):
+            contents = [{"Key": prefix + "data.csv", "Size": 10, "ETag": etag}]
+            stub.add_response("list_objects_v2", {"Contents": contents}, {"Bucket": "b", "Prefix": prefix})
+        first = s3_dataset_fingerprint("s3://b/datasets/1/", client)
+        assert s3_dataset_fingerprint("s3://b/copies/1/", client) == first
+        assert s3_dataset_fingerprint("s3://b/datasets/1/", client) != first
+
+
+class _Manager:
+    def __init__(self, client):
+        self.client = client
+        self.code_version = "v1"
+        self.project = type("Project", (), {"model_package_group_name": GROUP})()
+
+
+def test_preflight_fingerprints_the_s3_listing(sagemaker_client):
+    s3 = boto3.client("s3", region_name="us-east-1", aws_access_key_id="x", aws_secret_access_key="x")
+    contents = [{"Key": "datasets/1/data.csv", "Size": 10, "ETag": '"abc"'}]
+    with Stubber(s3) as s3_stub, Stubber(sagemaker_client) as stub:
+        for _ in range(2):
+            s3_stub.add_response("list_objects_v2", {"Contents": contents}, {"Bucket": "b", "Prefix": "datasets/1/"})
+        fingerprint = s3_dataset_fingerprint("s3://b/datasets/1/", s3)
+        _expect_packages(stub, [(1, "Approved", {DATASET_FINGERPRINT_KEY: fingerprint, CODE_VERSION_KEY: "v1"})])
+        result = preflight(_Manager(sagemaker_client), "s3://b/datasets/1/", s3)
+    assert result.skip and result.model_package_arn == _package_arn(1)
+    assert result.pipeline_parameters() == {"DatasetFingerprint": fingerprint, "CodeVersion": "v1"}
+    with pytest.raises(ValueError):
+        preflight(_Manager(sagemaker_client), "data/local")
@@ -0,0 +1,89 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.model.train import load_data
+from src.sagemaker.pipelines.steps.preprocess_script import SPLITS, SplitAssigner, host_index, preprocess
+
+
+def _write_inputs(root, n_files=3, n_rows=600, seed=0):
+    rng = np.random.default_rng(seed)
+    root.mkdir()
+    frames = []
+    for i in range(n_files):
+        frame = pd.DataFrame(
+            {
+                "id": np.arange(i * n_rows, (i + 1) * n_rows),
+                "f1": rng.normal(size=n_rows).astype(np.float32),
+                "label": rng.choice([0, 1], size=n_rows, p=[0.9, 0.1]),
+            }
+        )
+        frame.to_csv(root / f"data-{i}.csv", index=False)
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _read_split(out, split):
+    return pd.read_parquet(out / split).sort_values("id", ignore_index=True)
+
+
+def test_split_conserves_rows_and_is_deterministic(tmp_path):
+    source = _write_inputs(tmp_path / "in")
+    counts = preprocess(tmp_path / "in", tmp_path / "a", workers=1, key_column="id", stratify=False)
+    preprocess(
+        tmp_path / "in", tmp_path / "b", workers=3, key_column="id", stratify=False, chunksize=50, rows_per_shard=100
+    )
+    assert sum(counts.values()) == len(source)
+    ids = [set(_read_split(tmp_path / "a", s)["id"]) for s in SPLITS]
+    assert not (ids[0] & ids[1]) and not (ids[0] & ids[2]) and not (ids[1] & ids[2])
+    for split in SPLITS:
+        pd.testing.assert_frame_equal(_read_split(tmp_path / "a", split), _read_split(tmp_path / "b", split))
+    assert len(list((tmp_path / "b" / "train").glob("part-000-*.parquet"))) > 3
+    assert abs(counts["train"] / len(source) - 0.7) < 0.05
+
+
+def test_stratified_split_keeps_label_proportions(tmp_path):
+    _write_inputs(tmp_path / "in", n_files=1, n_rows=2000)
+    preprocess(tmp_path / "in", tmp_path / "out", workers=1, chunksize=128)
+    totals = {s: _read_split(tmp_path / "out", s)["label"].value_counts() for s in SPLITS}
+    positives = sum(t[1] for t in totals.values())
+    for split, fraction in zip(SPLITS, (0.7, 0.15, 0.15)):
+        assert abs(totals[split][1] - positives * fraction) <= 2
+
+
+def test_key_column_never_spans_splits(tmp_path):
+    source = _write_inputs(tmp_path / "in", n_files=2, n_rows=1000)
+    # Several rows per key, with labels that differ within a key.
+    for path in sorted((tmp_path / "in").glob("*.csv")):
+        frame = pd.read_csv(path)
+        frame["user"] = frame["id"] % 150
+        frame.to_csv(path, index=False)
+    counts = preprocess(tmp_path / "in", tmp_path / "out", workers=2, key_column="user", chunksize=64)
+    assert sum(counts.values()) == len(source)
+    users = [set(pd.read_parquet(tmp_path / "out" / s)["user"]) for s in SPLITS]
+    assert not (users[0] & users[1]) and not (users[0] & users[2]) and not (users[1] & users[2])
+    assert set().union(*users) == set(range(150))
+
+
+def test_assigner_rejects_bad_fractions():
+    with pytest.raises(ValueError):
+        SplitAssigner((0.5, 0.5))
+
+
+def test_training_reads_parquet_shard_directories(tmp_path):
+    source = _write_inputs(tmp_path / "in", n_files=2, n_rows=100)
+    preprocess(tmp_path / "in", tmp_path / "out", workers=1, rows_per_shard=40)
+    X, y = load_data(tmp_path / "out" / "train")
+    X_val, _ = load_data(tmp_path / "out" / "val")
+    X_test, _ = load_data(tmp_path / "out" / "test")
+    assert X.dtype == np.float32 and X.shape[1] == 2
+    assert len(X) + len(X_val) + len(X_test) == len(source) and len(y) == len(X)
+
+
+def test_host_index_from_resource_config(tmp_path):
+    config = tmp_path / "resourceconfig.json"
+    config.write_text(json.dumps({"current_host": "algo-2", "hosts": ["algo-2", "algo-1"]}))
+    assert host_index(str(config)) == 1
+    assert host_index(str(tmp_path / "missing.json")) == 0
@@ -0,0 +1,85 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.model.profile import PROFILE_FILE, DatasetProfile, HyperLogLog, KLLSketch, profile_files
+from src.model.train import save_artifacts, train_model
+from src.sagemaker.triggers.drift_checks import compute_simple_drift, profile_drift
+
+
+def _frame(n_rows: int, seed: int = 0, shift: float = 0.0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(
+        {
+            "x": rng.normal(loc=shift, size=n_rows),
+            "ids": rng.integers(0, 5000, size=n_rows),
+            "city": rng.choice(["a", "b", "c", None], size=n_rows),
+        }
+    )
+    frame.loc[::10, "x"] = np.nan
+    return frame
+
+
+def test_chunked_and_merged_profiles_match_exact_stats():
+    frame = _frame(20_000)
+    shards = [DatasetProfile(), DatasetProfile()]
+    for i, start in enumerate(range(0, len(frame), 1500)):
+        shards[i % 2].update_frame(frame.iloc[start : start + 1500])
+    profile = shards[0].merge(shards[1])
+    restored = DatasetProfile.from_dict(json.loads(json.dumps(profile.to_dict())))
+
+    x = frame["x"].dropna().to_numpy()
+    stats = restored.summary()
+    assert restored.rows == len(frame)
+    assert stats["x"]["nulls"] == 2000 and stats["x"]["null_fraction"] == pytest.approx(0.1)
+    assert stats["x"]["mean"] == pytest.approx(x.mean(), rel=1e-9)
+    assert stats["x"]["std"] == pytest.approx(x.std(), rel=1e-9)
+    assert (stats["x"]["min"], stats["x"]["max"]) == (x.min(), x.max())
+    for name, q in (("p05", 0.05), ("p50", 0.5), ("p95", 0.95)):
+        # KLL guarantees rank error, so compare ranks rather than values.
+        assert np.mean(x <= stats["x"]["quantiles"][name]) == pytest.approx(q, abs=0.02)
+    assert stats["ids"]["distinct"] == pytest.approx(frame["ids"].nunique(), rel=0.05)
+    assert stats["city"]["nulls"] == frame["city"].isna().sum()
+    assert stats["city"]["distinct"] == 3
+    assert "mean" not in stats["city"]
+
+
+def test_sketches_stay_small():
+    kll = KLLSketch()
+    kll.update(np.random.default_rng(0).normal(size=1_000_000))
+    assert sum(len(level) for level in kll.levels) < 3 * kll.k
+    hll = HyperLogLog()
+    hll.update(np.arange(1_000_000))
+    assert hll.estimate() == pytest.approx(1_000_000, rel=0.05)
+
+
+def test_parallel_shards_match_single_pass(tmp_path):
+    paths = []
+    for i in range(3):
+        paths.append(tmp_path / f"part-{i}.csv")
+        _frame(3000, seed=i).to_csv(paths[-1], index=False)
+    merged = profile_files(paths, chunksize=700, max_workers=2)
+    single = DatasetProfile()
+    for path in paths:
+        single.update_frame(pd.read_csv(path))
+    assert merged.rows == single.rows == 9000
+    assert merged.summary()["x"]["mean"] == pytest.approx(single.summary()["x"]["mean"])
+    assert merged.summary()["ids"]["distinct"] == single.summary()["ids"]["distinct"]
+
+
+def test_flat_stats_feed_simple_drift(tmp_path, make_tabular_csv):
+    train_csv = make_tabular_csv("train.csv", 400)
+    model, metrics, artifacts = train_model(train_csv, train_csv, "classification", epochs=1)
+    save_artifacts(model, metrics, tmp_path, artifacts)
+    assert (tmp_path / PROFILE_FILE).exists()
+    profile = DatasetProfile.load(tmp_path)
+    assert set(profile.columns) == set(artifacts.metadata.feature_names) | {"label"}
+    assert "feature_0.mean" in profile.flat_stats()
+
+    assert profile_drift(tmp_path, train_csv) == pytest.approx(0.0, abs=1e-6)
+    shifted = pd.read_csv(train_csv)
+    shifted["feature_0"] += 3.0
+    assert profile_drift(tmp_path, DatasetProfile().update_frame(shifted)) > 1.0
+    assert compute_simple_drift(profile.flat_stats(), profile.flat_stats()) == 0.0
@@ -0,0 +1,63 @@
+import json
+import tarfile
+
+import numpy as np
+import pytest
+import torch
+
+from src.model import inference
+from src.model.evaluate import load_model, quantization_report
+from src.model.export import QUANTIZATION_REPORT_FILE, export_model_artifacts
+from src.model.train import save_artifacts, train_model
+
+
+@pytest.fixture
+def trained_run(tabular_csv, tmp_path):
+    model, metrics, artifacts = train_model(tabular_csv, tabular_csv, "classification", epochs=2)
+    save_artifacts(model, metrics, tmp_path / "run", artifacts)
+    return tmp_path / "run" / "model.pt"
+
+
+def test_report_covers_metrics_size_and_latency(trained_run, tabular_csv):
+    model = load_model(trained_run)
+    report = quantization_report(model, tabular_csv, "classification", max_metric_delta=0.05)
+    assert report["accepted"] == (report["metric_delta"] <= 0.05)
+    assert report["baseline_metrics"]["accuracy"] - report["quantized_metrics"]["accuracy"] == pytest.approx(report["metric_delta"])
+    assert report["size_bytes"]["int8"] < report["size_bytes"]["float32"]
+    assert report["latency_ms"]["int8"] > 0
+
+
+@pytest.mark.parametrize("export_format", ["eager", "torchscript"])
+def test_quantized_export_serves_int8_model(trained_run, tabular_csv, tmp_path, export_format):
+    tar_path = export_model_artifacts(
+        trained_run, tmp_path / "export", export_format, quantize="int8", validation_csv=tabular_csv, max_metric_delta=1.0
+    )
+    assert json.loads((tmp_path / "export" / QUANTIZATION_REPORT_FILE).read_text())["accepted"]
+    with tarfile.open(tar_path) as tar:
+        tar.extractall(tmp_path / "served")
+    meta = json.loads((tmp_path / "served" / "model_meta.json").read_text())
+    assert meta["quantization"] == "int8"
+    artifact = tmp_path / "served" / meta["artifact"]
+    assert artifact.stat().st_size < trained_run.stat().st_size
+
+    served = inference.model_fn(tmp_path / "served")
+    rows = torch.from_numpy(np.random.default_rng(2).normal(size=(16, 5)).astype(np.float32))
+    with torch.inference_mode():
+        expected = load_model(trained_run)(rows).numpy()
+    np.testing.assert_allclose(inference.predict_fn(rows, served), expected, atol=0.05)
+
+
+def test_quantized_export_refused_over_threshold(trained_run, tabular_csv, tmp_path):
+    with pytest.raises(ValueError, match="refusing to export"):
+        export_model_artifacts(
+            trained_run, tmp_path / "export", quantize="int8", validation_csv=tabular_csv, max_metric_delta=-1.0
+        )
+    assert not (tmp_path / "export" / "model.tar.gz").exists()
+    assert not json.loads((tmp_path / "export" / QUANTIZATION_REPORT_FILE).read_text())["accepted"]
+
+
+def test_quantized_export_requires_validation_and_non_onnx(trained_run, tabular_csv, tmp_path):
+    with pytest.raises(ValueError, match="validation_csv"):
+        export_model_artifacts(trained_run, tmp_path / "export", quantize="int8")
+    with pytest.raises(ValueError, match="ONNX"):
+        export_model_artifacts(trained_run, tmp_path / "export", "onnx", quantize="int8", validation_csv=tabular_csv)
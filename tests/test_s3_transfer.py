@@ -0,0 +1,73 @@
+import os
+
+import boto3
+import pytest
+from boto3.s3.transfer import TransferConfig
+
+from src.common import aws
+
+moto = pytest.importorskip("moto")
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def s3_bucket(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_REGION", "us-east-1")
+    monkeypatch.delenv("AWS_PROFILE", raising=False)
+    with moto.mock_aws():
+        aws._cached_s3_client.cache_clear()
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="bucket")
+        yield "bucket"
+    aws._cached_s3_client.cache_clear()
+
+
+def _write_tree(root, n_files=20):
+    for i in range(n_files):
+        path = root / f"shard-{i // 10}" / f"part-{i:03d}.csv"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"a,b\n{i},{i * 2}\n")
+
+
+def test_upload_download_round_trip_is_incremental(tmp_path, s3_bucket):
+    src, dst = tmp_path / "src", tmp_path / "dst"
+    _write_tree(src)
+    first = aws.s3_upload_dir(src, f"s3://{s3_bucket}/datasets/demo")
+    assert len(first.transferred) == 20
+    assert aws.s3_upload_dir(src, f"s3://{s3_bucket}/datasets/demo").transferred == []
+
+    down = aws.s3_download_dir(f"s3://{s3_bucket}/datasets/demo", dst)
+    assert len(down.transferred) == 20
+    assert (dst / "shard-1" / "part-015.csv").read_text() == "a,b\n15,30\n"
+
+    (src / "shard-0" / "part-003.csv").write_text("a,b\n3,7\n")
+    assert aws.s3_upload_dir(src, f"s3://{s3_bucket}/datasets/demo").transferred == ["datasets/demo/shard-0/part-003.csv"]
+    (dst / "stale.csv").write_text("old")
+    again = aws.s3_download_dir(f"s3://{s3_bucket}/datasets/demo", dst, delete=True)
+    assert again.transferred == ["datasets/demo/shard-0/part-003.csv"]
+    assert len(again.skipped) == 19
+    assert not (dst / "stale.csv").exists()
+
+
+def test_multipart_etag_matches_s3(tmp_path, s3_bucket):
+    config = TransferConfig(multipart_threshold=5 * MB, multipart_chunksize=5 * MB)
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "big.bin").write_bytes(os.urandom(11 * MB))
+    aws.s3_upload_dir(src, f"s3://{s3_bucket}/blobs", config=config)
+    etag = boto3.client("s3", region_name="us-east-1").head_object(Bucket=s3_bucket, Key="blobs/big.bin")["ETag"]
+    assert etag.strip('"') == aws.local_etag(src / "big.bin", config)
+    assert etag.strip('"').endswith("-3")
+    assert aws.s3_upload_dir(src, f"s3://{s3_bucket}/blobs", config=config).skipped == ["blobs/big.bin"]
+
+
+def test_download_replaces_a_previous_dataset_by_default(tmp_path, s3_bucket):
+    src, dst = tmp_path / "src", tmp_path / "dst"
+    _write_tree(src, n_files=3)
+    aws.s3_upload_dir(src, f"s3://{s3_bucket}/datasets/v2")
+    (dst / "shard-9").mkdir(parents=True)
+    (dst / "shard-9" / "part-999.csv").write_text("a,b\n0,0\n")
+    aws.s3_download_dir(f"s3://{s3_bucket}/datasets/v2", dst)
+    assert sorted(p.name for p in dst.rglob("*.csv")) == ["part-000.csv", "part-001.csv", "part-002.csv"]
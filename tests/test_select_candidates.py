@@ -0,0 +1,105 @@
+import json
+from datetime import datetime
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+
+from src.sagemaker.autopilot.select_best_model import (
+    TieBreaker,
+    select_best_candidate,
+    select_top_k,
+    top_candidates,
+)
+
+NOW = datetime(2024, 1, 1)
+
+
+def _candidate(name, value, latency=None, metric_type="Maximize", metric="Accuracy"):
+    candidate = {
+        "CandidateName": name,
+        "FinalAutoMLJobObjectiveMetric": {"Type": metric_type, "MetricName": metric, "Value": value},
+        "ObjectiveStatus": "Succeeded",
+        "CandidateSteps": [],
+        "CandidateStatus": "Completed",
+        "CreationTime": NOW,
+        "LastModifiedTime": NOW,
+        "InferenceContainers": [{"Image": "img", "ModelDataUrl": f"s3://models/{name}.tar.gz"}],
+    }
+    if latency is not None:
+        candidate["CandidateProperties"] = {"CandidateMetrics": [{"MetricName": "InferenceLatency", "Value": latency}]}
+    return candidate
+
+
+def _expect_pages(stub, job_name, pages, order="Descending"):
+    for i, page in enumerate(pages):
+        params = {
+            "AutoMLJobName": job_name,
+            "StatusEquals": "Completed",
+            "SortBy": "FinalObjectiveMetricValue",
+            "SortOrder": order,
+            "MaxResults": 2,
+        }
+        if i:
+            params["NextToken"] = f"{job_name}-{i}"
+        response = {"Candidates": page}
+        if i < len(pages) - 1:
+            response["NextToken"] = f"{job_name}-{i + 1}"
+        stub.add_response("list_candidates_for_auto_ml_job", response, params)
+
+
+@pytest.fixture
+def client():
+    return boto3.client("sagemaker", region_name="us-east-1", aws_access_key_id="x", aws_secret_access_key="x")
+
+
+def test_reads_past_the_first_page_and_breaks_ties_on_latency(client):
+    pages = [
+        [_candidate("a", 0.91, latency=30), _candidate("b", 0.90, latency=12)],
+        [_candidate("c", 0.90, latency=8), _candidate("d", 0.85)],
+        [_candidate("e", 0.80)],
+    ]
+    with Stubber(client) as stub:
+        _expect_pages(stub, "job", pages[:2])
+        top = top_candidates(client, "job", k=2, page_size=2)
+        stub.assert_no_pending_responses()
+    # "c" is on the second page and beats "b" on latency; the third page is never requested.
+    assert [c["CandidateName"] for c in top] == ["a", "c"]
+
+
+def test_minimized_objectives_and_custom_tie_breakers(client):
+    size = TieBreaker("ModelSize", value=lambda c: {"x": 300, "y": 100}.get(c["CandidateName"]))
+    pages = [[_candidate("x", 0.2, metric_type="Minimize", metric="MSE"), _candidate("y", 0.2, metric_type="Minimize", metric="MSE")]]
+    with Stubber(client) as stub:
+        _expect_pages(stub, "reg", pages, order="Ascending")
+        top = top_candidates(client, "reg", k=1, tie_breakers=(size,), minimize=True, page_size=2)
+    assert [c["CandidateName"] for c in top] == ["y"]
+
+
+def test_selects_across_jobs_concurrently(client, monkeypatch):
+    # Concurrent calls would interleave a single Stubber's queue, so each job's listing is faked.
+    listings = {"job-1": [_candidate("j1-a", 0.81)], "job-2": [_candidate("j2-a", 0.93, latency=5)], "job-3": []}
+    calls = []
+
+    def fake_top(client_, job_name, k, tie_breakers, minimize):
+        assert client_ is client
+        calls.append(job_name)
+        return listings[job_name][:k]
+
+    monkeypatch.setattr("src.sagemaker.autopilot.select_best_model.top_candidates", fake_top)
+    results = select_top_k(["job-1", "job-2", "job-3"], k=2, client=client)
+    assert sorted(calls) == ["job-1", "job-2", "job-3"]
+    assert [(r["job_name"], r["candidate_name"]) for r in results] == [("job-2", "j2-a"), ("job-1", "j1-a")]
+    assert results[0]["InferenceLatency"] == 5
+
+
+def test_select_best_candidate_writes_summary(client, tmp_path, monkeypatch):
+    monkeypatch.setattr("src.sagemaker.autopilot.select_best_model.boto3.client", lambda *a, **k: client)
+    with Stubber(client) as stub:
+        stub.add_response("list_candidates_for_auto_ml_job", {"Candidates": [_candidate("best", 0.95)]})
+        result = select_best_candidate("job", output_path=str(tmp_path / "best.json"))
+        stub.add_response("list_candidates_for_auto_ml_job", {"Candidates": []})
+        with pytest.raises(RuntimeError, match="No completed candidates"):
+            select_best_candidate("empty", output_path=str(tmp_path / "none.json"))
+    assert result["model_artifacts"] == "s3://models/best.tar.gz"
+    assert json.loads((tmp_path / "best.json").read_text())["candidate_name"] == "best"
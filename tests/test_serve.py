@@ -0,0 +1,108 @@
+import http.client
+import json
+import threading
+
+import numpy as np
+import torch
+
+from src.model.nn import SimpleMLP
+from src.model.serve import DynamicBatcher, create_server
+
+
+def test_batcher_coalesces_and_scatters():
+    calls = []
+
+    def predict(rows):
+        calls.append(len(rows))
+        return rows * 2
+
+    batcher = DynamicBatcher(predict, max_batch_size=8, max_delay_ms=50)
+    results = {}
+    threads = [threading.Thread(target=lambda i=i: results.__setitem__(i, batcher.submit(np.full((2, 1), i)))) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.close()
+    assert all(np.array_equal(results[i], np.full((2, 1), 2 * i)) for i in range(4))
+    assert sum(calls) == 8 and len(calls) < 4
+
+
+def test_server_invocations_with_batching():
+    model = SimpleMLP(input_dim=3).eval()
+    server, batcher = create_server(model, host="127.0.0.1", port=0, dynamic_batching=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1])
+        conn.request("GET", "/ping")
+        ping = conn.getresponse()
+        ping.read()
+        assert ping.status == 200
+        conn.request("POST", "/invocations", body=b"1,2,3\n4,5,6", headers={"Content-Type": "text/csv"})
+        response = conn.getresponse()
+        preds = json.loads(response.read())["predictions"]
+        expected = model(torch.tensor([[1.0, 2, 3], [4, 5, 6]])).detach().numpy()
+        np.testing.assert_allclose(np.asarray(preds, dtype=np.float32), expected, rtol=1e-6)
+    finally:
+        server.shutdown()
+        server.server_close()
+        batcher.close()
+
+
+def test_server_rejects_bad_requests_without_failing_the_batch():
+    model = SimpleMLP(input_dim=3).eval()
+    server, batcher = create_server(model, host="127.0.0.1", port=0, dynamic_batching=True, max_delay_ms=50)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    def post(body, headers):
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        conn.request("POST", "/invocations", body=body, headers={"Content-Type": "text/csv", **headers})
+        response = conn.getresponse()
+        return response.status, response.getheader("Content-Type"), response.read()
+
+    try:
+        results = {}
+        requests = {"good": (b"1,2,3", {}), "wide": (b"1,2,3,4", {}), "csv": (b"4,5,6", {"Accept": "text/csv"})}
+        threads = [
+            threading.Thread(target=lambda k=k, r=r: results.__setitem__(k, post(*r))) for k, r in requests.items()
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert results["good"][:2] == (200, "application/json")
+        assert results["wide"][0] == 400
+        assert results["csv"][:2] == (200, "text/csv")
+        assert post(b"1,2,3", {"Accept": "application/xml"})[0] == 406
+        assert post(b"1,2,3", {"Content-Type": "text/plain"})[0] == 415
+    finally:
+        server.shutdown()
+        server.server_close()
+        batcher.close()
+
+
+def test_batcher_fails_only_the_bad_request():
+    def predict(rows):
+        if np.isnan(rows).any():
+            raise ValueError("nan input")
+        return rows * 2
+
+    batcher = DynamicBatcher(predict, max_batch_size=8, max_delay_ms=50)
+    results = {}
+
+    def call(i, rows):
+        try:
+            results[i] = batcher.submit(rows)
+        except ValueError as exc:
+            results[i] = exc
+
+    rows = [np.ones((1, 1)), np.full((1, 1), np.nan), np.full((1, 1), 3.0)]
+    threads = [threading.Thread(target=call, args=(i, r)) for i, r in enumerate(rows)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.close()
+    assert isinstance(results[1], ValueError)
+    assert results[0][0, 0] == 2 and results[2][0, 0] == 6